@@ -4,19 +4,34 @@ files of the notation software MuseScore.
 
 from __future__ import annotations
 
-from importlib import metadata
+import typing
+from typing import Any
 
-import mscxyz
-import mscxyz.lyrics
-import mscxyz.meta
-import mscxyz.score
-import mscxyz.style
-from mscxyz import utils
+if typing.TYPE_CHECKING:
+    from mscxyz.score import Score
+    from mscxyz.utils import list_path
 
-__version__: str = metadata.version("mscxyz")
+    __version__: str
 
 supported_versions = (2, 3, 4)
 
-Score = mscxyz.score.Score
 
-list_path = utils.list_path
+def __getattr__(name: str) -> Any:
+    """Import the submodules on first access to keep the start of the command
+    line interface fast."""
+    if name == "__version__":
+        from importlib import metadata
+
+        return metadata.version("mscxyz")
+    if name == "Score":
+        from mscxyz.score import Score
+
+        return Score
+    if name == "list_path":
+        from mscxyz.utils import list_path
+
+        return list_path
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["Score", "list_path", "supported_versions"]
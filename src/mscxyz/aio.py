@@ -0,0 +1,95 @@
+"""Run the blocking operations of the scores from asyncio code.
+
+.. code-block:: python
+
+    from mscxyz.score import Score
+
+    async def ingest(path: str) -> None:
+        score = await Score.aopen(path)
+        score.meta.title = "Title"
+        await score.asave()
+        await score.export.ato_extension("pdf")
+
+Loading, parsing and serializing run in a bounded thread pool, so that a
+burst of requests cannot start an unbounded number of threads. The pool
+copies the context of the calling task, including the options of
+:func:`mscxyz.settings.use_args`. The ``mscore`` executable runs as an
+asyncio subprocess. It is killed if the awaiting task is cancelled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from mscxyz.utils import get_musescore_bin
+
+T = TypeVar("T")
+
+max_workers: int = min(4, os.cpu_count() or 1)
+"""The number of threads of the executor. Changes only take effect before
+the executor is created or after :func:`shutdown_executor`."""
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """The executor is created on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="mscxyz"
+            )
+        return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call a blocking function in the executor, in a copy of the current
+    context."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), call)
+
+
+async def execute_musescore(cli_args: list[str]) -> None:
+    """
+    The asyncio counterpart of :func:`mscxyz.utils.execute_musescore`.
+
+    :param cli_args: Command line arguments to call the mscore binary with.
+
+    :raises ValueError: If ``mscore`` exits with a return code other than 0.
+    """
+    executable = await run_blocking(get_musescore_bin)
+    process = await asyncio.create_subprocess_exec(
+        executable,
+        *cli_args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        _, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    if process.returncode != 0:
+        print(stderr.decode("utf-8"))
+        raise ValueError("mscore exits with returncode != 0")
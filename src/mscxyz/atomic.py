@@ -0,0 +1,182 @@
+"""Write files atomically with a configurable durability.
+
+The content is written into a temporary file in the directory of the
+destination, which then replaces the destination with :func:`os.replace`.
+A crash or a kill during the write leaves the old file untouched, never a
+truncated one.
+
+The durability policy (``--durability``) controls when the data reaches
+the disk:
+
+``none``
+    The operating system writes the data back whenever it likes. A power
+    loss can lose the latest saves, but the files are either old or new.
+``fsync``
+    Each file and its directory are synchronized before the save returns.
+    This is the safest and the slowest policy.
+``batch``
+    The written files and their directories are remembered and
+    synchronized together by :func:`sync_pending` at the end of a run.
+
+The watch mode (:mod:`mscxyz.watch`) has to know which files the run wrote
+itself. After :func:`record_writes` the saves, backups, renames and exports
+are recorded with their modification time and size at the time of the
+write, see :func:`note_write` and :func:`take_written`. A later save by
+another program changes them, so the watcher still notices it.
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, Literal, Mapping, Optional
+
+Durability = Literal["none", "fsync", "batch"]
+
+Written = dict[str, tuple[int, int]]
+"""absolute path -> (modification time in nanoseconds, size)"""
+
+_pending: set[str] = set()
+"""The files written with the ``batch`` policy and not yet synchronized."""
+
+_written: Optional[Written] = None
+"""The files written since :func:`record_writes`, ``None``: not recorded."""
+
+_lock = threading.Lock()
+
+
+def _fsync_path(path: str | Path) -> None:
+    """Synchronize a file or a directory. Directories cannot be opened on
+    Windows, their entries are synchronized by the file system itself."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except (FileNotFoundError, IsADirectoryError, PermissionError):
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(
+    dest: str | Path, mode: Literal["w", "wb"] = "wb", durability: Durability = "none"
+) -> Iterator[IO[Any]]:
+    """
+    Open a temporary file that replaces the destination when the context
+    exits without an error.
+
+    :param dest: The destination. A symbolic link is resolved, the target
+      of the link is replaced.
+    :param mode: ``w`` to write text, ``wb`` to write bytes.
+    :param durability: See the module documentation.
+    """
+    path = dest
+    dest = os.path.realpath(dest)
+    directory, name = os.path.split(dest)
+    tmp = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+    # The mode 0o666 is restricted by the umask like a file created by open().
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+            if durability == "fsync":
+                f.flush()
+                os.fsync(f.fileno())
+        if os.path.exists(dest):
+            shutil.copymode(dest, tmp)
+        # A rename keeps the modification time.
+        stat = os.stat(tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    note_write(path, stat)
+    if durability == "fsync":
+        _fsync_path(directory)
+    elif durability == "batch":
+        with _lock:
+            _pending.add(dest)
+
+
+def take_pending() -> set[str]:
+    """:return: The files that are not synchronized yet. They are removed
+    from the pending files, for example to pass them from a worker process
+    to the main process."""
+    global _pending
+    with _lock:
+        pending, _pending = _pending, set()
+    return pending
+
+
+def add_pending(files: Iterable[str]) -> None:
+    with _lock:
+        _pending.update(files)
+
+
+def sync_pending() -> int:
+    """Synchronize the files written with the ``batch`` policy and then
+    their directories, each directory once.
+
+    :return: The number of synchronized files."""
+    pending = take_pending()
+    for file in pending:
+        _fsync_path(file)
+    for directory in {os.path.dirname(file) for file in pending}:
+        _fsync_path(directory)
+    return len(pending)
+
+
+def record_writes(enabled: bool = True) -> None:
+    """Start or stop to record the written files in this process."""
+    global _written
+    with _lock:
+        if not enabled:
+            _written = None
+        elif _written is None:
+            _written = {}
+
+
+def note_write(
+    path: str | os.PathLike[str], stat: Optional[os.stat_result] = None
+) -> None:
+    """Record a written file if :func:`record_writes` was called.
+
+    :param stat: The status of the written content, for example of the
+      temporary file before it was renamed. ``None``: stat the path now.
+    """
+    if _written is None:
+        return
+    if stat is None:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+    with _lock:
+        _written[os.path.abspath(path)] = (stat.st_mtime_ns, stat.st_size)
+
+
+def add_written(written: Mapping[str, tuple[int, int]]) -> None:
+    """Record the files written by a worker process."""
+    if _written is None:
+        return
+    with _lock:
+        _written.update(written)
+
+
+def take_written() -> Written:
+    """:return: The files written since the last call. The recording
+    continues."""
+    global _written
+    with _lock:
+        if _written is None:
+            return {}
+        written, _written = _written, {}
+    return written
@@ -0,0 +1,221 @@
+"""Make backup copies of the score files cheaply.
+
+:func:`clone_file` shares the data blocks of the copy with the original on
+file systems that support reflinks (Btrfs, XFS, …) with the ``FICLONE``
+ioctl. Otherwise ``copy_file_range()`` copies the data in the kernel, and on
+other platforms the file is copied with :func:`shutil.copy2`.
+
+Hard links are not used. The saves of mscxyz replace the files atomically
+(see :mod:`mscxyz.atomic`), which leaves a hard link untouched, but other
+programs like MuseScore or a text editor may write a score in place and
+would modify a hard-linked backup together with the original.
+
+:class:`BackupStore` keeps the backups in one directory instead of
+``*_bak.msc?`` files next to the scores. The backups are stored once per
+content hash, a manifest (an SQLite database) maps the original paths to
+their snapshots. Repeated runs on unchanged files do not add new backups.
+
+.. code-block:: text
+
+    <store>/manifest.sqlite
+    <store>/objects/3f/3f2a…
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from dataclasses import astuple, dataclass
+from pathlib import Path
+from typing import Literal, Optional
+
+from mscxyz import atomic
+from mscxyz.state import hash_file
+from mscxyz.utils import PathOrStr
+
+CloneMethod = Literal["reflink", "copy_file_range", "copy"]
+
+FICLONE = 0x40049409
+"""``_IOW(0x94, 9, int)`` from ``linux/fs.h``."""
+
+_unsupported = {
+    errno.EBADF,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EXDEV,
+    errno.EPERM,
+}
+"""The errors of ``FICLONE`` and ``copy_file_range()`` if the file system
+does not support them, for example across file systems."""
+
+
+def _reflink(src_fd: int, dest_fd: int) -> bool:
+    if sys.platform != "linux":
+        return False
+    import fcntl
+
+    try:
+        fcntl.ioctl(dest_fd, FICLONE, src_fd)
+    except OSError as e:
+        if e.errno in _unsupported:
+            return False
+        raise
+    return True
+
+
+def _copy_file_range(src_fd: int, dest_fd: int, size: int) -> bool:
+    if sys.platform != "linux" or not hasattr(os, "copy_file_range"):
+        return False
+    copied = 0
+    while copied < size:
+        try:
+            count = os.copy_file_range(src_fd, dest_fd, size - copied)
+        except OSError as e:
+            if copied == 0 and e.errno in _unsupported:
+                return False
+            raise
+        if count == 0:
+            break
+        copied += count
+    return True
+
+
+def clone_file(src: PathOrStr, dest: PathOrStr) -> CloneMethod:
+    """
+    Copy a file including its metadata like :func:`shutil.copy2`, with a
+    reflink if possible.
+
+    :return: The method that copied the data.
+    """
+    method: CloneMethod
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdest:
+        size = os.fstat(fsrc.fileno()).st_size
+        if _reflink(fsrc.fileno(), fdest.fileno()):
+            method = "reflink"
+        elif _copy_file_range(fsrc.fileno(), fdest.fileno(), size):
+            method = "copy_file_range"
+        else:
+            shutil.copyfileobj(fsrc, fdest)
+            method = "copy"
+    shutil.copystat(src, dest)
+    atomic.note_write(dest)
+    return method
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    path: str
+    """The resolved path of the original file."""
+    hash: str
+    size: int
+    mtime_ns: int
+    """The modification time of the original file."""
+    time: float
+    """The time of the latest backup of this content."""
+
+
+class BackupStore:
+    """
+    :param directory: The directory of the store. It is created if it does
+      not exist.
+    """
+
+    def __init__(self, directory: PathOrStr) -> None:
+        self.directory = Path(directory)
+        self.objects = self.directory / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        # Several processes of a parallel run (--jobs) share the manifest.
+        self.__connection = sqlite3.connect(
+            self.directory / "manifest.sqlite", timeout=60
+        )
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "path TEXT, hash TEXT, size INTEGER, mtime_ns INTEGER, "
+            "time REAL, PRIMARY KEY (path, hash))"
+        )
+        self.__connection.commit()
+
+    def __enter__(self) -> BackupStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def get_object(self, hash: str) -> Path:
+        """:return: The path of the stored content."""
+        return self.objects / hash[:2] / hash
+
+    def add(self, file: PathOrStr) -> Snapshot:
+        """Back up a file. The content is only stored if it is not in the
+        store yet."""
+        path = Path(file).resolve()
+        stat = path.stat()
+        hash = hash_file(path)
+        obj = self.get_object(hash)
+        if not obj.exists():
+            obj.parent.mkdir(exist_ok=True)
+            tmp = obj.with_name(f"{hash}.{os.getpid()}.tmp")
+            clone_file(path, tmp)
+            os.replace(tmp, obj)
+        snapshot = Snapshot(
+            str(path), hash, stat.st_size, stat.st_mtime_ns, time.time()
+        )
+        with self.__connection:
+            self.__connection.execute(
+                "INSERT INTO snapshots VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (path, hash) DO UPDATE "
+                "SET mtime_ns = excluded.mtime_ns, time = excluded.time",
+                astuple(snapshot),
+            )
+        return snapshot
+
+    def get_snapshots(self, file: PathOrStr) -> list[Snapshot]:
+        """:return: The snapshots of a file, the oldest first."""
+        rows = self.__connection.execute(
+            "SELECT * FROM snapshots WHERE path = ? ORDER BY time",
+            (str(Path(file).resolve()),),
+        ).fetchall()
+        return [Snapshot(*row) for row in rows]
+
+    def restore(
+        self,
+        file: PathOrStr,
+        dest: Optional[PathOrStr] = None,
+        hash: Optional[str] = None,
+    ) -> Path:
+        """
+        Restore a snapshot of a file.
+
+        :param file: The original path of the file.
+        :param dest: The restored file. ``None``: the original path.
+        :param hash: The content hash of the snapshot. ``None``: the latest
+          snapshot.
+        """
+        snapshots = self.get_snapshots(file)
+        if hash is not None:
+            snapshots = [s for s in snapshots if s.hash == hash]
+        if not snapshots:
+            raise FileNotFoundError(f"No backup of {file}")
+        dest = Path(file if dest is None else dest)
+        # Like a save (see mscxyz.atomic): a crash during the restore leaves
+        # the old file, not a truncated one.
+        target = Path(os.path.realpath(dest))
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        try:
+            clone_file(self.get_object(snapshots[-1].hash), tmp)
+            stat = tmp.stat()
+            os.replace(tmp, target)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        atomic.note_write(dest, stat)
+        return dest
+
+    def close(self) -> None:
+        self.__connection.close()
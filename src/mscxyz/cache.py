@@ -0,0 +1,211 @@
+"""A process-level cache of parsed scores for long-running processes, for
+example the server (:mod:`mscxyz.server`) or a notebook.
+
+.. code-block:: python
+
+    from mscxyz import cache
+
+    cache.enable(max_bytes=512 * 1024 * 1024)
+    score = cache.open_score("score.mscz")  # parsed
+    score = cache.open_score("score.mscz")  # from the cache
+    writable = cache.open_score("score.mscz", readonly=False)  # a copy
+    print(cache.get_cache().stats)
+
+The cache is disabled by default. It holds read-only scores
+(:class:`mscxyz.score.Score` with ``readonly=True``), which are shared by
+all callers and threads. A caller that wants to modify a score gets a deep
+copy (:meth:`mscxyz.score.Score.copy`), which costs much less than parsing
+the file and extracting the zip file again.
+
+The lazy properties of a score (``style``, ``meta``, ``fields``, …) are
+not synchronized. They are initialized before a score is shared, see
+:func:`initialize`, so concurrent readers never race on their creation.
+The objects below them only read the tree of a read-only score.
+
+The entries are keyed by the resolved path, the size and the modification
+time of the file, so a modified file is parsed again. The least recently
+used entries are evicted when the estimated memory of all entries exceeds
+the budget.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import typing
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from mscxyz.utils import PathOrStr
+
+if typing.TYPE_CHECKING:
+    from mscxyz.score import Score
+
+Key = tuple[str, int, int]
+"""The resolved path, the size and the modification time in nanoseconds."""
+
+tree_overhead = 5
+"""The memory of a parsed tree (libxml2 nodes) as a multiple of the size of
+the XML markup."""
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    """The estimated memory of all entries."""
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def estimate_size(score: Score) -> int:
+    """Estimate the memory of a parsed score by the size of its XML markup."""
+    size = 0
+    if score.memory_zip is not None:
+        size += len(score.memory_zip.members[score.xml_file])
+        if score.style_file is not None:
+            size += len(score.memory_zip.members[str(score.style_file)])
+    else:
+        size += os.path.getsize(score.xml_file)
+        if score.style_file is not None:
+            size += os.path.getsize(score.style_file)
+    return size * tree_overhead
+
+
+def initialize(score: Score) -> Score:
+    """Initialize the lazy properties of a score before it is shared between
+    threads."""
+    for name in ("style", "meta", "fields", "lyrics", "export"):
+        getattr(score, name)
+    return score
+
+
+class ScoreCache:
+    """
+    :param max_bytes: The memory budget of the cache.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.__entries: OrderedDict[Key, tuple[Score, int]] = OrderedDict()
+        self.__bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def get_key(path: PathOrStr) -> Key:
+        resolved = Path(path).resolve()
+        stat = resolved.stat()
+        return (str(resolved), stat.st_size, stat.st_mtime_ns)
+
+    def __remove(self, key: Key) -> None:
+        _, size = self.__entries.pop(key)
+        self.__bytes -= size
+
+    def __lookup(self, key: Key) -> Optional[Score]:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.__misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+            return entry[0]
+
+    def __insert(self, key: Key, score: Score, size: int) -> None:
+        with self.__lock:
+            for stale in [k for k in self.__entries if k[0] == key[0]]:
+                # An older version of the file or a concurrent load.
+                self.__remove(stale)
+            if size > self.max_bytes:
+                return
+            self.__entries[key] = (score, size)
+            self.__bytes += size
+            while self.__bytes > self.max_bytes:
+                self.__remove(next(iter(self.__entries)))
+                self.__evictions += 1
+
+    def get(self, path: PathOrStr, readonly: bool = True) -> Score:
+        """
+        Get a score from the cache or load it.
+
+        :param path: The path of a MuseScore file.
+        :param readonly: Return the shared read-only score. Otherwise a
+          writable copy is returned.
+        """
+        from mscxyz.score import Score
+
+        key = self.get_key(path)
+        score = self.__lookup(key)
+        if score is None:
+            # Parse outside of the lock, other files can be looked up meanwhile.
+            score = initialize(Score(key[0], readonly=True))
+            self.__insert(key, score, estimate_size(score))
+        if readonly:
+            return score
+        return score.copy(readonly=False)
+
+    def invalidate(self, path: PathOrStr) -> None:
+        """Remove all entries of a file."""
+        resolved = str(Path(path).resolve())
+        with self.__lock:
+            for key in [k for k in self.__entries if k[0] == resolved]:
+                self.__remove(key)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        with self.__lock:
+            return CacheStats(
+                hits=self.__hits,
+                misses=self.__misses,
+                evictions=self.__evictions,
+                entries=len(self.__entries),
+                bytes=self.__bytes,
+                max_bytes=self.max_bytes,
+            )
+
+
+_cache: Optional[ScoreCache] = None
+
+
+def enable(max_bytes: int = 256 * 1024 * 1024) -> ScoreCache:
+    """Enable the process-level cache, see :func:`open_score`."""
+    global _cache
+    _cache = ScoreCache(max_bytes)
+    return _cache
+
+
+def disable() -> None:
+    global _cache
+    _cache = None
+
+
+def get_cache() -> Optional[ScoreCache]:
+    """:return: The process-level cache or ``None`` if it is disabled."""
+    return _cache
+
+
+def open_score(path: PathOrStr, readonly: bool = True) -> Score:
+    """Load a score through the process-level cache if it is enabled, see
+    :meth:`ScoreCache.get`."""
+    if _cache is not None:
+        return _cache.get(path, readonly)
+    from mscxyz.score import Score
+
+    return Score(Path(path), readonly=readonly)
@@ -0,0 +1,95 @@
+"""Record the progress of a run to resume it after a crash or a kill.
+
+The checkpoint file contains one JSON object per processed file:
+
+.. code-block:: json
+
+    {"path": "/scores/a.mscz", "status": "ok"}
+    {"path": "/scores/b.mscz", "status": "error", "error": "SyntaxError: ..."}
+
+Each line is appended with a single ``write`` call on a file opened with
+``O_APPEND``, so the lines of a killed run are complete as soon as the call
+returns. Only a crash of the whole machine can leave a truncated last line,
+which is ignored on resume. Only the main process writes the file, the
+parallel workers report their results back to it.
+
+A file that raised an error without ``--catch-errors`` stopped the run and
+is not recorded, so it is processed again on resume.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from mscxyz.utils import PathOrStr
+
+
+def read_checkpoint(path: PathOrStr) -> dict[str, str]:
+    """:return: The status of the recorded files by their resolved paths."""
+    done: dict[str, str] = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                done[entry["path"]] = entry["status"]
+    except FileNotFoundError:
+        pass
+    return done
+
+
+class Checkpoint:
+    """
+    :param path: The path of the checkpoint file.
+    :param resume: Keep the recorded files to skip them. Otherwise the
+      checkpoint file is truncated.
+    """
+
+    done: dict[str, str]
+
+    def __init__(self, path: PathOrStr, resume: bool = False) -> None:
+        self.done = read_checkpoint(path) if resume else {}
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        if not resume:
+            flags |= os.O_TRUNC
+        self.__fd = os.open(path, flags, 0o644)
+        if resume and not self.__ends_with_newline(path):
+            # Terminate a line that was truncated by a crash.
+            os.write(self.__fd, b"\n")
+
+    @staticmethod
+    def __ends_with_newline(path: PathOrStr) -> bool:
+        with open(path, "rb") as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def __enter__(self) -> Checkpoint:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def is_done(self, file: PathOrStr) -> bool:
+        return str(Path(file).resolve()) in self.done
+
+    def record(self, file: PathOrStr, error: Optional[str] = None) -> None:
+        """Append a processed file and its outcome."""
+        entry: dict[str, str] = {
+            "path": str(Path(file).resolve()),
+            "status": "ok" if error is None else "error",
+        }
+        if error is not None:
+            entry["error"] = error
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        os.write(self.__fd, line.encode("utf-8"))
+        self.done[entry["path"]] = entry["status"]
+
+    def close(self) -> None:
+        os.close(self.__fd)
@@ -3,22 +3,32 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import importlib
+import io
+import sys
 import textwrap
 import typing
-from typing import Sequence
+from contextlib import ExitStack, redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
 
-import shtab
-import tmep
-
-import mscxyz.export
-from mscxyz import utils
-from mscxyz.fields import FieldsManager
-from mscxyz.meta import Metatag, Vbox
-from mscxyz.rename import rename
-from mscxyz.score import Score
+from mscxyz import constants, settings, timing, utils
 from mscxyz.settings import DefaultArguments, parse_args
-from mscxyz.style import inch, mm, musical_symbol_font_faces, musical_text_font_faces
+from mscxyz.shard import Shard, list_shard, select_shard
+from mscxyz.utils import inch, mm
+
+if typing.TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from mscxyz import atomic
+    from mscxyz.backup import BackupStore
+    from mscxyz.score import Score
+
+# The modules that are only needed by some options (shtab, tmep, rename,
+# style_report, concurrent.futures) and the modules that need lxml (score,
+# meta, style, export) are imported where they are used to keep the start
+# of the command line interface fast.
 
 
 def _embed_fields(
@@ -42,15 +52,49 @@ class LineWrapRawTextHelpFormatter(argparse.RawDescriptionHelpFormatter):
 file_completers: list[argparse.Action] = []
 
 
+class _PrintCompletionAction(argparse.Action):
+    """Print the shell completion script, see :func:`shtab.add_argument_to`.
+    ``shtab`` is only imported if the completion script is requested."""
+
+    def __call__(
+        self,
+        parser: argparse.ArgumentParser,
+        namespace: argparse.Namespace,
+        values: Any,
+        option_string: str | None = None,
+    ) -> None:
+        import shtab
+
+        # Like the action of shtab, the option ends the completion in zsh.
+        shtab.OPTION_END += (_PrintCompletionAction,)  # type: ignore
+        for action in file_completers:
+            action.complete = shtab.FILE  # type: ignore
+        print(shtab.complete(parser, values))
+        parser.exit(0)
+
+
+@functools.cache
 def setup_parser() -> argparse.ArgumentParser:
+    """Build the argument parser. The parser is built only once per process,
+    the server (:mod:`mscxyz.server`) parses the arguments of each request
+    with it."""
     parser = argparse.ArgumentParser(
+        # Not the name of the process, which is the server for a request of
+        # the client.
+        prog="musescore-manager",
         description="The next generation command "
         'line tool to manipulate the XML based "*.mscX" and "*.mscZ" '
         "files of the notation software MuseScore.",
         formatter_class=LineWrapRawTextHelpFormatter,
     )
 
-    shtab.add_argument_to(parser, ["--print-completion"])
+    parser.add_argument(
+        "--print-completion",
+        choices=["bash", "zsh", "tcsh", "fish", "powershell"],
+        default=None,
+        action=_PrintCompletionAction,
+        help="print shell completion script",
+    )
 
     ###############################################################################
     # Global options
@@ -76,6 +120,16 @@ def setup_parser() -> argparse.ArgumentParser:
         help="Create a backup file.",
     )
 
+    parser.add_argument(
+        "--backup-store",
+        metavar="<directory>",
+        dest="general_backup_store",
+        help="Create the backups in a content-addressed store instead of "
+        '"*_bak.msc[xz]" files next to the scores. Identical backups are '
+        "stored once, a manifest maps the original paths to the snapshots. "
+        "Implies --backup.",
+    )
+
     parser.add_argument(
         "-d",
         "--dry-run",
@@ -84,6 +138,17 @@ def setup_parser() -> argparse.ArgumentParser:
         help="Simulate the actions.",
     )
 
+    parser.add_argument(
+        "--durability",
+        dest="general_durability",
+        choices=["none", "fsync", "batch"],
+        default="none",
+        help="The files are always replaced atomically. “none”: leave the "
+        "write-back to the operating system, “fsync”: synchronize each file "
+        "and its directory, “batch”: synchronize all written files and their "
+        "directories at the end of the run (default: none).",
+    )
+
     parser.add_argument(
         "--catch-errors",
         dest="general_catch_errors",
@@ -113,6 +178,92 @@ def setup_parser() -> argparse.ArgumentParser:
         )
     )
 
+    parser.add_argument(
+        "-J",
+        "--jobs",
+        dest="general_jobs",
+        type=int,
+        default=1,
+        metavar="<number>",
+        help="The number of worker processes to process the score files in "
+        "parallel. The largest files are processed first.",
+    )
+
+    parser.add_argument(
+        "--memory-budget",
+        dest="general_memory_budget",
+        type=float,
+        metavar="<MiB>",
+        help="Limit the estimated memory of the score files that are "
+        "processed in parallel (--jobs) at the same time.",
+    )
+
+    parser.add_argument(
+        "--expansion-factor",
+        dest="general_expansion_factor",
+        type=float,
+        default=10.0,
+        metavar="<number>",
+        help="The estimated memory of a score file as a multiple of its "
+        "size, used by --memory-budget (default: 10).",
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        dest="general_checkpoint",
+        metavar="<file>",
+        help="Append each processed score file and its outcome to this file.",
+    )
+
+    parser.add_argument(
+        "--resume",
+        dest="general_resume",
+        action="store_true",
+        help="Skip the score files that are already listed in the checkpoint "
+        "file of an interrupted run.",
+    )
+
+    parser.add_argument(
+        "--state-file",
+        dest="general_state_file",
+        metavar="<sqlite-file>",
+        help="Remember the score files of a successful run in this SQLite "
+        "database and skip them in later runs with the same arguments as long "
+        "as they are unchanged.",
+    )
+
+    parser.add_argument(
+        "-w",
+        "--watch",
+        dest="general_watch",
+        action="store_true",
+        help="Keep running after the first pass and process the score files "
+        "again that were added or modified. The same selection options apply "
+        "as in the first pass. Cannot be used with --files-from and "
+        "--shard-by-size.",
+    )
+
+    parser.add_argument(
+        "--watch-interval",
+        dest="general_watch_interval",
+        type=float,
+        default=1.0,
+        metavar="<seconds>",
+        help="The interval to poll the paths for changes if inotify is not "
+        "available (default: 1.0).",
+    )
+
+    parser.add_argument(
+        "--serve",
+        dest="general_serve",
+        nargs="?",
+        const="",
+        metavar="<socket>",
+        help="Keep a warm process that serves JSON requests on a Unix socket "
+        "(default: $XDG_RUNTIME_DIR/mscxyz.sock). Forward the command line "
+        "arguments with musescore-manager-client.",
+    )
+
     ###############################################################################
     # groups in alphabetical order
     ###############################################################################
@@ -129,7 +280,7 @@ def setup_parser() -> argparse.ArgumentParser:
         "-E",
         "--export",
         dest="export_extension",
-        choices=mscxyz.export.extensions,
+        choices=constants.export_extensions,
         metavar="<extension>",
         help="Export the scores in a format defined by the extension. The exported file "
         "has the same path, only the file extension is different. Further information "
@@ -205,6 +356,44 @@ def setup_parser() -> argparse.ArgumentParser:
         help="Print the XML markup of the score.",
     )
 
+    info.add_argument(
+        "--profile",
+        action="store_true",
+        dest="info_profile",
+        help="Measure the time of the processing phases (zip extraction, XML "
+        "parsing, serialization, export etc.) and print the totals, the 50th and "
+        "95th percentile per file and the throughput at the end.",
+    )
+
+    file_completers.append(
+        info.add_argument(
+            "--profile-json",
+            dest="info_profile_json",
+            metavar="<json-file>",
+            help="Write the profiling data into a JSON file.",
+        )
+    )
+
+    file_completers.append(
+        info.add_argument(
+            "--trace",
+            dest="info_trace",
+            metavar="<json-file>",
+            help="Write the processing phases of each file into a JSON file in "
+            "the Chrome Trace Event Format, which can be loaded in Perfetto or "
+            "chrome://tracing.",
+        )
+    )
+
+    info.add_argument(
+        "--memory-profile",
+        action="store_true",
+        dest="info_memory_profile",
+        help="Measure the memory peak (tracemalloc) and the change of the resident "
+        "set size (RSS) of each file and each processing phase. The values are "
+        "printed after each file and summarized at the end.",
+    )
+
     ###############################################################################
     # meta
     ###############################################################################
@@ -295,7 +484,8 @@ def setup_parser() -> argparse.ArgumentParser:
         action="append",
         metavar=("<field>", "<value>"),
         dest="meta_metatag",
-        help="Define the metadata in MetaTag elements." + _embed_fields(Metatag.fields),
+        help="Define the metadata in MetaTag elements."
+        + _embed_fields(constants.metatag_fields),
     )
 
     meta.add_argument(
@@ -305,7 +495,8 @@ def setup_parser() -> argparse.ArgumentParser:
         action="append",
         metavar=("<field>", "<value>"),
         dest="meta_vbox",
-        help="Define the metadata in VBox elements." + _embed_fields(Vbox.fields),
+        help="Define the metadata in VBox elements."
+        + _embed_fields(constants.vbox_fields),
     )
 
     meta.add_argument(
@@ -511,6 +702,77 @@ def setup_parser() -> argparse.ArgumentParser:
         help='Take only "*.mscx" files into account.',
     )
 
+    selection.add_argument(
+        "--files-from",
+        dest="selection_files_from",
+        metavar="<file>",
+        help="Read the paths of the score files from this file (“-” for the "
+        "standard input), one path per line, instead of scanning <path>. "
+        "The processing starts while the list is still being read. A warning "
+        "is printed for each path that does not exist.",
+    )
+
+    selection.add_argument(
+        "--null",
+        dest="selection_null",
+        action="store_true",
+        help="The paths of --files-from are separated by NUL characters "
+        "(e. g. “find -print0”, “git diff -z --name-only”).",
+    )
+
+    selection.add_argument(
+        "--exclude",
+        dest="selection_exclude",
+        action="append",
+        default=[],
+        metavar="<glob-pattern>",
+        help="Skip files and directories whose names match this pattern "
+        '(e. g. ".git", "build"). Excluded directories are not scanned. '
+        "Can be specified several times.",
+    )
+
+    selection.add_argument(
+        "--skip-backups",
+        dest="selection_skip_backups",
+        action="store_true",
+        help='Skip the backup files "*_bak.msc[xz]" created by --backup.',
+    )
+
+    selection.add_argument(
+        "--follow-symlinks",
+        dest="selection_follow_symlinks",
+        action="store_true",
+        help="Descend into symbolic links to directories. Files that are "
+        "reachable by several paths are processed once.",
+    )
+
+    selection.add_argument(
+        "--scan-threads",
+        dest="selection_scan_threads",
+        type=int,
+        default=1,
+        metavar="<number>",
+        help="Scan the directories with this number of threads, for example "
+        "on network file systems.",
+    )
+
+    selection.add_argument(
+        "--shard",
+        dest="selection_shard",
+        type=Shard.parse,
+        metavar="<I/N>",
+        help="Process only the I-th of N disjoint shards of the score files "
+        "(e. g. 1/4). The files are assigned by a stable hash of their path "
+        "relative to the search root.",
+    )
+
+    selection.add_argument(
+        "--shard-by-size",
+        dest="selection_shard_by_size",
+        action="store_true",
+        help="Balance the shards by the sizes of the score files.",
+    )
+
     ###############################################################################
     # style
     ###############################################################################
@@ -569,6 +831,24 @@ def setup_parser() -> argparse.ArgumentParser:
         help="Reset all small staffs to normal size.",
     )
 
+    file_completers.append(
+        style.add_argument(
+            "--style-report",
+            dest="style_report",
+            metavar="<reference-file>",
+            help='Group the scores by the fingerprint of their styles and list the styles of each group that differ from a reference "*.mss" style file.',
+        )
+    )
+
+    file_completers.append(
+        style.add_argument(
+            "--style-report-cache",
+            dest="style_report_cache",
+            metavar="<json-file>",
+            help="A JSON file to cache the style fingerprints of the scores by their checksums.",
+        )
+    )
+
     # font (style)
 
     font = parser.add_argument_group(
@@ -600,14 +880,14 @@ def setup_parser() -> argparse.ArgumentParser:
     font.add_argument(
         "--musical-symbol-font",
         dest="style_musical_symbol_font",
-        choices=musical_symbol_font_faces,
+        choices=constants.musical_symbol_font_faces,
         help="Set “musicalSymbolFont”, “dynamicsFont” and  “dynamicsFontFace”.",
     )
 
     font.add_argument(
         "--musical-text-font",
         dest="style_musical_text_font",
-        choices=musical_text_font_faces,
+        choices=constants.musical_text_font_faces,
         help="Set “musicalTextFont”.",
     )
 
@@ -799,9 +1079,6 @@ def setup_parser() -> argparse.ArgumentParser:
         )
     )
 
-    for action in file_completers:
-        action.complete = shtab.FILE  # type: ignore
-
     return parser
 
 
@@ -816,282 +1093,656 @@ def _print_error(error: Exception) -> None:
     )
 
 
-def get_args(cli_args: Sequence[str] | None = None) -> DefaultArguments:
-    return parse_args(setup_parser(), cli_args)
+def _describe_error(error: Exception) -> str:
+    return f"{error.__class__.__name__}: {error}"
 
 
-def execute(cli_args: Sequence[str] | None = None) -> None:
-    args = get_args(cli_args)
+_OnDone = Callable[[Path, Optional[str]], None]
+"""Called with a processed file and the description of a caught error."""
 
-    if args.style_styles_v3 or args.style_styles_v4:
 
-        def list_styles(version: int) -> None:
-            """There are many styles in MuseScore. We dynamically
-            import the module to avoid long load time"""
-            style_names = importlib.import_module("mscxyz.style_names", package=None)
-            style_names.list_styles(version)
+def get_args(cli_args: Sequence[str] | None = None) -> DefaultArguments:
+    return parse_args(setup_parser(), cli_args)
 
-        if args.style_styles_v3:
-            list_styles(3)
-            return
-        if args.style_styles_v4:
-            list_styles(4)
-            return
 
-    if args.rename_list_fields:
-        FieldsManager.print()
-        return
+@timing.timed("transforms")
+def _transform(score: Score, args: DefaultArguments) -> None:
+    """Apply the style, lyrics and meta options to a score."""
+    # Operations that traverse the whole tree are done in one walk.
+    score.rewrite(
+        clean_style=args.style_clean,
+        reset_small_staffs=args.style_reset_small_staffs,
+        collect_lyrics=bool(
+            args.lyrics_remap or args.lyrics_fix or args.lyrics_extract
+        ),
+    )
 
-    if args.rename_list_functions:
-        print(tmep.get_doc())
-        return
+    # style
 
-    selection_glob: str = args.selection_glob
-    if args.selection_mscz:
-        selection_glob = "*.mscz"
-    elif args.selection_mscx:
-        selection_glob = "*.mscx"
+    for style_name, value in args.style_value:
+        score.style.set(style_name, value)
 
-    for file in utils.list_path(src=args.path, glob=selection_glob):
-        try:
-            if args.selection_list:
-                print(file)
-                continue
+    if args.style_file:
+        score.style.load_style_file(args.style_file.name)
 
-            score = Score(file)
+    # font (style)
 
-            if args.style_list_fonts:
-                score.style.print_all_font_faces()
-                continue
+    if args.style_text_font is not None:
+        score.style.set_text_fonts(args.style_text_font)
 
-            if args.general_backup:
-                score.backup()
+    if args.style_title_font is not None:
+        score.style.set_title_fonts(args.style_title_font)
 
-            score.make_snapshot()
+    if args.style_musical_symbol_font is not None:
+        score.style.musical_symbol_font = args.style_musical_symbol_font
 
-            if args.export_compress:
-                score = Score(score.export.compress(args.export_remove_origin))
+    if args.style_musical_text_font is not None:
+        score.style.musical_text_font = args.style_musical_text_font
 
-            # style
+    # page (style)
 
-            if args.style_clean:
-                score.style.clean()
+    if args.style_staff_space is not None:
+        score.style.staff_space = args.style_staff_space
 
-            for style_name, value in args.style_value:
-                score.style.set(style_name, value)
+    if args.style_page_size is not None:
+        score.style.set_page_size(*args.style_page_size)
 
-            if args.style_file:
-                score.style.load_style_file(args.style_file.name)
+    if args.style_page_size_a4:
+        score.style.set_page_size_a4()
 
-            # font (style)
+    if args.style_page_size_letter:
+        score.style.set_page_size_letter()
 
-            if args.style_text_font is not None:
-                score.style.set_text_fonts(args.style_text_font)
+    if args.style_margin is not None:
+        score.style.margin = inch(args.style_margin)
 
-            if args.style_title_font is not None:
-                score.style.set_title_fonts(args.style_title_font)
+    # header (style)
 
-            if args.style_musical_symbol_font is not None:
-                score.style.musical_symbol_font = args.style_musical_symbol_font
+    if args.style_show_header is not None:
+        score.style.show_header = args.style_show_header
 
-            if args.style_musical_text_font is not None:
-                score.style.musical_text_font = args.style_musical_text_font
+    if args.style_header_first_page is not None:
+        score.style.header_first_page = args.style_header_first_page
 
-            # page (style)
+    if args.style_different_odd_even_header is not None:
+        score.style.header_odd_even = args.style_different_odd_even_header
 
-            if args.style_staff_space is not None:
-                score.style.staff_space = args.style_staff_space
+    if args.style_header_all:
+        score.style.set_header_all(*args.style_header_all)
 
-            if args.style_page_size is not None:
-                score.style.set_page_size(*args.style_page_size)
+    if args.style_header_odd_even:
+        score.style.set_header_odd_even(*args.style_header_odd_even)
 
-            if args.style_page_size_a4:
-                score.style.set_page_size_a4()
+    if args.style_clear_header:
+        score.style.clear_header()
 
-            if args.style_page_size_letter:
-                score.style.set_page_size_letter()
+    # footer (style)
 
-            if args.style_margin is not None:
-                score.style.margin = inch(args.style_margin)
+    if args.style_show_footer is not None:
+        score.style.show_footer = args.style_show_footer
 
-            # header (style)
+    if args.style_footer_first_page is not None:
+        score.style.footer_first_page = args.style_footer_first_page
 
-            if args.style_show_header is not None:
-                score.style.show_header = args.style_show_header
+    if args.style_different_odd_even_footer is not None:
+        score.style.footer_odd_even = args.style_different_odd_even_footer
 
-            if args.style_header_first_page is not None:
-                score.style.header_first_page = args.style_header_first_page
+    if args.style_footer_all:
+        score.style.set_footer_all(*args.style_footer_all)
 
-            if args.style_different_odd_even_header is not None:
-                score.style.header_odd_even = args.style_different_odd_even_header
+    if args.style_footer_odd_even:
+        score.style.set_footer_odd_even(*args.style_footer_odd_even)
 
-            if args.style_header_all:
-                score.style.set_header_all(*args.style_header_all)
+    if args.style_clear_footer:
+        score.style.clear_footer()
 
-            if args.style_header_odd_even:
-                score.style.set_header_odd_even(*args.style_header_odd_even)
+    # lyrics (style)
 
-            if args.style_clear_header:
-                score.style.clear_header()
+    if args.style_lyrics_font_size is not None:
+        score.style.lyrics_font_size = args.style_lyrics_font_size
 
-            # footer (style)
+    if args.style_lyrics_min_distance is not None:
+        score.style.lyrics_min_distance = args.style_lyrics_min_distance
 
-            if args.style_show_footer is not None:
-                score.style.show_footer = args.style_show_footer
+    # lyrics
 
-            if args.style_footer_first_page is not None:
-                score.style.footer_first_page = args.style_footer_first_page
+    if args.lyrics_remap:
+        score.lyrics.remap(args.lyrics_remap)
 
-            if args.style_different_odd_even_footer is not None:
-                score.style.footer_odd_even = args.style_different_odd_even_footer
+    if args.lyrics_fix:
+        score.lyrics.fix_lyrics(mscore=args.general_mscore)
 
-            if args.style_footer_all:
-                score.style.set_footer_all(*args.style_footer_all)
+    if args.lyrics_extract:
+        no = 0
+        if args.lyrics_extract != "all":
+            no = int(args.lyrics_extract)
+        score.lyrics.extract_lyrics(no)
 
-            if args.style_footer_odd_even:
-                score.style.set_footer_odd_even(*args.style_footer_odd_even)
+    # meta
 
-            if args.style_clear_footer:
-                score.style.clear_footer()
+    manipulate_meta: bool = False
+
+    if (
+        args.meta_metatag
+        or args.meta_vbox
+        or args.meta_set
+        or args.meta_clean
+        or args.meta_dist
+        or args.meta_dist
+        or args.meta_delete
+        or args.meta_sync
+        or args.meta_title
+        or args.meta_subtitle
+        or args.meta_composer
+        or args.meta_lyricist
+        or args.meta_instrument_excerpt
+    ):
+        manipulate_meta = True
+        # to get score.fields.pre
+        score.fields
+
+    if args.meta_metatag:
+        for a in args.meta_metatag:
+            field = a[0]
+            value = a[1]
+            if field not in constants.metatag_fields:
+                raise ValueError(
+                    f"Unknown field {field}. "
+                    f"Possible fields: {', '.join(constants.metatag_fields)}"
+                )
+            setattr(score.meta.metatag, field, value)
+
+    if args.meta_vbox:
+        for a in args.meta_vbox:
+            field = a[0]
+            value = a[1]
+            if field not in constants.vbox_fields:
+                raise ValueError(
+                    f"Unknown field {field}. Possible fields: {', '.join(constants.vbox_fields)}"
+                )
+            setattr(score.meta.vbox, field, value)
+
+    if args.meta_set:
+        for a in args.meta_set:
+            score.fields.set(a[0], a[1])
+
+    if args.meta_clean:
+        score.fields.clean(args.meta_clean)
+
+    if args.meta_json:
+        score.fields.export_json()
+
+    if args.meta_dist:
+        for a in args.meta_dist:
+            score.fields.distribute(source_fields=a[0], format_string=a[1])
+
+    if args.meta_delete:
+        score.meta.delete_duplicates()
+
+    if args.meta_sync:
+        score.meta.sync_fields()
+
+    if args.meta_log:
+        score.meta.write_to_log_file(args.meta_log[0], args.meta_log[1])
+
+    if args.meta_title:
+        score.meta.title = args.meta_title
+
+    if args.meta_subtitle:
+        score.meta.subtitle = args.meta_subtitle
+
+    if args.meta_composer:
+        score.meta.composer = args.meta_composer
+
+    if args.meta_lyricist:
+        score.meta.lyricist = args.meta_lyricist
+
+    if args.meta_instrument_excerpt:
+        score.meta.vbox.instrument_excerpt = args.meta_instrument_excerpt
+
+    if manipulate_meta:
+        score.fields.diff(args)
+
+
+def _process_file(
+    file: Path, args: DefaultArguments, store: Optional[BackupStore] = None
+) -> None:
+    """
+    :param store: The backup store of ``--backup-store``, which is opened
+      once per run or once per worker. ``None``: the store is opened for this
+      file only.
+    """
+    if args.selection_list:
+        print(file)
+        return
 
-            # lyrics (style)
+    from mscxyz.score import Score
 
-            if args.style_lyrics_font_size is not None:
-                score.style.lyrics_font_size = args.style_lyrics_font_size
+    score = Score(file)
 
-            if args.style_lyrics_min_distance is not None:
-                score.style.lyrics_min_distance = args.style_lyrics_min_distance
+    if args.style_list_fonts:
+        score.style.print_all_font_faces()
+        return
 
-            # small staffs
+    if args.general_backup_store:
+        if store is not None:
+            score.backup(store)
+        else:
+            from mscxyz.backup import BackupStore
 
-            if args.style_reset_small_staffs:
-                score.style.reset_small_staffs()
+            with BackupStore(args.general_backup_store) as store:
+                score.backup(store)
+    elif args.general_backup:
+        score.backup()
 
-            # lyrics
+    score.make_snapshot()
 
-            if args.lyrics_remap:
-                score.lyrics.remap(args.lyrics_remap)
+    if args.export_compress:
+        score = Score(score.export.compress(args.export_remove_origin))
 
-            if args.lyrics_fix:
-                score.lyrics.fix_lyrics(mscore=args.general_mscore)
+    _transform(score, args)
 
-            if args.lyrics_extract:
-                no = 0
-                if args.lyrics_extract != "all":
-                    no = int(args.lyrics_extract)
-                score.lyrics.extract_lyrics(no)
+    # info
 
-            # meta
+    if args.info_diff:
+        score.print_diff()
 
-            manipulate_meta: bool = False
+    if args.info_print_xml:
+        print(score.xml_string)
 
-            if (
-                args.meta_metatag
-                or args.meta_vbox
-                or args.meta_set
-                or args.meta_clean
-                or args.meta_dist
-                or args.meta_dist
-                or args.meta_delete
-                or args.meta_sync
-                or args.meta_title
-                or args.meta_subtitle
-                or args.meta_composer
-                or args.meta_lyricist
-                or args.meta_instrument_excerpt
-            ):
-                manipulate_meta = True
-                # to get score.fields.pre
-                score.fields
+    # save
 
-            if args.meta_metatag:
-                for a in args.meta_metatag:
-                    field = a[0]
-                    value = a[1]
-                    if field not in Metatag.fields:
-                        raise ValueError(
-                            f"Unknown field {field}. "
-                            f"Possible fields: {', '.join(Metatag.fields)}"
-                        )
-                    setattr(score.meta.metatag, field, value)
+    if not args.general_dry_run:
+        score.save()
 
-            if args.meta_vbox:
-                for a in args.meta_vbox:
-                    field = a[0]
-                    value = a[1]
-                    if field not in Vbox.fields:
-                        raise ValueError(
-                            f"Unknown field {field}. "
-                            f"Possible fields: {', '.join(Vbox.fields)}"
-                        )
-                    setattr(score.meta.vbox, field, value)
+    # export
 
-            if args.meta_set:
-                for a in args.meta_set:
-                    score.fields.set(a[0], a[1])
+    if args.export_extension:
+        score.export.to_extension(args.export_extension)
 
-            if args.meta_clean:
-                score.fields.clean(args.meta_clean)
+    # rename
 
-            if args.meta_json:
-                score.fields.export_json()
+    if args.rename_rename:
+        from mscxyz.rename import rename
 
-            if args.meta_dist:
-                for a in args.meta_dist:
-                    score.fields.distribute(source_fields=a[0], format_string=a[1])
+        rename(score, args.rename_rename)
 
-            if args.meta_delete:
-                score.meta.delete_duplicates()
 
-            if args.meta_sync:
-                score.meta.sync_fields()
+_worker_store: Optional[BackupStore] = None
+"""The backup store of a worker process, see :func:`_init_worker`."""
 
-            if args.meta_log:
-                score.meta.write_to_log_file(args.meta_log[0], args.meta_log[1])
 
-            if args.meta_title:
-                score.meta.title = args.meta_title
+def _init_worker(args: DefaultArguments) -> None:
+    """Pass the arguments to a worker process and open the backup store
+    once for all the files of the worker. The store commits each backup, so
+    it does not have to be closed when the worker exits."""
+    global _worker_store
+    settings.set_args(args)
+    if args.general_backup_store:
+        from mscxyz.backup import BackupStore
 
-            if args.meta_subtitle:
-                score.meta.subtitle = args.meta_subtitle
+        _worker_store = BackupStore(args.general_backup_store)
 
-            if args.meta_composer:
-                score.meta.composer = args.meta_composer
 
-            if args.meta_lyricist:
-                score.meta.lyricist = args.meta_lyricist
+def _process_file_in_worker(
+    file: Path,
+) -> tuple[str, Optional[str], tuple[list[str], atomic.Written]]:
+    """Process a score file in a worker process. The arguments are passed
+    once to each worker by the initializer of the pool.
 
-            if args.meta_instrument_excerpt:
-                score.meta.vbox.instrument_excerpt = args.meta_instrument_excerpt
+    :return: The captured output of the worker, which is printed by the main
+      process to keep the output of a file together, the description of
+      a caught error, the files that are not synchronized yet and the
+      written files (only recorded in the watch mode).
+    """
+    args = settings.get_args()
+    if args.general_watch:
+        from mscxyz import atomic
 
-            if manipulate_meta:
-                score.fields.diff(args)
+        atomic.record_writes()
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            _process_file(file, args, store=_worker_store)
+        except Exception as e:
+            if not args.general_catch_errors:
+                raise e
+            else:
+                _print_error(e)
+                return output.getvalue(), _describe_error(e), _take_written()
+    return output.getvalue(), None, _take_written()
 
-            # info
 
-            if args.info_diff:
-                score.print_diff()
+def _take_written() -> tuple[list[str], atomic.Written]:
+    """The files written with ``--durability batch`` are synchronized by the
+    main process at the end of the run. The watch mode takes the written
+    files into its snapshot."""
+    from mscxyz import atomic
 
-            if args.info_print_xml:
-                print(score.xml_string)
+    return sorted(atomic.take_pending()), atomic.take_written()
 
-            # save
 
-            if not args.general_dry_run:
-                score.save()
+def _process_files_in_parallel(
+    files: Iterable[Path], args: DefaultArguments, on_done: Optional[_OnDone] = None
+) -> None:
+    """The main process collects the results, so it is the only one that
+    writes the checkpoint and the run state. The files are dispatched the
+    largest first, see :mod:`mscxyz.schedule`."""
+    from concurrent.futures import ProcessPoolExecutor
 
-            # export
+    from mscxyz import atomic, schedule
 
-            if args.export_extension:
-                score.export.to_extension(args.export_extension)
+    memory_budget: Optional[int] = None
+    if args.general_memory_budget is not None:
+        memory_budget = int(args.general_memory_budget * 1024 * 1024)
 
-            # rename
+    with ProcessPoolExecutor(
+        max_workers=args.general_jobs, initializer=_init_worker, initargs=(args,)
+    ) as executor:
 
-            if args.rename_rename:
-                rename(score, args.rename_rename)
+        def submit(file: Path) -> Future[Any]:
+            return executor.submit(
+                timing.record,
+                timing.profiler.enabled,
+                file,
+                _process_file_in_worker,
+                file,
+                memory=timing.profiler.memory,
+            )
 
+        try:
+            for file, future in schedule.dispatch(
+                files,
+                submit,
+                memory_budget=memory_budget,
+                expansion_factor=args.general_expansion_factor,
+            ):
+                (output, error, (pending, written)), spans = future.result()
+                atomic.add_pending(pending)
+                atomic.add_written(written)
+                timing.profiler.merge(spans)
+                print(output, end="")
+                if on_done is not None:
+                    on_done(file, error)
+                if args.info_memory_profile:
+                    timing.profiler.print_file_memory(file)
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+
+
+def _process_files(
+    files: Iterable[Path], args: DefaultArguments, checkpoint: bool = True
+) -> None:
+    """
+    :param checkpoint: Use the checkpoint file. The watch mode processes
+      modified files again, so it only uses the checkpoint in the first pass.
+    """
+    callbacks: list[_OnDone] = []
+    with ExitStack() as stack:
+        if checkpoint and args.general_checkpoint:
+            from mscxyz.checkpoint import Checkpoint
+
+            log = stack.enter_context(
+                Checkpoint(args.general_checkpoint, resume=args.general_resume)
+            )
+            files = (file for file in files if not log.is_done(file))
+            callbacks.append(log.record)
+
+        if args.general_state_file:
+            from mscxyz.state import RunState
+
+            state = stack.enter_context(RunState(args.general_state_file, args))
+            files = (file for file in files if not state.is_unchanged(file))
+            callbacks.append(
+                lambda file, error: state.record(file) if error is None else None
+            )
+
+        store: Optional[BackupStore] = None
+        if args.general_backup_store and args.general_jobs == 1:
+            # The workers of a parallel run open their own store.
+            from mscxyz.backup import BackupStore
+
+            store = stack.enter_context(BackupStore(args.general_backup_store))
+
+        def on_done(file: Path, error: Optional[str]) -> None:
+            for callback in callbacks:
+                callback(file, error)
+
+        if args.general_durability == "batch":
+            from mscxyz import atomic
+
+            # Entered last, so it runs first: the written files are
+            # synchronized before the checkpoint and the run state are
+            # closed, also after an error or an interruption.
+            stack.callback(atomic.sync_pending)
+
+        _process_selected_files(files, args, on_done, store)
+
+        if args.general_state_file and args.info_verbose > 0 and state.skipped:
+            print(f"Skipped {state.skipped} unchanged files")
+
+
+def _process_selected_files(
+    files: Iterable[Path],
+    args: DefaultArguments,
+    on_done: _OnDone,
+    store: Optional[BackupStore] = None,
+) -> None:
+    if args.general_jobs > 1:
+        _process_files_in_parallel(files, args, on_done)
+        return
+    for file in files:
+        try:
+            with timing.file_scope(file):
+                _process_file(file, args, store=store)
         except Exception as e:
             if not args.general_catch_errors:
                 raise e
             else:
                 _print_error(e)
+                on_done(file, _describe_error(e))
+        else:
+            on_done(file, None)
+        if args.info_memory_profile:
+            timing.profiler.print_file_memory(file)
+
+
+def _read_files_from(files_from: str, null: bool) -> Iterator[Path]:
+    if files_from == "-":
+        yield from _warn_missing(utils.read_file_list(sys.stdin.buffer, null))
+        return
+    with open(files_from, "rb") as stream:
+        yield from _warn_missing(utils.read_file_list(stream, null))
+
+
+def _warn_missing(paths: Iterable[Path]) -> Iterator[Path]:
+    """Warn about listed paths that do not exist (a typo, a deleted file or
+    a dangling symbolic link) instead of skipping them silently."""
+    for path in paths:
+        if path.exists():
+            yield path
+        else:
+            print(
+                f"{utils.colorize('Warning', 'white', 'on_yellow')}: "
+                f"{path} does not exist",
+                file=sys.stderr,
+            )
+
+
+def _list_files(args: DefaultArguments, glob: str) -> Iterable[Path]:
+    scan: dict[str, Any] = {
+        "glob": glob,
+        "exclude": args.selection_exclude,
+        "skip_backups": args.selection_skip_backups,
+        "symlinks": "follow" if args.selection_follow_symlinks else "files",
+        "threads": args.selection_scan_threads,
+    }
+    if args.selection_files_from:
+        files = utils.list_path(
+            _read_files_from(args.selection_files_from, args.selection_null), **scan
+        )
+        if args.selection_shard:
+            return select_shard(files, args.selection_shard)
+        return files
+    if args.selection_shard:
+        return list_shard(
+            args.path,
+            args.selection_shard,
+            by_size=args.selection_shard_by_size,
+            **scan,
+        )
+    return utils.list_path(args.path, **scan)
+
+
+def _watch(selection_glob: str, args: DefaultArguments) -> None:
+    from mscxyz import atomic
+    from mscxyz.watch import Watcher
+
+    def process(files: list[Path]) -> atomic.Written:
+        _process_files(files, args, checkpoint=False)
+        return atomic.take_written()
+
+    atomic.record_writes()
+    watcher = Watcher(
+        args.path,
+        interval=args.general_watch_interval,
+        list_files=lambda: _list_files(args, selection_glob),
+    )
+    print(f"Watching {', '.join(map(str, args.path))}")
+    try:
+        watcher.run(process)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        atomic.record_writes(False)
+
+
+def close_files(args: DefaultArguments) -> None:
+    """Close the files opened by the parser (``--style-file``)."""
+    for value in vars(args).values():
+        if isinstance(value, io.IOBase) and value not in (sys.stdin, sys.stdout):
+            value.close()
+
+
+def execute_args(args: DefaultArguments) -> None:
+    """Execute the parsed arguments of :func:`get_args`."""
+    # The scope protects the options from executions in other threads.
+    with settings.use_args(args):
+        _execute(args)
+
+
+def execute(cli_args: Sequence[str] | None = None) -> None:
+    """Execute the command line arguments in the scope of the current thread
+    (see :func:`mscxyz.settings.use_args`), without changing the options of
+    the process."""
+    args = get_args(cli_args)
+    try:
+        execute_args(args)
+    finally:
+        close_files(args)
+
+
+def main() -> None:
+    """The entry point ``musescore-manager``. The command line arguments are
+    also the options of the whole process."""
+    args = get_args()
+    settings.set_args(args)
+    try:
+        execute_args(args)
+    finally:
+        close_files(args)
+
+
+def _execute(args: DefaultArguments) -> None:
+    if args.general_resume and not args.general_checkpoint:
+        setup_parser().error("--resume requires --checkpoint")
+
+    if args.selection_files_from and args.selection_shard_by_size:
+        setup_parser().error("--shard-by-size cannot be used with --files-from")
+
+    if args.general_watch and args.selection_files_from:
+        setup_parser().error("--watch cannot be used with --files-from")
+
+    if args.general_watch and args.selection_shard_by_size:
+        # The shards change with the sizes of the files.
+        setup_parser().error("--watch cannot be used with --shard-by-size")
+
+    if args.general_serve is not None:
+        from mscxyz import server
+
+        server.serve(args.general_serve or None)
+        return
+
+    if args.style_styles_v3 or args.style_styles_v4:
+
+        def list_styles(version: int) -> None:
+            """There are many styles in MuseScore. We dynamically
+            import the module to avoid long load time"""
+            style_names = importlib.import_module("mscxyz.style_names", package=None)
+            style_names.list_styles(version)
+
+        if args.style_styles_v3:
+            list_styles(3)
+            return
+        if args.style_styles_v4:
+            list_styles(4)
+            return
+
+    if args.rename_list_fields:
+        from mscxyz.fields import FieldsManager
+
+        FieldsManager.print()
+        return
+
+    if args.rename_list_functions:
+        import tmep
+
+        print(tmep.get_doc())
+        return
+
+    selection_glob: str = args.selection_glob
+    if args.selection_mscz:
+        selection_glob = "*.mscz"
+    elif args.selection_mscx:
+        selection_glob = "*.mscx"
+
+    if (
+        args.info_profile
+        or args.info_profile_json
+        or args.info_trace
+        or args.info_memory_profile
+    ):
+        timing.enable(memory=args.info_memory_profile)
+
+    try:
+        if args.style_report:
+            from mscxyz import style_report
+
+            style_report.print_report(
+                style_report.create_report(
+                    _list_files(args, selection_glob),
+                    jobs=args.general_jobs,
+                    cache_file=args.style_report_cache,
+                ),
+                style_report.read_style_file(args.style_report),
+            )
+        else:
+            _process_files(_list_files(args, selection_glob), args)
+            if args.general_watch:
+                _watch(selection_glob, args)
+    finally:
+        if args.info_profile:
+            timing.print_summary()
+
+        if args.info_profile_json:
+            timing.profiler.write_json(args.info_profile_json)
+
+        if args.info_trace:
+            timing.profiler.write_trace(args.info_trace)
+
+        if args.info_memory_profile:
+            timing.print_memory_summary()
+
+        timing.profiler.disable()
@@ -0,0 +1,97 @@
+"""Constants that the command line interface needs to build its help
+texts and choices. The module imports nothing, so that the command line
+interface can start without loading ``lxml``."""
+
+metatag_fields = (
+    "arranger",
+    "audio_com_url",
+    "composer",
+    "copyright",
+    "creation_date",
+    "lyricist",
+    "movement_number",
+    "movement_title",
+    "msc_version",
+    "platform",
+    "poet",
+    "source",
+    "source_revision_id",
+    "subtitle",
+    "translator",
+    "work_number",
+    "work_title",
+)
+"""The fields of :class:`mscxyz.meta.Metatag`."""
+
+vbox_fields = (
+    "composer",
+    "instrument_excerpt",
+    "lyricist",
+    "subtitle",
+    "title",
+)
+"""The fields of :class:`mscxyz.meta.Vbox`."""
+
+musical_symbol_font_faces = (
+    "Leland",
+    "Bravura",
+    "Emmentaler",
+    # "MScore",
+    "Gonville",
+    # "Gootville",
+    "MuseJazz",
+    "Petaluma",
+    "Finale Maestro",
+    "Finale Broadway",
+)
+"""
+Musical symbol font faces
+
+:see: `MuseScore C++ source code: engravingmodule.cpp lines 120-127 <https://github.com/musescore/MuseScore/blob/940f5ce4c83c9168e3be0e1509664a7abffcf9e8/src/engraving/engravingmodule.cpp#L120-L127>`_
+"""
+
+musical_text_font_faces = (
+    "Leland Text",
+    "Bravura Text",
+    "Emmentaler Text",  # -> MScore Text
+    # "MScore Text",
+    "Gonville Text",  # -> Gootville Text
+    # "Gootville Text",
+    "MuseJazz Text",
+    "Petaluma Text",
+    "Finale Maestro Text",
+    "Finale Broadway Text",
+)
+"""
+Musical text font faces
+
+:see: `MuseScore C++ source code: editstyle.cpp lines 1966-1973 <https://github.com/musescore/MuseScore/blob/940f5ce4c83c9168e3be0e1509664a7abffcf9e8/src/notation/view/widgets/editstyle.cpp#L1966-L1973>`_
+"""
+
+export_extensions = (
+    # Vendor specific formats
+    "mscz",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/notation/notationmodule.cpp#L128
+    "mscx",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/notation/notationmodule.cpp#L129
+    "spos",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/notation/notationmodule.cpp#L126
+    "mpos",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/notation/notationmodule.cpp#L127
+    # Graphical formats
+    "pdf",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/imagesexport/imagesexportmodule.cpp#L54
+    "svg",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/imagesexport/imagesexportmodule.cpp#L55
+    "png",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/imagesexport/imagesexportmodule.cpp#L56
+    # Audio formats
+    "wav",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/audioexport/audioexportmodule.cpp#L56
+    "mp3",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/audioexport/audioexportmodule.cpp#L57
+    "ogg",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/audioexport/audioexportmodule.cpp#L58
+    "flac",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/audioexport/audioexportmodule.cpp#L59
+    # Hybrid formats
+    "mid",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/midi/midimodule.cpp#L59
+    "midi",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/midi/midimodule.cpp#L59
+    "kar",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/midi/midimodule.cpp#L59
+    # Score formats
+    "musicxml",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/musicxml/musicxmlmodule.cpp#L71
+    "xml",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/musicxml/musicxmlmodule.cpp#L71
+    "mxl",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/musicxml/musicxmlmodule.cpp#L71
+    "brf",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/braille/braillemodule.cpp#L53
+    "mei",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/mei/meimodule.cpp#L58
+)
+"""Supported file extensions for export in MuseScore version 4."""
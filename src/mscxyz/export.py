@@ -3,39 +3,13 @@ from __future__ import annotations
 import typing
 from pathlib import Path
 
-from mscxyz import utils
+from mscxyz import atomic, constants, timing, utils
 
 if typing.TYPE_CHECKING:
     from mscxyz.score import Score
 
 
-extensions = (
-    # Vendor specific formats
-    "mscz",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/notation/notationmodule.cpp#L128
-    "mscx",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/notation/notationmodule.cpp#L129
-    "spos",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/notation/notationmodule.cpp#L126
-    "mpos",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/notation/notationmodule.cpp#L127
-    # Graphical formats
-    "pdf",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/imagesexport/imagesexportmodule.cpp#L54
-    "svg",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/imagesexport/imagesexportmodule.cpp#L55
-    "png",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/imagesexport/imagesexportmodule.cpp#L56
-    # Audio formats
-    "wav",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/audioexport/audioexportmodule.cpp#L56
-    "mp3",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/audioexport/audioexportmodule.cpp#L57
-    "ogg",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/audioexport/audioexportmodule.cpp#L58
-    "flac",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/audioexport/audioexportmodule.cpp#L59
-    # Hybrid formats
-    "mid",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/midi/midimodule.cpp#L59
-    "midi",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/midi/midimodule.cpp#L59
-    "kar",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/midi/midimodule.cpp#L59
-    # Score formats
-    "musicxml",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/musicxml/musicxmlmodule.cpp#L71
-    "xml",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/musicxml/musicxmlmodule.cpp#L71
-    "mxl",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/musicxml/musicxmlmodule.cpp#L71
-    "brf",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/braille/braillemodule.cpp#L53
-    "mei",  # https://github.com/musescore/MuseScore/blob/75fe9addbfd1b2588f4b817668e396a317131f8b/src/importexport/mei/meimodule.cpp#L58
-)
-"""Supported file extensions for export in MuseScore version 4."""
+extensions = constants.export_extensions
 
 
 class Export:
@@ -44,14 +18,7 @@ class Export:
     def __init__(self, score: "Score") -> None:
         self.score = score
 
-    def to_extension(self, extension: str = "pdf") -> Path:
-        """Export the score to the specifed file type.
-
-        :param extension: The extension (default: pdf)
-
-        :return: The path of the exported file.
-        """
-
+    def __get_dest(self, extension: str) -> Path:
         extension = extension.lower()
 
         if extension not in extensions:
@@ -59,7 +26,17 @@ class Export:
                 f"Unsupported extension: {extension}! Supported extensions: {extensions}"
             )
 
-        dest: Path = self.score.change_path(extension=extension)
+        return self.score.change_path(extension=extension)
+
+    @timing.timed("export")
+    def to_extension(self, extension: str = "pdf") -> Path:
+        """Export the score to the specifed file type.
+
+        :param extension: The extension (default: pdf)
+
+        :return: The path of the exported file.
+        """
+        dest: Path = self.__get_dest(extension)
         utils.execute_musescore(
             [
                 "--export-to",
@@ -67,6 +44,22 @@ class Export:
                 str(self.score.path),
             ]
         )
+        atomic.note_write(dest)
+        return dest
+
+    async def ato_extension(self, extension: str = "pdf") -> Path:
+        """The asyncio counterpart of :meth:`to_extension`. The MuseScore
+        executable is killed if the awaiting task is cancelled.
+
+        :param extension: The extension (default: pdf)
+
+        :return: The path of the exported file.
+        """
+        from mscxyz import aio
+
+        dest: Path = self.__get_dest(extension)
+        await aio.execute_musescore(["--export-to", str(dest), str(self.score.path)])
+        atomic.note_write(dest)
         return dest
 
     def compress(self, remove_origin: bool = False) -> Path:
@@ -82,14 +75,15 @@ class Export:
             self.score.path.unlink()
         return new_path
 
-    def reload(self, save: bool = False) -> Export:
+    def reload(self, save: bool = False, in_memory: bool = False) -> Export:
         """
         Reload the MuseScore file.
 
         :param save: Whether to save the changes before reloading. Default is False.
+        :param in_memory: Load the serialized score instead of the file.
 
         :return: The reloaded Export object.
 
         :see: :meth:`mscxyz.score.Score.reload`
         """
-        return self.score.reload(save).export
+        return self.score.reload(save, in_memory).export
@@ -9,8 +9,6 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Iterator, Mapping, Sequence, Union
 
-import tmep
-
 from mscxyz.meta import FormatStringNoFieldError, UnmatchedFormatStringError
 from mscxyz.settings import DefaultArguments
 from mscxyz.utils import Color, colorize
@@ -327,6 +325,8 @@ class FieldsManager:
             if obj is None:
                 raise Exception(f"Cannot set attribute {field.attr_path}")
         if value is not None and isinstance(value, str) and "$" in value:
+            import tmep
+
             value = tmep.parse(value, self.export_to_dict())
         setattr(obj, last, value)
 
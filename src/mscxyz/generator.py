@@ -0,0 +1,306 @@
+"""Generate synthetic MuseScore files of any size for benchmarks and stress
+tests.
+
+.. code-block:: python
+
+    from mscxyz.generator import ScoreSpec, generate_score, generate_tree
+
+    spec = ScoreSpec(version=4, staffs=40, measures=5000, verses=8)
+    generate_score("big.mscz", spec)
+    generate_tree("corpus", count=100_000, spec=ScoreSpec(measures=8))
+"""
+
+from __future__ import annotations
+
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal, Optional
+
+from lxml.etree import SubElement, _Element, indent
+
+from mscxyz.style_names import style_3_names, style_4_names
+from mscxyz.utils import PathOrStr
+from mscxyz.xml import XmlManipulator
+
+Extension = Literal["mscx", "mscz"]
+
+_versions: dict[int, tuple[str, str, str]] = {
+    2: ("2.06", "2.0.3", "3543170"),
+    3: ("3.01", "3.2.3", "d2d863f"),
+    4: ("4.20", "4.2.0", "eb8d33c"),
+}
+"""version -> (file format version, program version, program revision)"""
+
+_durations: dict[int, str] = {
+    1: "whole",
+    2: "half",
+    4: "quarter",
+    8: "eighth",
+    16: "16th",
+}
+"""notes per measure -> duration type"""
+
+_pitches: tuple[tuple[int, int], ...] = (
+    (60, 14),
+    (62, 16),
+    (64, 18),
+    (65, 13),
+    (67, 15),
+    (69, 17),
+    (71, 19),
+    (72, 14),
+)
+"""The C major scale as pairs of MIDI pitch and tonal pitch class."""
+
+_style_values: dict[str, str] = {
+    "pageWidth": "8.27",
+    "pageHeight": "11.69",
+    "pagePrintableWidth": "7.4826",
+    "Spatium": "1.74978",
+}
+
+
+@dataclass
+class ScoreSpec:
+    """The parameters of a synthetic score."""
+
+    version: int = 4
+    """The major MuseScore version: ``2``, ``3`` or ``4``."""
+
+    staffs: int = 1
+
+    measures: int = 4
+
+    notes_per_measure: int = 4
+    """``1``, ``2``, ``4``, ``8`` or ``16`` notes in a 4/4 measure."""
+
+    verses: int = 0
+    """The number of lyric verses below each note."""
+
+    meta_tags: dict[str, str] = field(
+        default_factory=lambda: {
+            "arranger": "",
+            "composer": "Composer",
+            "copyright": "",
+            "creationDate": "",
+            "lyricist": "Lyricist",
+            "movementNumber": "",
+            "movementTitle": "",
+            "platform": "Linux",
+            "poet": "",
+            "source": "",
+            "translator": "",
+            "workNumber": "",
+            "workTitle": "Title",
+        }
+    )
+    """The ``metaTag`` elements by their ``name`` attribute."""
+
+    vbox_texts: dict[str, str] = field(
+        default_factory=lambda: {"title": "Title", "composer": "Composer"}
+    )
+    """The texts of the first vertical frame by their style name, for example
+    ``title``, ``subtitle``, ``composer`` or ``lyricist``."""
+
+    style_size: int = 50
+    """The number of elements in the ``<Style>`` element."""
+
+
+def _sub(parent: _Element, tag: str, text: Optional[str] = None) -> _Element:
+    element = SubElement(parent, tag)
+    if text is not None:
+        element.text = text
+    return element
+
+
+def generate_style(spec: ScoreSpec) -> _Element:
+    """Generate the ``<Style>`` element with ``spec.style_size`` children."""
+    style = XmlManipulator.create_element("Style")
+    names = style_4_names if spec.version == 4 else style_3_names
+    for i in range(spec.style_size):
+        name = names[i] if i < len(names) else f"style{i}"
+        _sub(style, name, _style_values.get(name, "1"))
+    return style
+
+
+def _add_measure(
+    staff: _Element, spec: ScoreSpec, measure_number: int, staff_number: int
+) -> None:
+    measure = _sub(staff, "Measure")
+    if spec.version == 2:
+        measure.set("number", str(measure_number))
+        voice = measure
+    else:
+        voice = _sub(measure, "voice")
+    if measure_number == 1:
+        time_sig = _sub(voice, "TimeSig")
+        _sub(time_sig, "sigN", "4")
+        _sub(time_sig, "sigD", "4")
+    duration = _durations[spec.notes_per_measure]
+    for i in range(spec.notes_per_measure):
+        chord = _sub(voice, "Chord")
+        _sub(chord, "durationType", duration)
+        if staff_number == 1:
+            for verse in range(spec.verses):
+                lyrics = _sub(chord, "Lyrics")
+                if verse > 0:
+                    _sub(lyrics, "no", str(verse))
+                _sub(lyrics, "text", f"la{verse + 1}")
+        pitch, tpc = _pitches[(measure_number + i) % len(_pitches)]
+        note = _sub(chord, "Note")
+        _sub(note, "pitch", str(pitch))
+        _sub(note, "tpc", str(tpc))
+
+
+def generate_xml(spec: ScoreSpec, embed_style: bool = True) -> _Element:
+    """
+    Generate the root element ``<museScore>`` of a score.
+
+    :param spec: The parameters of the score.
+    :param embed_style: Embed the ``<Style>`` element into the score. MuseScore
+      4 stores the style in a separate file in the ``*.mscz`` files.
+    """
+    if spec.version not in _versions:
+        raise ValueError(f"Unsupported version {spec.version}. Possible: 2, 3, 4")
+    if spec.notes_per_measure not in _durations:
+        raise ValueError(
+            f"Unsupported number of notes per measure {spec.notes_per_measure}. "
+            f"Possible: {', '.join(map(str, _durations))}"
+        )
+    file_version, program_version, program_revision = _versions[spec.version]
+    root = XmlManipulator.create_element("museScore", {"version": file_version})
+    _sub(root, "programVersion", program_version)
+    _sub(root, "programRevision", program_revision)
+    score = _sub(root, "Score")
+    _sub(score, "Division", "480")
+    if embed_style:
+        score.append(generate_style(spec))
+    for name, value in spec.meta_tags.items():
+        _sub(score, "metaTag", value).set("name", name)
+
+    for staff_number in range(1, spec.staffs + 1):
+        part = _sub(score, "Part")
+        staff = _sub(part, "Staff")
+        staff.set("id", str(staff_number))
+        staff_type = _sub(staff, "StaffType")
+        staff_type.set("group", "pitched")
+        _sub(staff_type, "name", "stdNormal")
+        _sub(part, "trackName", "Piano")
+        instrument = _sub(part, "Instrument")
+        _sub(instrument, "longName", "Piano")
+        _sub(instrument, "shortName", "Pno.")
+
+    for staff_number in range(1, spec.staffs + 1):
+        staff = _sub(score, "Staff")
+        staff.set("id", str(staff_number))
+        if staff_number == 1 and spec.vbox_texts:
+            vbox = _sub(staff, "VBox")
+            _sub(vbox, "height", "10")
+            for style_name, text in spec.vbox_texts.items():
+                text_element = _sub(vbox, "Text")
+                if spec.version in (2, 3):
+                    style_name = style_name.title()
+                _sub(text_element, "style", style_name)
+                _sub(text_element, "text", text)
+        for measure_number in range(1, spec.measures + 1):
+            _add_measure(staff, spec, measure_number, staff_number)
+
+    indent(root, space="  ")
+    return root
+
+
+def generate_score(dest: PathOrStr, spec: Optional[ScoreSpec] = None) -> Path:
+    """
+    Write a synthetic score file.
+
+    :param dest: The path of the file. The extension ``.mscx`` or ``.mscz``
+      determines the format.
+    :param spec: The parameters of the score.
+
+    :return: The path of the file.
+    """
+    if spec is None:
+        spec = ScoreSpec()
+    path = Path(dest)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".mscx":
+        XmlManipulator(generate_xml(spec)).write(path)
+        return path
+    if path.suffix != ".mscz":
+        raise ValueError(f"Unsupported extension “{path.suffix}”: mscx or mscz")
+
+    separate_style = spec.version == 4
+    score_file = f"{path.stem}.mscx"
+    root_files = [score_file]
+    if separate_style:
+        root_files.insert(0, "score_style.mss")
+    container = XmlManipulator.create_element("container")
+    rootfiles = _sub(container, "rootfiles")
+    for root_file in root_files:
+        _sub(rootfiles, "rootfile").set("full-path", root_file)
+    indent(container, space="  ")
+
+    xml = XmlManipulator(generate_xml(spec, embed_style=not separate_style))
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zip:
+        zip.writestr("META-INF/container.xml", xml.tostring(container))
+        zip.writestr(score_file, xml.tostring())
+        if separate_style:
+            style_root = XmlManipulator.create_element(
+                "museScore", {"version": _versions[4][0]}
+            )
+            style_root.append(generate_style(spec))
+            indent(style_root, space="  ")
+            zip.writestr("score_style.mss", xml.tostring(style_root))
+    return path
+
+
+def generate_tree(
+    dest: PathOrStr,
+    count: int,
+    spec: Optional[ScoreSpec] = None,
+    extension: Extension = "mscz",
+    files_per_dir: int = 100,
+) -> list[Path]:
+    """
+    Fill a directory tree with synthetic scores.
+
+    The scores are distributed into nested directories with at most
+    ``files_per_dir`` entries each, for example ``dest/000/012/score-1234.mscz``.
+
+    :param dest: The root directory of the tree.
+    :param count: The number of score files.
+    :param spec: The parameters of the scores.
+    :param extension: ``mscx`` or ``mscz``
+    :param files_per_dir: The maximum number of entries of a directory.
+
+    :return: The paths of the generated files.
+    """
+    if spec is None:
+        spec = ScoreSpec()
+    root = Path(dest)
+    depth = 0
+    capacity = files_per_dir
+    while capacity < count:
+        capacity *= files_per_dir
+        depth += 1
+
+    # Generate the markup only once and copy the bytes.
+    template = root / f".template.{extension}"
+    generate_score(template, spec)
+    data = template.read_bytes()
+    template.unlink()
+
+    width = len(str(files_per_dir - 1))
+    paths: list[Path] = []
+    for i in range(count):
+        parts: list[str] = []
+        rest = i // files_per_dir
+        for _ in range(depth):
+            parts.insert(0, str(rest % files_per_dir).zfill(width))
+            rest //= files_per_dir
+        path = root.joinpath(*parts, f"score-{i}.{extension}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        paths.append(path)
+    return paths
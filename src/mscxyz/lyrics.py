@@ -3,9 +3,12 @@
 from __future__ import annotations
 
 import typing
+from typing import Optional
 
 from lxml.etree import _Element
 
+from mscxyz.xml import Rule
+
 if typing.TYPE_CHECKING:
     from mscxyz.score import Score
 
@@ -20,12 +23,34 @@ class Lyrics:
 
     elements: list[NumberedLyricsElement]
 
-    def __init__(self, score: "Score") -> None:
+    def __init__(
+        self, score: "Score", elements: Optional[list[NumberedLyricsElement]] = None
+    ) -> None:
+        """
+        :param score: The score.
+        :param elements: Lyrics elements already collected by the rule
+          :meth:`collect_rule`. If omitted, the elements are collected by
+          traversing the XML tree.
+        """
         self.score = score
-        self.elements = self.__renumber()
-
-    def __renumber(self) -> list[NumberedLyricsElement]:
-        """Normalize numbering of verses to natural numbering (1,2,3).
+        if elements is None:
+            elements = []
+            self.score.xml.apply_rules(Lyrics.collect_rule(elements))
+        self.elements = elements
+
+    @staticmethod
+    def collect_rule(elements: list[NumberedLyricsElement]) -> Rule:
+        """A rule that appends all numbered ``<Lyrics>`` elements to ``elements``,
+        see :meth:`mscxyz.xml.XmlManipulator.apply_rules`."""
+        return Rule(
+            "Lyrics",
+            action=lambda lyric: elements.append(Lyrics.number_element(lyric)),
+        )
+
+    @staticmethod
+    def number_element(lyric: _Element) -> NumberedLyricsElement:
+        """Number a ``<Lyrics>`` element. The numbering of verses is normalized
+        to natural numbering (1,2,3).
 
         From
 
@@ -54,21 +79,17 @@ class Lyrics:
                         {'number': 3, 'element': lyrics_tag},
                 ]
         """
-        lyrics: list[NumberedLyricsElement] = []
-        for lyric in self.score.xml_root.findall(".//Lyrics"):
-            numbered = NumberedLyricsElement()
-            numbered.element = lyric
-            number: _Element | None = lyric.find("no")
-
-            if number is not None and number.text is not None:
-                no = int(number.text) + 1
-            else:
-                no = 1
-            numbered.no = no
+        numbered = NumberedLyricsElement()
+        numbered.element = lyric
+        number: _Element | None = lyric.find("no")
 
-            lyrics.append(numbered)
+        if number is not None and number.text is not None:
+            no = int(number.text) + 1
+        else:
+            no = 1
+        numbered.no = no
 
-        return lyrics
+        return numbered
 
     @property
     def number_of_verses(self) -> int:
@@ -93,6 +114,7 @@ class Lyrics:
         return max_lyric
 
     def remap(self, remap_string: str) -> None:
+        self.score.xml.check_writable()
         for pair in remap_string.split(","):
             old = pair.split(":")[0]
             new = pair.split(":")[1]
@@ -108,15 +130,15 @@ class Lyrics:
         :param number: The number of the lyrics verse starting by 1
         """
 
-        score = self.score.new()
+        score = self.score.copy()
 
         for element in score.lyrics.elements:
             tag = element.element
 
             if element.no != number:
-                self.score.xml.remove(tag)
+                score.xml.remove(tag)
             elif number != 1:
-                self.score.xml.set_text("no", 0, tag)
+                score.xml.set_text("no", 0, tag)
 
         ext: str = "." + score.extension
         new_name: str = str(score.path).replace(ext, "_" + str(number) + ext)
@@ -168,6 +190,7 @@ class Lyrics:
                 </Lyrics>
         """
 
+        self.score.xml.check_writable()
         syllabic = False
         for element in self.elements:
             if element.no == verse_number:
@@ -202,14 +225,15 @@ class Lyrics:
 
         self.score.save(mscore=mscore)
 
-    def reload(self, save: bool = False) -> Lyrics:
+    def reload(self, save: bool = False, in_memory: bool = False) -> Lyrics:
         """
         Reload the MuseScore file.
 
         :param save: Whether to save the changes before reloading. Default is False.
+        :param in_memory: Load the serialized score instead of the file.
 
         :return: The reloaded Lyrics object.
 
         :see: :meth:`mscxyz.score.Score.reload`
         """
-        return self.score.reload(save).lyrics
+        return self.score.reload(save, in_memory).lyrics
@@ -5,24 +5,36 @@ from __future__ import annotations
 import typing
 from typing import Optional
 
-import tmep
 from lxml.etree import Element, _Element
 
+from mscxyz import constants
+from mscxyz.xml import ReadOnlyError
+
 if typing.TYPE_CHECKING:
     from mscxyz.score import Score
 
 
 class UnmatchedFormatStringError(Exception):
     def __init__(self, format_string: str, input_string: str) -> None:
+        self.format_string = format_string
+        self.input_string = input_string
         self.msg = f"Your format string “{format_string}” doesn’t match on this input string: “{input_string}”"
         Exception.__init__(self, self.msg)
 
+    def __reduce__(self) -> tuple[type, tuple[str, str]]:
+        # to pass the error from a worker process to the main process
+        return (self.__class__, (self.format_string, self.input_string))
+
 
 class FormatStringNoFieldError(Exception):
     def __init__(self, format_string: str) -> None:
+        self.format_string = format_string
         self.msg = f"No fields found in your format string “{format_string}”!"
         Exception.__init__(self, self.msg)
 
+    def __reduce__(self) -> tuple[type, tuple[str]]:
+        return (self.__class__, (self.format_string,))
+
 
 class Metatag:
     """
@@ -76,25 +88,7 @@ class Metatag:
                     <metaTag name="workTitle">Untitled score</metaTag>
     """
 
-    fields = (
-        "arranger",
-        "audio_com_url",
-        "composer",
-        "copyright",
-        "creation_date",
-        "lyricist",
-        "movement_number",
-        "movement_title",
-        "msc_version",
-        "platform",
-        "poet",
-        "source",
-        "source_revision_id",
-        "subtitle",
-        "translator",
-        "work_number",
-        "work_title",
-    )
+    fields = constants.metatag_fields
 
     score: "Score"
 
@@ -104,12 +98,14 @@ class Metatag:
         self.score = score
         self.xml_root = score.xml_root
 
-    def __get_element(self, field: str) -> _Element:
-        score_element: _Element = self.score.xml.find_safe("Score")
+    def __get_element(self, field: str) -> Optional[_Element]:
+        """The element is created if it doesn’t exist, except in a read-only
+        score."""
         element: _Element | None = self.score.xml.xpath(
             '//metaTag[@name="' + field + '"]'
         )
-        if element is None:
+        if element is None and not self.score.readonly:
+            score_element: _Element = self.score.xml.find_safe("Score")
             _, element = self.score.xml.create_sub_element(
                 score_element, "metaTag", "", attrib={"name": field}
             )
@@ -120,8 +116,10 @@ class Metatag:
         return self.score.xml.get_text(element)
 
     def __set_text(self, field: str, value: Optional[str]) -> None:
-        element: _Element = self.__get_element(field)
-        element.text = value
+        self.score.xml.check_writable()
+        element: _Element | None = self.__get_element(field)
+        if element is not None:
+            element.text = value
 
     @property
     def arranger(self) -> Optional[str]:
@@ -408,6 +406,8 @@ class VboxText:
     :param style: The style name used in the ``<style>...</style>`` element.
     :param parent_vbox: The parent ``<VBox>`` element where ``<Text>`` lives.
     :param container: The existing ``<Text>`` element or ``None``.
+    :param readonly: Raise a :class:`mscxyz.xml.ReadOnlyError` on each
+      modification.
     """
 
     __parent_vbox: _Element
@@ -418,8 +418,10 @@ class VboxText:
         style: str,
         parent_vbox: _Element,
         container: Optional[_Element],
+        readonly: bool = False,
     ) -> None:
         self.__style = style
+        self.__readonly = readonly
         self.__parent_vbox = parent_vbox
         self.__container = container
         self.__style_element = None
@@ -438,6 +440,10 @@ class VboxText:
         """
         return self.__container is not None
 
+    def __check_writable(self) -> None:
+        if self.__readonly:
+            raise ReadOnlyError("The XML tree is read-only")
+
     def reset_style(self) -> None:
         """Reset the text style overrides.
 
@@ -468,6 +474,7 @@ class VboxText:
             </Text>
 
         """
+        self.__check_writable()
         if self.__container is None:
             return
         for element in list(self.__container):
@@ -479,6 +486,7 @@ class VboxText:
     def remove(self) -> None:
         """Remove the container element ``<Text>...</Text>`` from the
         parent ``<Vbox>...</Vbox>`` element."""
+        self.__check_writable()
         if self.__container is not None:
             self.__parent_vbox.remove(self.__container)
             self.__container = None
@@ -496,6 +504,7 @@ class VboxText:
         """The surrounding text element in uppercase letters
         (``<Text>...</Text>``)."""
         if self.__container is None:
+            self.__check_writable()
             self.__container = Element("Text")
             self.__parent_vbox.append(self.__container)
         return self.__container
@@ -525,6 +534,7 @@ class VboxText:
 
     @style.setter
     def style(self, style: str) -> None:
+        self.__check_writable()
         self.__style = style
         self._style_element.text = style
 
@@ -535,6 +545,7 @@ class VboxText:
         """The text element in lowercase letters inside the container
         (``<text>...</text>``)."""
         if self.__text_element is None:
+            self.__check_writable()
             self.__text_element = Element("text")
             self._container.append(self.__text_element)
         return self.__text_element
@@ -545,7 +556,7 @@ class VboxText:
         The plain text content.
 
         Setting ``text`` to ``None`` removes the entire ``<Text>`` container."""
-        if self.__container is None:
+        if self.__container is None or self.__text_element is None:
             return None
         # To get the content of all child elements,
         # for example: ``<text><b><i><font face="FreeSans"/>Untitled score</i></b></text>``
@@ -566,6 +577,7 @@ class VboxText:
 
     @text.setter
     def text(self, content: Optional[str]) -> None:
+        self.__check_writable()
         if content is None:
             self.remove()
             return None
@@ -680,13 +692,7 @@ class Vbox:
     # as base64: b8tRS7h4TJ2Vt43Dp85v2A
     # as uuid  : 6fcb514b-b878-4c9d-95b7-8dc3a7ce6fd8
 
-    fields = (
-        "composer",
-        "instrument_excerpt",
-        "lyricist",
-        "subtitle",
-        "title",
-    )
+    fields = constants.vbox_fields
 
     _score: "Score"
 
@@ -699,9 +705,12 @@ class Vbox:
         vbox = self._score.xml.xpath(xpath + "/VBox")
         if vbox is None:
             vbox, _ = self._score.xml.create_sub_element("VBox", "height", "10")
-            self._score.xml.xpath_safe(xpath).insert(0, vbox)
+            # A read-only score gets a detached, empty VBox.
+            if not self._score.readonly:
+                self._score.xml.xpath_safe(xpath).insert(0, vbox)
         self._vbox = vbox
-        self.migrate_lyricist()
+        if not self._score.readonly:
+            self.migrate_lyricist()
 
     def __normalize_style_name(self, style: str) -> str:
         """
@@ -735,6 +744,7 @@ class Vbox:
             self.__normalize_style_name(style_name),
             self._vbox,
             self.__get_container(style_name),
+            self._score.readonly,
         )
 
     __title: Optional[VboxText] = None
@@ -1012,6 +1022,9 @@ class Vbox:
 
         If this field is ``None``, the corresponding XML element does not exist.
         """
+        if not self.lyricist_element.exists():
+            # The lyricist is not migrated in a read-only score.
+            return self._legacy_lyricist_element.text
         return self.lyricist_element.text
 
     @lyricist.setter
@@ -1116,6 +1129,8 @@ class Meta:
         :param log_file: Path of the output log file.
         :param format_string: Template string parsed with exported fields.
         """
+        import tmep
+
         log = open(log_file, "w")
         log.write(tmep.parse(format_string, self.score.fields.export_to_dict()) + "\n")
         log.close()
@@ -1149,17 +1164,18 @@ class Meta:
         if self.subtitle == self.title:
             self.subtitle = None
 
-    def reload(self, save: bool = False) -> Meta:
+    def reload(self, save: bool = False, in_memory: bool = False) -> Meta:
         """
         Reload the MuseScore file.
 
         :param save: Whether to save the changes before reloading. Default is False.
+        :param in_memory: Load the serialized score instead of the file.
 
         :return: The reloaded Meta object.
 
         :see: :meth:`mscxyz.Score.reload`
         """
-        return self.score.reload(save).meta
+        return self.score.reload(save, in_memory).meta
 
     def __pick_value(self, *values: Optional[str]) -> Optional[str]:
         for value in values:
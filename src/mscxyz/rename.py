@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import errno
-import hashlib
 import os
 import re
 import shutil
@@ -12,10 +11,11 @@ from pathlib import Path
 import tmep
 from tmep.format import alphanum, asciify, nowhitespace
 
+from mscxyz import atomic, timing
 from mscxyz.fields import FieldsExport
 from mscxyz.score import Score
 from mscxyz.settings import get_args
-from mscxyz.utils import colorize
+from mscxyz.utils import colorize, get_checksum
 
 
 def _create_dir(path: str) -> None:
@@ -90,16 +90,10 @@ def _get_checksum(filename: str) -> str:
     :param filename: Path to the file for which to compute the checksum
     :return: Hexadecimal representation of the SHA1 checksum
     """
-    BLOCKSIZE = 65536
-    hasher = hashlib.sha1()
-    with open(filename, "rb") as afile:
-        buf = afile.read(BLOCKSIZE)
-        while len(buf) > 0:
-            hasher.update(buf)
-            buf = afile.read(BLOCKSIZE)
-    return hasher.hexdigest()
+    return get_checksum(filename)
 
 
+@timing.timed("rename")
 def rename(score: Score, path_template: str) -> None:
     """
     Rename a MuseScore file based on a path template and metadata fields.
@@ -163,5 +157,7 @@ def rename(score: Score, path_template: str) -> None:
         _create_dir(target)
         # Invalid cross-device link:
         # os.rename(source, target)
+        stat = os.stat(score.path)
         shutil.move(score.path, target)
+        atomic.note_write(target, stat)
         score.path = Path(target)
@@ -0,0 +1,97 @@
+"""Schedule the score files of a parallel run (``--jobs``).
+
+The files are dispatched in the order of decreasing size (longest processing
+time first), so that a few large scores do not keep one worker busy while
+the others are already idle at the end of the run.
+
+In the memory-budget mode (``--memory-budget``) the estimated memory of the
+files in flight is limited. The memory of a file is estimated as its size
+times an expansion factor (``--expansion-factor``). If the largest waiting
+file does not fit into the remaining budget, the largest file that fits is
+dispatched instead. A file that exceeds the whole budget is dispatched when
+no other file is in flight.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import typing
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+if typing.TYPE_CHECKING:
+    from concurrent.futures import Future
+
+T = TypeVar("T")
+
+default_expansion_factor = 10.0
+"""The memory of a parsed score as a multiple of its file size. A compressed
+``*.mscz`` file expands more than an uncompressed ``*.mscx`` file."""
+
+
+def stat_sizes(files: Iterable[Path]) -> list[tuple[int, Path]]:
+    """:return: The sizes and the files, in the order of increasing size.
+    Files that cannot be read have the size ``0``."""
+    sizes: list[tuple[int, Path]] = []
+    for file in files:
+        try:
+            size = os.stat(file).st_size
+        except OSError:
+            size = 0
+        sizes.append((size, file))
+    sizes.sort(key=lambda item: item[0])
+    return sizes
+
+
+def dispatch(
+    files: Iterable[Path],
+    submit: Callable[[Path], Future[T]],
+    memory_budget: Optional[int] = None,
+    expansion_factor: float = default_expansion_factor,
+) -> Iterator[tuple[Path, Future[T]]]:
+    """
+    Submit the files, the largest first, and yield them as they complete.
+
+    :param files: The files to process.
+    :param submit: Submit a file to an executor.
+    :param memory_budget: The limit in bytes of the estimated memory of the
+      files in flight. ``None``: submit all files at once.
+    :param expansion_factor: The estimated memory of a file as a multiple of
+      its size.
+
+    :return: The completed files and their futures, in the order of
+      completion.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    waiting = stat_sizes(files)
+    costs = [size * expansion_factor for size, _ in waiting]
+    pending: dict[Future[T], tuple[Path, float]] = {}
+    in_flight = 0.0
+
+    def submit_next() -> bool:
+        nonlocal in_flight
+        if not waiting:
+            return False
+        if memory_budget is None or not pending:
+            index = len(waiting) - 1
+        else:
+            # The largest file that fits into the remaining budget.
+            index = bisect.bisect_right(costs, memory_budget - in_flight) - 1
+            if index < 0:
+                return False
+        _, file = waiting.pop(index)
+        cost = costs.pop(index)
+        pending[submit(file)] = (file, cost)
+        in_flight += cost
+        return True
+
+    while waiting or pending:
+        while submit_next():
+            pass
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            file, cost = pending.pop(future)
+            in_flight -= cost
+            yield file, future
@@ -2,22 +2,27 @@
 
 from __future__ import annotations
 
+import copy
 import difflib
 import os
-import shutil
+import typing
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, BinaryIO, Optional
 
 from lxml.etree import _Element
 
-from mscxyz import utils
+from mscxyz import timing, utils
+from mscxyz.atomic import atomic_write
 from mscxyz.export import Export
 from mscxyz.fields import FieldsManager
-from mscxyz.lyrics import Lyrics
+from mscxyz.lyrics import Lyrics, NumberedLyricsElement
 from mscxyz.meta import Meta
 from mscxyz.settings import get_args
 from mscxyz.style import Style
-from mscxyz.xml import XmlManipulator
+from mscxyz.xml import Rule, XmlManipulator
+
+if typing.TYPE_CHECKING:
+    from mscxyz.backup import BackupStore
 
 
 class Score:
@@ -25,6 +30,14 @@ class Score:
 
     :param src: The relative (or absolute) path of a MuseScore
         file.
+    :param data: The content of the MuseScore file. The score is then loaded
+        and serialized in memory and ``src`` only names the score, see
+        :meth:`from_bytes`.
+    :param readonly: Load the score without ever modifying the XML tree.
+        Reading a field or a style never creates missing elements, the style
+        of a MuseScore 4 score is not embedded into the score, every setter
+        raises a :class:`mscxyz.xml.ReadOnlyError` and :meth:`save` does
+        nothing. A read-only score can be shared between threads.
     """
 
     path: Path
@@ -33,10 +46,12 @@ class Score:
 
     xml_file: str
     """The path of the uncompressed MuseScore file in XML format file.
-    This path may be located in the temporary directory."""
+    This path may be located in the temporary directory. For scores in
+    memory it is the path inside the zip file."""
 
     style_file: Optional[Path] = None
-    """Score files created with MuseScore 4 have a separate style file."""
+    """Score files created with MuseScore 4 have a separate style file. For
+    scores in memory it is the path inside the zip file."""
 
     xml_root: _Element
     """The root element of the XML tree. It is the ``<museScore version="X.X">`` Tag.
@@ -49,6 +64,17 @@ class Score:
 
     zip_container: Optional[utils.ZipContainer] = None
 
+    memory_zip: Optional[utils.MemoryZipContainer] = None
+
+    in_memory: bool = False
+    """Whether the score was loaded from bytes, see :meth:`from_bytes`."""
+
+    readonly: bool = False
+    """Whether the XML tree must not be modified."""
+
+    __source: Optional[bytes] = None
+    """The XML markup of a score in memory as it was loaded."""
+
     __xml_string_initial: Optional[str] = None
 
     __fields: Optional[FieldsManager] = None
@@ -61,8 +87,16 @@ class Score:
 
     __style: Optional[Style] = None
 
-    def __init__(self, src: str | Path) -> None:
+    @timing.timed("score.load")
+    def __init__(
+        self, src: str | Path, data: Optional[bytes] = None, readonly: bool = False
+    ) -> None:
         self.path = Path(src).resolve()
+        self.readonly = readonly
+
+        if data is not None:
+            self.__load_bytes(data)
+            return
 
         if self.extension == "mscz":
             self.zip_container = utils.ZipContainer(self.path)
@@ -70,18 +104,99 @@ class Score:
         else:
             self.xml_file = str(self.path)
 
-        self.xml = XmlManipulator(file_path=self.xml_file)
+        self.xml = XmlManipulator(file_path=self.xml_file, readonly=readonly)
         self.xml_root = self.xml.root
         self.version = self.get_version()
 
         if self.extension == "mscz" and self.version_major == 4 and self.zip_container:
             self.style_file = self.zip_container.score_style_file
 
-        # Initialize the Style class to embed the style file into the score file.
-        self.style
+    def __load_bytes(self, data: bytes) -> None:
+        self.in_memory = True
+        if self.extension == "mscz":
+            self.memory_zip = utils.MemoryZipContainer(data)
+            self.xml_file = self.memory_zip.xml_file
+            self.__source = self.memory_zip.members[self.xml_file]
+        else:
+            self.xml_file = str(self.path)
+            self.__source = data
+        self.xml = XmlManipulator(xml_markup=self.__source, readonly=self.readonly)
+        self.xml_root = self.xml.root
+        self.version = self.get_version()
+        if self.version_major == 4 and self.memory_zip:
+            if self.memory_zip.score_style_file is not None:
+                self.style_file = Path(self.memory_zip.score_style_file)
+
+    @classmethod
+    def from_bytes(
+        cls,
+        data: bytes,
+        extension: Optional[str] = None,
+        filename: Optional[str] = None,
+        readonly: bool = False,
+    ) -> Score:
+        """
+        Load a score from the content of a MuseScore file without writing
+        any files.
+
+        :param data: The content of a ``*.mscx`` or ``*.mscz`` file.
+        :param extension: ``mscx`` or ``mscz``. Detected from the data if
+          omitted.
+        :param filename: The name of the score, for example to rename or to
+          export it. Default: ``score.mscz`` or ``score.mscx``.
+        :param readonly: See :class:`Score`.
+        """
+        if extension is None:
+            if filename is not None:
+                extension = filename.split(".")[-1].lower()
+            else:
+                extension = "mscz" if data.startswith(b"PK\x03\x04") else "mscx"
+        if extension not in ("mscx", "mscz"):
+            raise ValueError(f"Unsupported extension “{extension}”: mscx or mscz")
+        if filename is None:
+            filename = f"score.{extension}"
+        elif not filename.lower().endswith(f".{extension}"):
+            raise ValueError(f"The file name “{filename}” must end with .{extension}")
+        return cls(filename, data=data, readonly=readonly)
+
+    @classmethod
+    async def aopen(
+        cls, src: str | Path, data: Optional[bytes] = None, readonly: bool = False
+    ) -> Score:
+        """Load a score in the executor of :mod:`mscxyz.aio` without blocking
+        the event loop. The parameters are the same as for :class:`Score`."""
+        from mscxyz import aio
+
+        return await aio.run_blocking(cls, src, data, readonly)
+
+    @classmethod
+    def from_stream(
+        cls,
+        stream: BinaryIO,
+        extension: Optional[str] = None,
+        filename: Optional[str] = None,
+        readonly: bool = False,
+    ) -> Score:
+        """Load a score from a binary file-like object, see :meth:`from_bytes`."""
+        return cls.from_bytes(stream.read(), extension, filename, readonly)
+
+    def parse_style_file(self) -> _Element:
+        """Parse the separate style file of a MuseScore 4 score."""
+        if self.style_file is None:
+            raise ValueError("The score has no separate style file")
+        if self.memory_zip is not None:
+            return self.xml.parse_string(self.memory_zip.members[str(self.style_file)])
+        return self.xml.parse_file(self.style_file)
 
     @property
     def xml_string(self) -> str:
+        """The XML markup of the score including the styles."""
+        # Embed the style file of MuseScore 4 scores.
+        self.style
+        return self.__tostring()
+
+    def __tostring(self) -> str:
+        """The XML markup of the score without loading the style."""
         return self.xml.tostring(self.xml_root)
 
     @property
@@ -173,7 +288,8 @@ class Score:
     @property
     def fields(self) -> FieldsManager:
         if self.__fields is None:
-            self.__fields = FieldsManager(self)
+            with timing.span("score.fields"):
+                self.__fields = FieldsManager(self)
         return self.__fields
 
     @property
@@ -185,19 +301,75 @@ class Score:
     @property
     def meta(self) -> Meta:
         if self.__meta is None:
-            self.__meta = Meta(self)
+            with timing.span("score.meta"):
+                self.__meta = Meta(self)
         return self.__meta
 
     @property
     def style(self) -> Style:
+        """The style is loaded lazily. Since MuseScore 4 the styles are stored in
+        a separate file, which is only parsed and embedded into the score file
+        on first access."""
         if self.__style is None:
-            self.__style = Style(self)
+            with timing.span("score.style"):
+                # The <Style> element of a MuseScore 2 or 3 score is created
+                # if it is missing.
+                created = not self.style_file and self.xml.find("Score/Style") is None
+                self.__style = Style(self)
+                if (self.style_file or created) and not self.readonly:
+                    self.__embed_style_into_snapshot(self.__style)
         return self.__style
 
+    def __embed_style_into_snapshot(self, style: Style) -> None:
+        """Embed the freshly loaded or created style into the snapshot, so that
+        the snapshot looks as if the style had been loaded before the snapshot
+        was taken."""
+        if self.__xml_string_initial is None:
+            return
+        snapshot = XmlManipulator(xml_markup=self.__xml_string_initial.encode("utf-8"))
+        parent_element = copy.deepcopy(style.parent_element)
+        old_parent_element = snapshot.find("Score/Style")
+        if old_parent_element is not None:
+            snapshot.replace(old_parent_element, parent_element)
+        else:
+            snapshot.find_safe("Score").append(parent_element)
+        self.__xml_string_initial = snapshot.tostring()
+
+    def rewrite(
+        self,
+        clean_style: bool = False,
+        reset_small_staffs: bool = False,
+        collect_lyrics: bool = False,
+    ) -> None:
+        """Combine several operations that need to traverse the whole XML tree
+        into a single traversal.
+
+        :param clean_style: Clean the score, see :meth:`mscxyz.style.Style.clean`.
+        :param reset_small_staffs: Reset all small staffs to normal size, see
+          :meth:`mscxyz.style.Style.reset_small_staffs`.
+        :param collect_lyrics: Collect the lyrics elements for
+          :attr:`lyrics`, see :meth:`mscxyz.lyrics.Lyrics.collect_rule`.
+        """
+        if clean_style or reset_small_staffs:
+            self.xml.check_writable()
+        rules: list[Rule] = []
+        if clean_style:
+            rules.extend(self.style.clean_rules())
+        if reset_small_staffs:
+            rules.extend(self.style.reset_small_staffs_rules())
+        lyrics_elements: Optional[list[NumberedLyricsElement]] = None
+        if collect_lyrics and self.__lyrics is None:
+            lyrics_elements = []
+            rules.append(Lyrics.collect_rule(lyrics_elements))
+        self.xml.apply_rules(*rules)
+        if lyrics_elements is not None:
+            self.__lyrics = Lyrics(self, lyrics_elements)
+
+    @timing.timed("score.snapshot")
     def make_snapshot(self) -> None:
         if self.__xml_string_initial is not None:
             raise ValueError("Snapshot already exists")
-        self.__xml_string_initial = self.xml_string
+        self.__xml_string_initial = self.__tostring()
 
     def new(
         self,
@@ -209,15 +381,74 @@ class Score:
             self.change_path(suffix=suffix, extension=extension, filename=filename)
         )
 
+    @timing.timed("score.copy")
+    def copy(self, readonly: Optional[bool] = None) -> Score:
+        """
+        Copy the score in memory, without reading the file again. The XML
+        tree and a loaded style are deep-copied, the unzipped files of a
+        ``*.mscz`` file are copied into a new temporary directory. The copy
+        has no snapshot (see :meth:`make_snapshot`).
+
+        :param readonly: Whether the copy is read-only. Default: the same as
+          the score, ``False`` to modify a copy of a read-only score.
+
+        :return: An independent score with the same path.
+        """
+        clone = copy.copy(self)
+        if readonly is not None:
+            clone.readonly = readonly
+        clone.xml = XmlManipulator(
+            element=copy.deepcopy(self.xml_root), readonly=clone.readonly
+        )
+        clone.xml_root = clone.xml.root
+        if self.zip_container is not None:
+            clone.zip_container = self.zip_container.copy()
+            tmp_dir = self.zip_container.tmp_dir
+            clone.xml_file = str(
+                clone.zip_container.tmp_dir / Path(self.xml_file).relative_to(tmp_dir)
+            )
+            if self.style_file is not None:
+                clone.style_file = clone.zip_container.tmp_dir / (
+                    self.style_file.relative_to(tmp_dir)
+                )
+        # The members of a score in memory are never modified, they are shared.
+        clone.__xml_string_initial = None
+        clone.__fields = None
+        clone.__export = None
+        clone.__lyrics = None
+        clone.__meta = None
+        clone.__style = None
+        if self.__style is not None:
+            parent_element = self.__style.parent_element
+            if parent_element.getroottree().getroot() is self.xml_root:
+                clone.__style = Style(clone, clone.xml.find_safe("Score/Style"))
+            elif clone.readonly:
+                # The style of a read-only score is not part of the tree.
+                clone.__style = Style(clone, copy.deepcopy(parent_element))
+        return clone
+
     def __str__(self) -> str:
         return str(self.path)
 
     def exists(self) -> bool:
         return self.path.exists()
 
-    def backup(self) -> None:
-        """Make a copy of the MuseScore file."""
-        shutil.copy2(self.path, self.backup_file)
+    def backup(self, store: Optional[BackupStore] = None) -> Path:
+        """
+        Make a copy of the MuseScore file, with a reflink if the file system
+        supports it (see :func:`mscxyz.backup.clone_file`).
+
+        :param store: Add the copy to a backup store instead of writing the
+          file :attr:`backup_file`.
+
+        :return: The path of the copy.
+        """
+        from mscxyz import backup
+
+        if store is not None:
+            return store.get_object(store.add(self.path).hash)
+        backup.clone_file(self.path, self.backup_file)
+        return self.backup_file
 
     def get_version(self) -> float:
         """
@@ -240,7 +471,7 @@ class Score:
 
         diff = difflib.unified_diff(
             self.__xml_string_initial.splitlines(),
-            self.xml_string.splitlines(),
+            self.__tostring().splitlines(),
             lineterm="",
         )
 
@@ -259,15 +490,46 @@ class Score:
         :param mscore: Save the MuseScore file by opening it with the
           MuseScore executable and save it there.
         """
+        dest = self.__write(new_dest)
+        if mscore and dest is not None:
+            utils.re_open(dest)
+
+    async def asave(self, new_dest: str = "", mscore: bool = False) -> None:
+        """The asyncio counterpart of :meth:`save`. The score is serialized
+        in the executor of :mod:`mscxyz.aio`."""
+        from mscxyz import aio
+
+        dest = await aio.run_blocking(self.__write, new_dest)
+        if mscore and dest is not None:
+            await aio.execute_musescore(["-o", dest, dest])
+
+    @timing.timed("score.save")
+    def __write(self, new_dest: str = "") -> Optional[str]:
+        """
+        :return: The path of the written file if it can be opened with the
+          MuseScore executable, otherwise ``None``.
+        """
+        if self.readonly:
+            # The tree is unchanged, there is nothing to serialize.
+            return None
         args = get_args()
         if args.general_dry_run:
-            return
+            return None
 
         if (
             self.__xml_string_initial is not None
-            and self.__xml_string_initial == self.xml_string
+            and self.__xml_string_initial == self.__tostring()
         ):
-            return
+            return None
+
+        if self.in_memory:
+            if not new_dest:
+                raise ValueError(
+                    "A score in memory has no file to save to, use to_bytes()"
+                )
+            with atomic_write(new_dest, "wb", args.general_durability) as f:
+                f.write(self.to_bytes())
+            return None
 
         if new_dest:
             dest: str = new_dest
@@ -279,38 +541,108 @@ class Score:
         if self.extension == "mscz":
             xml_dest = self.xml_file
 
-        # Since MuseScore 4 the style is stored in a separate file.
+        # Since MuseScore 4 the style is stored in a separate file. The file
+        # only needs to be written if the style has been loaded.
         if self.style_file:
-            element = self.xml.create_element(
-                "museScore", {"version": str(self.version)}
-            )
-            element.append(self.style.parent_element)
-            self.xml.write(self.style_file, element)
-            self.xml.remove_tags("./Score/Style")
-
-        self.xml.write(xml_dest)
+            if self.__style is not None:
+                element = self.xml.create_element(
+                    "museScore", {"version": str(self.version)}
+                )
+                element.append(self.__style.parent_element)
+                self.xml.write(self.style_file, element)
+                self.xml.remove_tags("./Score/Style")
+        else:
+            # Create the <Style> element if it is missing.
+            self.style
 
         if self.extension == "mscz" and self.zip_container:
-            self.zip_container.save(dest)
+            self.xml.write(xml_dest)
+            self.zip_container.save(dest, args.general_durability)
+        else:
+            self.xml.write(xml_dest, durability=args.general_durability)
 
-        if mscore:
-            utils.re_open(dest)
+        return dest
+
+    @timing.timed("score.to_bytes")
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the score in memory, in the format of its extension. The
+        style of a MuseScore 4 score is written into the separate style file
+        of the zip file.
+
+        :return: The content of the ``*.mscx`` or ``*.mscz`` file.
+        """
+        style: Optional[bytes] = None
+        if self.readonly:
+            # The style is not embedded, the style file is unchanged.
+            markup = self.__tostring().encode("utf-8")
+        elif self.style_file:
+            if self.__style is not None:
+                style_element = self.__style.parent_element
+                parent = style_element.getparent()
+                index = parent.index(style_element) if parent is not None else 0
+                element = self.xml.create_element(
+                    "museScore", {"version": str(self.version)}
+                )
+                # Move the style element temporarily into the style file.
+                element.append(style_element)
+                try:
+                    style = self.xml.tostring(element).encode("utf-8")
+                    markup = self.__tostring().encode("utf-8")
+                finally:
+                    if parent is not None:
+                        parent.insert(index, style_element)
+            else:
+                markup = self.__tostring().encode("utf-8")
+        else:
+            # Create the <Style> element if it is missing.
+            self.style
+            markup = self.__tostring().encode("utf-8")
+
+        if self.extension != "mscz":
+            return markup
+
+        if self.memory_zip is not None:
+            members = dict(self.memory_zip.members)
+            xml_file = self.memory_zip.xml_file
+        elif self.zip_container is not None:
+            members = self.zip_container.read_members()
+            xml_file = (
+                Path(self.xml_file).relative_to(self.zip_container.tmp_dir).as_posix()
+            )
+        else:
+            raise ValueError("The score has no zip container")
+        members[xml_file] = markup
+        if style is not None and self.style_file is not None:
+            if self.memory_zip is not None:
+                members[str(self.style_file)] = style
+            elif self.zip_container is not None:
+                style_file = self.style_file.relative_to(self.zip_container.tmp_dir)
+                members[style_file.as_posix()] = style
+        return utils.write_zip(members)
 
     def read_as_text(self) -> str:
         """Read the MuseScore XML file as text.
 
         :return: The content of the MuseScore XML file as text.
         """
+        if self.__source is not None:
+            return self.__source.decode("utf-8")
         return utils.read_file(self.xml_file)
 
-    def reload(self, save: bool = False) -> Score:
+    def reload(self, save: bool = False, in_memory: bool = False) -> Score:
         """
         Reload the MuseScore file.
 
         :param save: Whether to save the changes before reloading. Default is ``False``.
+        :param in_memory: Load the serialized score (see :meth:`to_bytes`)
+          instead of the file. The reloaded score is a score in memory (see
+          :meth:`from_bytes`), it can only be saved under a new name.
 
         :return: The reloaded Score object.
         """
         if save:
             self.save()
-        return self.new()
+        if in_memory:
+            return Score(self.path, data=self.to_bytes(), readonly=self.readonly)
+        return Score(self.path, readonly=self.readonly)
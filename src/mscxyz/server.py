@@ -0,0 +1,296 @@
+"""Keep a warm process that serves requests over a Unix socket.
+
+Start the server:
+
+.. code-block:: shell
+
+    musescore-manager --serve /run/user/1000/mscxyz.sock
+
+Each request and each response is a JSON object on a single line. A
+connection carries one request, the server closes it after the response. A
+client that sends nothing is disconnected after :attr:`_RequestHandler.timeout`
+seconds, so it cannot block the other clients. The request is either a list
+of command line arguments:
+
+.. code-block:: json
+
+    {"args": ["--title", "Title", "score.mscz"], "cwd": "/home/user"}
+
+or one of the operations ``get_fields``, ``set_fields``, ``apply_style`` and
+``ping``:
+
+.. code-block:: json
+
+    {"op": "get_fields", "path": "/home/user/score.mscz"}
+    {"op": "set_fields", "path": "score.mscz", "fields": {"title": "Title"}}
+    {"op": "apply_style", "path": "score.mscz", "values": {"pageWidth": 8.5}}
+
+The response contains ``ok``, ``exit_code``, ``stdout``, ``stderr`` (for
+example the message of an invalid argument) and either ``result`` or
+``error``. The options ``--serve`` and ``--watch`` are
+rejected in a request.
+
+The socket is only accessible by the user. An existing socket is replaced
+only if no server is listening on it anymore, any other file is never
+replaced.
+
+The scores are loaded through the cache of :mod:`mscxyz.cache` if it is
+enabled.
+
+The client ``musescore-manager-client`` forwards its command line arguments
+and its working directory to the server. It imports neither lxml nor the
+other submodules, so it starts in a fraction of the time of the normal
+command line interface.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import typing
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Callable, Optional, Sequence
+
+if typing.TYPE_CHECKING:
+    from mscxyz.score import Score
+
+Request = dict[str, Any]
+
+Response = dict[str, Any]
+
+
+def get_default_socket() -> str:
+    """``$XDG_RUNTIME_DIR/mscxyz.sock`` or ``/tmp/mscxyz-<uid>.sock``"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "mscxyz.sock")
+    return os.path.join("/tmp", f"mscxyz-{os.getuid()}.sock")
+
+
+def _open_score(request: Request, readonly: bool = False) -> Score:
+    from mscxyz import cache
+
+    return cache.open_score(request["path"], readonly=readonly)
+
+
+def _get_fields(request: Request) -> Any:
+    return _open_score(request, readonly=True).fields.export_to_dict()
+
+
+def _set_fields(request: Request) -> Any:
+    score = _open_score(request)
+    for name, value in request["fields"].items():
+        score.fields.set(name, value)
+    score.save()
+    return score.fields.export_to_dict()
+
+
+def _apply_style(request: Request) -> Any:
+    score = _open_score(request)
+    if "style_file" in request:
+        score.style.load_style_file(request["style_file"])
+    for name, value in request.get("values", {}).items():
+        score.style.set(name, value)
+    score.save()
+    return None
+
+
+def _ping(request: Request) -> Any:
+    return "pong"
+
+
+operations: dict[str, Callable[[Request], Any]] = {
+    "get_fields": _get_fields,
+    "set_fields": _set_fields,
+    "apply_style": _apply_style,
+    "ping": _ping,
+}
+"""The high level operations by their name."""
+
+
+def handle_request(request: Request) -> Response:
+    """
+    Run a request and collect its output.
+
+    The requests are processed one after another, because the working
+    directory and the redirected standard streams are global to the
+    process.
+    """
+    from mscxyz import cli, settings
+
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    response: Response = {"ok": True, "exit_code": 0}
+    cwd = os.getcwd()
+    args: Optional[settings.DefaultArguments] = None
+    try:
+        if "cwd" in request:
+            os.chdir(request["cwd"])
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            if "args" in request:
+                args = cli.get_args(request["args"])
+                if args.general_serve is not None or args.general_watch:
+                    # Both never return and would block the server.
+                    raise ValueError("--serve and --watch are not allowed in a request")
+                cli.execute_args(args)
+            elif request.get("op") in operations:
+                with settings.use_args(settings.DefaultArguments()):
+                    response["result"] = operations[request["op"]](request)
+            else:
+                raise ValueError(f"Unknown request: {request!r}")
+    except SystemExit as e:
+        # argparse exits on --help and on invalid arguments.
+        if isinstance(e.code, int):
+            response["exit_code"] = e.code
+        elif e.code is not None:
+            response["exit_code"] = 1
+            stdout.write(f"{e.code}\n")
+        response["ok"] = response["exit_code"] == 0
+    except Exception as e:
+        response["ok"] = False
+        response["exit_code"] = 1
+        response["error"] = {"type": e.__class__.__name__, "message": str(e)}
+    finally:
+        if args is not None:
+            cli.close_files(args)
+        os.chdir(cwd)
+        settings.reset_args()
+    response["stdout"] = stdout.getvalue()
+    response["stderr"] = stderr.getvalue()
+    return response
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    timeout = 10
+    """The seconds to wait for the request line."""
+
+    def handle(self) -> None:
+        try:
+            line = self.rfile.readline()
+        except TimeoutError:
+            return
+        if not line.strip():
+            return
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("The request must be a JSON object.")
+        except ValueError as e:
+            response: Response = {
+                "ok": False,
+                "exit_code": 1,
+                "stdout": "",
+                "stderr": "",
+                "error": {"type": e.__class__.__name__, "message": str(e)},
+            }
+        else:
+            response = handle_request(request)
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class Server(socketserver.UnixStreamServer):
+    """A server that keeps the modules, the argument parser and lxml warm
+    between the requests."""
+
+    def __init__(self, socket_path: str) -> None:
+        _remove_stale_socket(socket_path)
+        self.socket_path = socket_path
+        self.__inode: Optional[int] = None
+        super().__init__(socket_path, _RequestHandler)
+
+    def server_bind(self) -> None:
+        # Create the socket with the mode 0o600. A chmod() after bind() would
+        # leave the socket accessible to other users for a moment.
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+        self.__inode = os.lstat(self.socket_path).st_ino
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            inode = os.lstat(self.socket_path).st_ino
+        except FileNotFoundError:
+            return
+        # Only remove the own socket, not the one of a server started later.
+        if inode == self.__inode:
+            os.unlink(self.socket_path)
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """Remove the left over socket of a killed server.
+
+    :raises FileExistsError: If the path is not a socket or if a server is
+      listening on it.
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{socket_path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(socket_path)
+            return
+    raise FileExistsError(f"A server is already listening on {socket_path}")
+
+
+def serve(socket_path: Optional[str] = None) -> None:
+    """Serve requests until the process is interrupted."""
+    if socket_path is None:
+        socket_path = get_default_socket()
+    # Import everything a request needs up front.
+    import mscxyz.score  # noqa: F401
+
+    with Server(socket_path) as server:
+        print(f"Listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def send(request: Request, socket_path: Optional[str] = None) -> Response:
+    """Send a request to the server and wait for the response."""
+    if socket_path is None:
+        socket_path = get_default_socket()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        with client.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            return typing.cast(Response, json.loads(stream.readline()))
+
+
+def client(argv: Sequence[str] | None = None) -> int:
+    """
+    The entry point ``musescore-manager-client``. The socket is taken from the
+    environment variable ``MSCXYZ_SOCKET`` or :func:`get_default_socket`.
+
+    :return: The exit status of the request.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    response = send(
+        {"args": list(argv), "cwd": os.getcwd()}, os.environ.get("MSCXYZ_SOCKET")
+    )
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    if "error" in response:
+        error = response["error"]
+        print(f"Error: {error['type']}; message: {error['message']}", file=sys.stderr)
+    return typing.cast(int, response["exit_code"])
+
+
+def main() -> None:
+    sys.exit(client())
@@ -1,6 +1,17 @@
 """This submodule provides default parameters for args. Here is the
 ``args`` object stored from ``argparse``. It can be accessed by the other
-submodules using the function `get_args()`."""
+submodules using the function `get_args()`.
+
+The ``args`` object is global to the process. Threads and asyncio tasks
+that need different options at the same time use their own scope:
+
+.. code-block:: python
+
+    args = DefaultArguments()
+    args.general_dry_run = True
+    with use_args(args):
+        score.save()  # Nothing is saved.
+"""
 
 from __future__ import annotations
 
@@ -8,10 +19,14 @@ import argparse
 import configparser
 import os
 import typing
+from contextlib import contextmanager
+from contextvars import ContextVar
 from io import TextIOWrapper
-from typing import Optional, Sequence, cast
+from typing import Iterator, Optional, Sequence, cast
 
 if typing.TYPE_CHECKING:
+    from mscxyz.atomic import Durability
+    from mscxyz.shard import Shard
     from mscxyz.utils import PathOrStr
 
 
@@ -19,10 +34,21 @@ class DefaultArguments:
     # keep order in sync with cli.py
     general_config_file: Optional[str] = None
     general_backup: bool = False
+    general_backup_store: Optional[str] = None
     general_dry_run: bool = False
+    general_durability: Durability = "none"
     general_catch_errors: bool = False
     general_mscore: bool = False
     general_executable: Optional[str] = None
+    general_jobs: int = 1
+    general_memory_budget: Optional[float] = None
+    general_expansion_factor: float = 10.0
+    general_checkpoint: Optional[str] = None
+    general_resume: bool = False
+    general_state_file: Optional[str] = None
+    general_watch: bool = False
+    general_watch_interval: float = 1.0
+    general_serve: Optional[str] = None
 
     # Groups alphabetically
     # in groups related not alphabetically
@@ -38,6 +64,10 @@ class DefaultArguments:
     info_color: bool = True
     info_diff: bool = False
     info_print_xml: bool = False
+    info_profile: bool = False
+    info_profile_json: Optional[str] = None
+    info_trace: Optional[str] = None
+    info_memory_profile: bool = False
 
     # help
     help_markdown: bool = False
@@ -82,6 +112,14 @@ class DefaultArguments:
     selection_glob: str = "*.mscx"
     selection_mscz: bool = False
     selection_mscx: bool = False
+    selection_files_from: Optional[str] = None
+    selection_null: bool = False
+    selection_exclude: list[str] = []
+    selection_skip_backups: bool = False
+    selection_follow_symlinks: bool = False
+    selection_scan_threads: int = 1
+    selection_shard: Optional[Shard] = None
+    selection_shard_by_size: bool = False
 
     # style
     style_value: list[tuple[str, str]] = []
@@ -90,6 +128,8 @@ class DefaultArguments:
     style_styles_v3: bool = False
     style_styles_v4: bool = False
     style_reset_small_staffs: bool = False
+    style_report: Optional[str] = None
+    style_report_cache: Optional[str] = None
     # style: font
     style_list_fonts: bool = False
     style_text_font: Optional[str] = None
@@ -126,16 +166,37 @@ class DefaultArguments:
 
 args = DefaultArguments()
 
+_scoped_args: ContextVar[Optional[DefaultArguments]] = ContextVar(
+    "scoped_args", default=None
+)
+
 
 def get_args() -> DefaultArguments:
     """Get the ``args`` object (the ``argparse`` object) which is stored in
-    the .settings.py submodule for all other submodules.
+    the .settings.py submodule for all other submodules. The object of the
+    innermost :func:`use_args` scope takes precedence.
 
     :return: the ``argparse`` object
     """
+    scoped = _scoped_args.get()
+    if scoped is not None:
+        return scoped
     return args
 
 
+@contextmanager
+def use_args(scoped: DefaultArguments) -> Iterator[DefaultArguments]:
+    """Use an ``args`` object in the current thread or asyncio task until the
+    end of the ``with`` block. Other threads and tasks keep their own
+    object. A task inherits the scope that was active when it was created.
+    """
+    token = _scoped_args.set(scoped)
+    try:
+        yield scoped
+    finally:
+        _scoped_args.reset(token)
+
+
 def set_args(new_args: DefaultArguments) -> DefaultArguments:
     """Set the ``args`` object (the ``argparse`` object) which is stored in
     the .settings.py submodule for all other submodules to import.
@@ -206,11 +267,13 @@ def merge_config_into_args(
 def parse_args(
     parser: argparse.ArgumentParser, cli_args: Sequence[str] | None = None
 ) -> DefaultArguments:
+    """Parse the arguments and merge the configuration file into them. The
+    ``args`` object of the process is not changed, use :func:`use_args` or
+    :func:`set_args`."""
     args: DefaultArguments = cast(DefaultArguments, parser.parse_args(cli_args))
     if args.general_config_file:
         config = parse_config_ini(args.general_config_file)
         if config:
             args = merge_config_into_args(config, args)
-    set_args(args)
 
     return args
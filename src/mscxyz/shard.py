@@ -0,0 +1,129 @@
+"""Split the selected score files into disjoint shards, for example to
+process a library on several machines without coordination.
+
+.. code-block:: shell
+
+    musescore-manager --shard 1/3 --style-file house.mss /scores  # host 1
+    musescore-manager --shard 2/3 --style-file house.mss /scores  # host 2
+    musescore-manager --shard 3/3 --style-file house.mss /scores  # host 3
+
+A file belongs to a shard by a stable hash of its path relative to the
+search root, so the assignment is the same on every host and in every run,
+even if the library is mounted at different locations.
+
+The size-balanced mode assigns the files in the order of decreasing size to
+the shard with the smallest total size so far (longest processing time
+first). It reads the sizes of all files before the first file is processed.
+The assignment is the same on all hosts as long as they see the same files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import heapq
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+
+from mscxyz.utils import PathOrStr, list_path
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int
+    """The number of the shard, starting with ``1``."""
+
+    count: int
+
+    @classmethod
+    def parse(cls, value: str) -> Shard:
+        """Parse ``I/N``. Used as the ``type`` of the option ``--shard``."""
+        try:
+            index, count = (int(part) for part in value.split("/"))
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"invalid shard “{value}”, expected I/N, for example 1/4"
+            )
+        if count < 1 or not 1 <= index <= count:
+            raise argparse.ArgumentTypeError(
+                f"invalid shard “{value}”, I must be between 1 and N"
+            )
+        return cls(index, count)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+def stable_hash(relpath: str) -> int:
+    """A hash that is independent of the process (unlike :func:`hash`) and of
+    the platform."""
+    return int.from_bytes(
+        hashlib.blake2b(relpath.encode(), digest_size=8).digest(), "big"
+    )
+
+
+def _list_relative(
+    src: Sequence[PathOrStr], scan: dict[str, Any]
+) -> Iterator[tuple[Path, str]]:
+    """:return: The files and their POSIX paths relative to the search root."""
+    for root in src:
+        root_path = Path(root)
+        for file in list_path(root_path, **scan):
+            if root_path.is_dir():
+                relpath = file.relative_to(root_path).as_posix()
+            else:
+                relpath = file.name
+            yield file, relpath
+
+
+def _list_balanced(
+    src: Sequence[PathOrStr], shard: Shard, scan: dict[str, Any]
+) -> list[Path]:
+    files = [
+        (file.stat().st_size, relpath, file)
+        for file, relpath in _list_relative(src, scan)
+    ]
+    files.sort(key=lambda item: (-item[0], item[1]))
+    # (total size, shard index)
+    loads = [(0, index) for index in range(1, shard.count + 1)]
+    selected: list[Path] = []
+    for size, _, file in files:
+        total, index = heapq.heappop(loads)
+        if index == shard.index:
+            selected.append(file)
+        heapq.heappush(loads, (total + size, index))
+    return selected
+
+
+def list_shard(
+    src: PathOrStr | Sequence[PathOrStr],
+    shard: Shard,
+    by_size: bool = False,
+    **scan: Any,
+) -> Iterator[Path]:
+    """
+    List the score files of a shard.
+
+    :param src: The search roots, see :func:`mscxyz.utils.list_path`.
+    :param shard: The shard to list.
+    :param by_size: Balance the shards by the file sizes.
+    :param scan: The keyword arguments of :func:`mscxyz.utils.list_path`, for
+      example ``glob`` or ``exclude``.
+    """
+    if isinstance(src, (str, Path)) or not isinstance(src, Sequence):
+        src = [src]
+    if by_size:
+        yield from _list_balanced(src, shard, scan)
+        return
+    for file, relpath in _list_relative(src, scan):
+        if stable_hash(relpath) % shard.count == shard.index - 1:
+            yield file
+
+
+def select_shard(files: Iterable[Path], shard: Shard) -> Iterator[Path]:
+    """Select the files of a shard from a given list of files, for example
+    from ``--files-from``. The files are assigned by their paths as given."""
+    for file in files:
+        if stable_hash(file.as_posix()) % shard.count == shard.index - 1:
+            yield file
@@ -0,0 +1,162 @@
+"""Remember the files of a successful run to skip them in the next run with
+the same arguments.
+
+The state is an SQLite database with one row per file: the resolved path,
+the size, the modification time, the content hash and the hash of the
+effective arguments after the run. A file is skipped before it is parsed if
+the arguments hash matches and the file is unchanged. A file whose
+modification time changed but whose content did not (for example after a
+``touch`` or a copy) is recognized by the content hash.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from io import TextIOWrapper
+from pathlib import Path
+from typing import Any, Optional
+
+from mscxyz.settings import DefaultArguments
+from mscxyz.utils import PathOrStr
+
+_ignored_args = {
+    "path",
+    "general_catch_errors",
+    "general_checkpoint",
+    "general_durability",
+    "general_expansion_factor",
+    "general_jobs",
+    "general_memory_budget",
+    "general_resume",
+    "general_serve",
+    "general_state_file",
+    "general_watch",
+    "general_watch_interval",
+    "info_color",
+    "info_diff",
+    "info_memory_profile",
+    "info_print_xml",
+    "info_profile",
+    "info_profile_json",
+    "info_trace",
+    "info_verbose",
+}
+"""The arguments that do not change the files, only the output of a run.
+The options of the selection (``selection_*``) are ignored as a whole: the
+state records each file with its hash, a file selected again is skipped if
+it is unchanged."""
+
+
+def hash_file(path: PathOrStr) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_args(args: DefaultArguments) -> str:
+    """Hash the arguments that affect the result of a run, together with the
+    version of mscxyz. A style file is hashed by its content."""
+    from importlib import metadata
+
+    def default(value: Any) -> str:
+        if isinstance(value, TextIOWrapper):
+            return hash_file(value.name)
+        return str(value)
+
+    effective: dict[str, Any] = {
+        name: getattr(args, name, None)
+        for name in vars(DefaultArguments)
+        if not name.startswith(("_", "selection_")) and name not in _ignored_args
+    }
+    effective["version"] = metadata.version("mscxyz")
+    dump = json.dumps(effective, sort_keys=True, default=default)
+    return hashlib.blake2b(dump.encode(), digest_size=16).hexdigest()
+
+
+class RunState:
+    """
+    :param db_file: The path of the SQLite database.
+    :param args: The arguments of the current run.
+    """
+
+    commit_interval = 100
+    """Commit after this number of recorded files. A killed run only
+    processes the uncommitted files again."""
+
+    def __init__(self, db_file: PathOrStr, args: DefaultArguments) -> None:
+        self.args_hash = hash_args(args)
+        self.skipped = 0
+        self.__pending = 0
+        self.__connection = sqlite3.connect(db_file)
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+            "hash TEXT, args_hash TEXT)"
+        )
+
+    def __enter__(self) -> RunState:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __get(self, path: str) -> Optional[tuple[int, int, str, str]]:
+        row = self.__connection.execute(
+            "SELECT size, mtime_ns, hash, args_hash FROM files WHERE path = ?",
+            (path,),
+        ).fetchone()
+        return row  # type: ignore[no-any-return]
+
+    def __put(self, path: str, size: int, mtime_ns: int, hash: str) -> None:
+        self.__connection.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+            (path, size, mtime_ns, hash, self.args_hash),
+        )
+        self.__pending += 1
+        if self.__pending >= self.commit_interval:
+            self.commit()
+
+    def is_unchanged(self, file: PathOrStr) -> bool:
+        """:return: ``True`` if the file can be skipped."""
+        path = Path(file).resolve()
+        row = self.__get(str(path))
+        if row is None:
+            return False
+        size, mtime_ns, hash, args_hash = row
+        if args_hash != self.args_hash:
+            return False
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+        if stat.st_size != size:
+            return False
+        if stat.st_mtime_ns != mtime_ns:
+            if hash_file(path) != hash:
+                return False
+            self.__put(str(path), size, stat.st_mtime_ns, hash)
+        self.skipped += 1
+        return True
+
+    def record(self, file: PathOrStr) -> None:
+        """Record a successfully processed file. A file that was moved away
+        (renamed, compressed) is not recorded."""
+        path = Path(file).resolve()
+        try:
+            stat = path.stat()
+            hash = hash_file(path)
+        except FileNotFoundError:
+            return
+        self.__put(str(path), stat.st_size, stat.st_mtime_ns, hash)
+
+    def commit(self) -> None:
+        self.__connection.commit()
+        self.__pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self.__connection.close()
@@ -1,70 +1,26 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import typing
 from dataclasses import dataclass
 from io import TextIOWrapper
 from pathlib import Path
 from typing import Optional, Sequence, TypedDict, Union, cast
 
-from lxml.etree import _Attrib, _Element
+from lxml.etree import Element, _Attrib, _Element
 
-from mscxyz import utils
-from mscxyz.utils import INCH
-from mscxyz.xml import XmlManipulator
+from mscxyz import constants, utils
+from mscxyz.utils import INCH, inch
+from mscxyz.utils import mm as mm  # moved to utils, re-exported
+from mscxyz.xml import Rule, XmlManipulator
 
 if typing.TYPE_CHECKING:
     from mscxyz.score import Score
 
-from mscxyz.utils import Dimension
+musical_symbol_font_faces = constants.musical_symbol_font_faces
 
-
-def mm(value: str | float) -> float:
-    if not isinstance(value, str):
-        return value
-    return Dimension(value).to("mm")
-
-
-def inch(value: str | float) -> float:
-    if not isinstance(value, str):
-        return value
-    return Dimension(value).to("in")
-
-
-musical_symbol_font_faces = (
-    "Leland",
-    "Bravura",
-    "Emmentaler",
-    # "MScore",
-    "Gonville",
-    # "Gootville",
-    "MuseJazz",
-    "Petaluma",
-    "Finale Maestro",
-    "Finale Broadway",
-)
-"""
-Musical symbol font faces
-
-:see: `MuseScore C++ source code: engravingmodule.cpp lines 120-127 <https://github.com/musescore/MuseScore/blob/940f5ce4c83c9168e3be0e1509664a7abffcf9e8/src/engraving/engravingmodule.cpp#L120-L127>`_
-"""
-
-musical_text_font_faces = (
-    "Leland Text",
-    "Bravura Text",
-    "Emmentaler Text",  # -> MScore Text
-    # "MScore Text",
-    "Gonville Text",  # -> Gootville Text
-    # "Gootville Text",
-    "MuseJazz Text",
-    "Petaluma Text",
-    "Finale Maestro Text",
-    "Finale Broadway Text",
-)
-"""
-Musical text font faces
-
-:see: `MuseScore C++ source code: editstyle.cpp lines 1966-1973 <https://github.com/musescore/MuseScore/blob/940f5ce4c83c9168e3be0e1509664a7abffcf9e8/src/notation/view/widgets/editstyle.cpp#L1966-L1973>`_
-"""
+musical_text_font_faces = constants.musical_text_font_faces
 
 
 text_font_faces = (
@@ -162,6 +118,8 @@ class Style:
     Interface specialized for the style manipulation.
 
     :param relpath: The relative (or absolute) path of a MuseScore file.
+    :param parent_element: An already loaded ``<Style>`` element, for example
+      of a copied score (see :meth:`mscxyz.score.Score.copy`).
 
     v3: https://github.com/musescore/MuseScore/blob/4566605d92467b0f5a36b3731b64150500e48583/libmscore/style.cpp
 
@@ -178,13 +136,28 @@ class Style:
     def xml(self) -> XmlManipulator:
         return self.score.xml
 
-    def __init__(self, score: "Score") -> None:
+    def __init__(
+        self, score: "Score", parent_element: Optional[_Element] = None
+    ) -> None:
         self.score = score
+        if parent_element is not None:
+            self.parent_element = parent_element
+            return
+        if self.score.readonly:
+            # Neither create the <Style> element nor embed the style file.
+            if self.score.style_file:
+                element = self.score.parse_style_file()
+            else:
+                element = self.xml.find_safe("Score")
+            parent_element = self.xml.find("Style", element)
+            self.parent_element = (
+                parent_element if parent_element is not None else Element("Style")
+            )
+            return
         parent_element = self.__get_parent_element()
         if self.score.style_file:
             self.parent_element = self.xml.find_safe(
-                "Style",
-                self.xml.parse_file(self.score.style_file),
+                "Style", self.score.parse_style_file()
             )
             self.xml.replace(parent_element, self.parent_element)
         else:
@@ -235,6 +208,74 @@ class Style:
             output.append(element)
         return output
 
+    @staticmethod
+    def normalize(parent_element: _Element) -> dict[str, str]:
+        """
+        Flatten a ``<Style>`` element into a dictionary with normalized values.
+
+        Nested elements are joined with slashes, for example
+        ``page-layout/page-height``. Sibling elements with the same tag are
+        distinguished by their ``<name>`` child or their position, for example
+        ``TextStyle[Title]/size``. Attributes are appended with an ``@``, for
+        example ``measureNumberOffset@x``. Numeric values are rounded using
+        :func:`mscxyz.utils.round_float`.
+
+        :param parent_element: The ``<Style>`` element.
+
+        :return: A dictionary of style names and normalized values.
+        """
+        output: dict[str, str] = {}
+
+        def normalize_value(value: str) -> str:
+            value = value.strip()
+            try:
+                return str(utils.round_float(value))
+            except ValueError:
+                return value
+
+        def flatten(element: _Element, prefix: str) -> None:
+            counts: dict[str, int] = {}
+            for child in element:
+                if not isinstance(child.tag, str):
+                    continue
+                counts[child.tag] = counts.get(child.tag, 0) + 1
+            indexes: dict[str, int] = {}
+            for child in element:
+                if not isinstance(child.tag, str):
+                    continue
+                key = prefix + child.tag
+                if counts[child.tag] > 1:
+                    indexes[child.tag] = indexes.get(child.tag, 0) + 1
+                    name = child.findtext("name")
+                    key += f"[{name if name else indexes[child.tag]}]"
+                for attr_name, attr_value in sorted(child.attrib.items()):
+                    output[f"{key}@{attr_name!s}"] = normalize_value(str(attr_value))
+                if len(child):
+                    flatten(child, key + "/")
+                elif child.text is not None and child.text.strip():
+                    output[key] = normalize_value(child.text)
+                elif not child.attrib:
+                    output[key] = ""
+
+        flatten(parent_element, "")
+        return output
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        A SHA1 hash of the normalized styles (see :meth:`normalize`). Scores
+        with the same styles have the same fingerprint, regardless of the order
+        of the style elements or the formatting of numeric values.
+        """
+        return Style.hash_styles(Style.normalize(self.parent_element))
+
+    @staticmethod
+    def hash_styles(styles: dict[str, str]) -> str:
+        """Compute the fingerprint of normalized styles, see :attr:`fingerprint`."""
+        return hashlib.sha1(
+            json.dumps(styles, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
     def get_element(self, element_path: str) -> _Element:
         """
         Determines an lxml element that is a child to the ``Style`` tag
@@ -258,6 +299,9 @@ class Style:
         """
         element: _Element | None = self.parent_element.find(element_path)
         if element is None:
+            if self.score.readonly:
+                # A detached, empty element.
+                return Element(element_path.split("/")[-1])
             element = self.__create_nested_element(element_path)
         return element
 
@@ -295,19 +339,34 @@ class Style:
         element: _Element = self.get_element(style_name)
         return element.attrib
 
+    def clean_rules(self) -> list[Rule]:
+        """The rules used by :meth:`clean`, see :meth:`XmlManipulator.apply_rules`."""
+        rules: list[Rule] = [
+            Rule(tag, remove=True)
+            for tag in (
+                "LayoutBreak",
+                "StemDirection",
+                "font",
+                "b",
+                "i",
+                "pos",
+                "offset",
+            )
+        ]
+        rules.append(
+            Rule(
+                "Style",
+                predicate=lambda element: element is self.parent_element,
+                action=lambda element: element.clear(),
+            )
+        )
+        return rules
+
     def clean(self) -> None:
         """Remove the style, the layout breaks, the stem directions and the
         ``font``, ``b``, ``i``, ``pos``, ``offset`` tags"""
-        self.xml.remove_tags(
-            ".//LayoutBreak",
-            ".//StemDirection",
-            ".//font",
-            ".//b",
-            ".//i",
-            ".//pos",
-            ".//offset",
-        )
-        self.parent_element.clear()
+        self.xml.check_writable()
+        self.xml.apply_rules(*self.clean_rules())
 
     def get(self, style_name: str, raise_exception: bool = True) -> str | None:
         """
@@ -330,6 +389,7 @@ class Style:
         :param element_path: see
           http://lxml.de/tutorial.html#elementpath
         """
+        self.xml.check_writable()
         element: _Element = self.get_element(style_name)
         for name, value in attributes.items():
             element.attrib[name] = str(value)
@@ -345,6 +405,7 @@ class Style:
         :param value: The value to be set for the XML element.
           It can be a string, integer, or float.
         """
+        self.xml.check_writable()
         style_names: list[str] = []
         if isinstance(style_name, str):
             style_names = [style_name]
@@ -384,6 +445,8 @@ class Style:
             if el is None:
                 raise ValueError(f"Parent not found on element {el}!")
             return el
+        elif self.score.readonly:
+            return Element("TextStyle")
         else:
             _, el_text_style = self.xml.create_sub_element(
                 self.parent_element, "TextStyle"
@@ -440,6 +503,7 @@ class Style:
           the text values of the child tags, for example
           ``{size: 14, bold: 1}``.
         """
+        self.xml.check_writable()
         text_style: _Element = self.__get_text_style_element(name)
         for element_name, value in values.items():
             element: _Element | None = text_style.find(element_name)
@@ -593,6 +657,7 @@ class Style:
         )
 
     def __replace_parent_element(self, parent_style: _Element) -> None:
+        self.xml.check_writable()
         self.xml.replace(self.parent_element, parent_style)
         self.parent_element = parent_style
 
@@ -629,17 +694,18 @@ class Style:
         style: _Element = self.xml.parse_file(file)
         self.__replace_parent_element(style[0])
 
-    def reload(self, save: bool = False) -> Style:
+    def reload(self, save: bool = False, in_memory: bool = False) -> Style:
         """
         Reload the MuseScore file.
 
         :param save: Whether to save the changes before reloading. Default is False.
+        :param in_memory: Load the serialized score instead of the file.
 
         :return: The reloaded Style object.
 
         :see: :meth:`mscxyz.score.Score.reload`
         """
-        return self.score.reload(save).style
+        return self.score.reload(save, in_memory).style
 
     # The properties in the order they are arranged in this file: https://github.com/musescore/MuseScore/blob/e0f941733ac2c0959203a5e99252eb4c58f67606/src/engraving/style/styledef.cpp
 
@@ -1417,9 +1483,21 @@ class Style:
                     <minPitchP>36</minPitchP>
                     <maxPitchP>94</maxPitchP>
         """
-        for element in self.xml.findall(".//StaffType/small"):
-            if element.text == "1":
-                self.xml.remove(element)
+        self.xml.check_writable()
+        self.xml.apply_rules(*self.reset_small_staffs_rules())
+
+    @staticmethod
+    def reset_small_staffs_rules() -> list[Rule]:
+        """The rules used by :meth:`reset_small_staffs`, see
+        :meth:`XmlManipulator.apply_rules`."""
+
+        def is_small_staff(element: _Element) -> bool:
+            parent: _Element | None = element.getparent()
+            return (
+                element.text == "1" and parent is not None and parent.tag == "StaffType"
+            )
+
+        return [Rule("small", predicate=is_small_staff, remove=True)]
 
     # lyrics ###################################################################
 
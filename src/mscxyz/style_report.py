@@ -0,0 +1,231 @@
+"""Group scores by the fingerprint of their styles to find the scores that have
+drifted from a house style."""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from mscxyz import timing, utils
+from mscxyz.score import Score
+from mscxyz.style import Style
+from mscxyz.utils import PathOrStr, colorize
+from mscxyz.xml import XmlManipulator
+
+StyleDict = dict[str, str]
+"""Normalized styles, see :meth:`mscxyz.style.Style.normalize`."""
+
+StyleDifference = tuple[str, Optional[str], Optional[str]]
+"""The style name, the value of the reference and the value of the group."""
+
+
+@dataclass
+class StyleGroup:
+    """Scores that share the same style fingerprint."""
+
+    fingerprint: str
+
+    styles: StyleDict
+
+    paths: list[Path] = field(default_factory=list)
+
+    def diff(self, reference: StyleDict) -> list[StyleDifference]:
+        """
+        Compare the styles of the group with reference styles.
+
+        :param reference: The normalized reference styles.
+
+        :return: A sorted list of the differing style names with the value of
+          the reference and the value of the group. A missing value is ``None``.
+        """
+        output: list[StyleDifference] = []
+        for name in sorted(set(reference) | set(self.styles)):
+            ref_value = reference.get(name)
+            value = self.styles.get(name)
+            if ref_value != value:
+                output.append((name, ref_value, value))
+        return output
+
+
+@dataclass
+class StyleReport:
+    groups: list[StyleGroup] = field(default_factory=list)
+    """The groups, the largest group first."""
+
+    errors: list[tuple[Path, Exception]] = field(default_factory=list)
+    """The scores that could not be read."""
+
+
+class FingerprintCache:
+    """A JSON file that maps the SHA1 checksums of score files to their style
+    fingerprints. The normalized styles are stored once per fingerprint.
+
+    :param path: The path of the JSON file. Without a path nothing is cached.
+    """
+
+    path: Optional[Path] = None
+
+    files: dict[str, str]
+    """checksum -> fingerprint"""
+
+    styles: dict[str, StyleDict]
+    """fingerprint -> normalized styles"""
+
+    def __init__(self, path: Optional[PathOrStr] = None) -> None:
+        self.files = {}
+        self.styles = {}
+        if path is None:
+            return
+        self.path = Path(path)
+        if self.path.exists():
+            with open(self.path, "r") as cache_file:
+                data = json.load(cache_file)
+            self.files = data.get("files", {})
+            self.styles = data.get("styles", {})
+
+    def get(self, checksum: str) -> Optional[tuple[str, StyleDict]]:
+        fingerprint = self.files.get(checksum)
+        if fingerprint is None or fingerprint not in self.styles:
+            return None
+        return (fingerprint, self.styles[fingerprint])
+
+    def set(self, checksum: str, fingerprint: str, styles: StyleDict) -> None:
+        self.files[checksum] = fingerprint
+        self.styles[fingerprint] = styles
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with open(self.path, "w") as cache_file:
+            json.dump({"files": self.files, "styles": self.styles}, cache_file)
+
+
+def read_style_file(path: PathOrStr) -> StyleDict:
+    """Read and normalize the styles of a ``*.mss`` style file."""
+    xml = XmlManipulator(file_path=Path(path))
+    return Style.normalize(xml.find_safe("Style"))
+
+
+def _fingerprint_score(path: str) -> tuple[str, StyleDict]:
+    """Load a score and compute its style fingerprint. This function runs in
+    the worker processes."""
+    styles = Style.normalize(Score(path, readonly=True).style.parent_element)
+    return (Style.hash_styles(styles), styles)
+
+
+def _fingerprint_score_in_scope(
+    path: Path,
+) -> tuple[tuple[str, StyleDict], list[timing.Span]]:
+    with timing.file_scope(path):
+        return (_fingerprint_score(str(path)), [])
+
+
+def create_report(
+    paths: Iterable[PathOrStr], jobs: int = 1, cache_file: Optional[PathOrStr] = None
+) -> StyleReport:
+    """
+    Compute the style fingerprints of multiple scores and group the scores by
+    their fingerprint.
+
+    :param paths: The paths of the scores.
+    :param jobs: The number of worker processes.
+    :param cache_file: A JSON file to cache the fingerprints by file checksum.
+    """
+    cache = FingerprintCache(cache_file)
+    report = StyleReport()
+    groups: dict[str, StyleGroup] = {}
+
+    def add(path: Path, fingerprint: str, styles: StyleDict) -> None:
+        if fingerprint not in groups:
+            groups[fingerprint] = StyleGroup(fingerprint, styles)
+        groups[fingerprint].paths.append(path)
+
+    pending: list[tuple[Path, str]] = []
+    for p in paths:
+        path = Path(p)
+        try:
+            checksum = utils.get_checksum(path)
+        except OSError as e:
+            # Reported like a file that cannot be parsed.
+            report.errors.append((path, e))
+            continue
+        cached = cache.get(checksum)
+        if cached is not None:
+            add(path, *cached)
+        else:
+            pending.append((path, checksum))
+
+    def collect(
+        path: Path,
+        checksum: str,
+        result: Callable[[], tuple[tuple[str, StyleDict], list[timing.Span]]],
+    ) -> None:
+        try:
+            (fingerprint, styles), spans = result()
+        except Exception as e:
+            report.errors.append((path, e))
+            return
+        timing.profiler.merge(spans)
+        cache.set(checksum, fingerprint, styles)
+        add(path, fingerprint, styles)
+
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                (
+                    path,
+                    checksum,
+                    executor.submit(
+                        timing.record,
+                        timing.profiler.enabled,
+                        path,
+                        _fingerprint_score,
+                        str(path),
+                    ),
+                )
+                for path, checksum in pending
+            ]
+            for path, checksum, future in futures:
+                collect(path, checksum, future.result)
+    else:
+        for path, checksum in pending:
+            collect(path, checksum, partial(_fingerprint_score_in_scope, path))
+
+    cache.save()
+    report.groups = sorted(
+        groups.values(), key=lambda group: (-len(group.paths), group.fingerprint)
+    )
+    return report
+
+
+def print_report(report: StyleReport, reference: StyleDict) -> None:
+    """
+    Print the groups of a style report and the differences to the reference
+    styles.
+
+    :param report: The report created by :func:`create_report`.
+    :param reference: The normalized reference styles, see :func:`read_style_file`.
+    """
+    for group in report.groups:
+        differences = group.diff(reference)
+        if differences:
+            state = colorize(f"{len(differences)} differing styles", "red")
+        else:
+            state = colorize("matches the reference", "green")
+        print(
+            f"{colorize(group.fingerprint[:12], 'yellow')} "
+            f"({len(group.paths)} scores): {state}"
+        )
+        for path in sorted(group.paths):
+            print(f"  {path}")
+        for name, ref_value, value in differences:
+            print(f"    {colorize(name, 'blue')}: {ref_value} -> {value}")
+        print("")
+
+    for path, error in report.errors:
+        print(f"{colorize('Error', 'white', 'on_red')}: {path}")
+        print(f"  {error.__class__.__name__}: {error}")
@@ -0,0 +1,440 @@
+"""Lightweight timing spans around the processing phases of the scores.
+
+The recording is disabled by default. It is enabled on the command line with
+the options ``--profile``, ``--profile-json``, ``--trace`` or
+``--memory-profile``.
+
+.. code-block:: python
+
+    from mscxyz import timing
+
+    timing.enable()
+    with timing.file_scope("score.mscz"):
+        with timing.span("score.load"):
+            ...
+    timing.print_summary()
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+import typing
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from functools import wraps
+from typing import Any, Callable, Generator, Iterable, Optional, TypeVar
+
+if typing.TYPE_CHECKING:
+    from mscxyz.utils import PathOrStr
+
+F = TypeVar("F", bound=Callable[..., Any])
+T = TypeVar("T")
+
+
+@dataclass
+class Span:
+    """A timed phase."""
+
+    name: str
+    """The name of the phase, for example ``zip.extract`` or ``xml.parse``."""
+
+    file: Optional[str]
+    """The path of the score file that was processed during the phase."""
+
+    start: float
+    """The start time in seconds of the monotonic clock :func:`time.perf_counter`.
+    On Linux the clock is shared by all processes, so the spans of worker
+    processes can be placed on the same timeline."""
+
+    duration: float
+    """The duration in seconds."""
+
+    pid: int
+    """The ID of the process."""
+
+    tid: int
+    """The native ID of the thread."""
+
+    memory_peak: Optional[int] = None
+    """The peak in bytes of the Python memory allocated during the phase above
+    the allocated memory at the start of the phase, measured with
+    :mod:`tracemalloc`. Only recorded with ``--memory-profile``."""
+
+    rss_delta: Optional[int] = None
+    """The change of the resident set size of the process in bytes. In contrast
+    to :attr:`memory_peak` it includes the memory allocated by libxml2."""
+
+
+def _get_rss() -> int:
+    """The current resident set size of the process in bytes."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Not Linux: fall back to the maximum resident set size.
+        import resource
+
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class Profiler:
+    """Record the spans of the processing phases."""
+
+    enabled: bool = False
+
+    memory: bool = False
+    """Record the memory usage of the spans as well."""
+
+    spans: list[Span]
+
+    start: float
+    """The time when the recording has been enabled."""
+
+    __file: Optional[str] = None
+
+    __peaks: list[int]
+    """The highest :mod:`tracemalloc` peak of each open span. The peak of
+    :mod:`tracemalloc` is reset at the start of each span, so the peaks of the
+    outer spans are carried here."""
+
+    def __init__(self) -> None:
+        self.spans = []
+        self.start = time.perf_counter()
+        self.__peaks = []
+
+    def enable(self, memory: bool = False) -> None:
+        self.enabled = True
+        self.spans = []
+        self.start = time.perf_counter()
+        self.memory = memory
+        self.__peaks = []
+        if memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self.memory:
+            import tracemalloc
+
+            self.memory = False
+            tracemalloc.stop()
+
+    @property
+    def file(self) -> Optional[str]:
+        """The path of the score file that is currently processed."""
+        return self.__file
+
+    @contextmanager
+    def file_scope(self, file: PathOrStr) -> Generator[None, None, None]:
+        """Assign all spans inside the scope to a score file and record the
+        whole scope as the span ``file``."""
+        previous = self.__file
+        self.__file = str(file)
+        try:
+            with self.span("file"):
+                yield
+        finally:
+            self.__file = previous
+
+    @contextmanager
+    def span(self, name: str) -> Generator[None, None, None]:
+        """Record the duration of the code inside the ``with`` block."""
+        if not self.enabled:
+            yield
+            return
+        span = Span(
+            name=name,
+            file=self.__file,
+            start=time.perf_counter(),
+            duration=0.0,
+            pid=os.getpid(),
+            tid=threading.get_native_id(),
+        )
+        memory: list[int] = []
+        measure = self.__measure_memory() if self.memory else nullcontext(memory)
+        try:
+            with measure as memory:
+                yield
+        finally:
+            span.duration = time.perf_counter() - span.start
+            if memory:
+                span.memory_peak, span.rss_delta = memory
+            self.spans.append(span)
+
+    @contextmanager
+    def __measure_memory(self) -> Generator[list[int], None, None]:
+        """Measure the memory peak and the RSS delta of a ``with`` block.
+
+        :return: A list, which contains the peak and the RSS delta after
+          the block.
+        """
+        import tracemalloc
+
+        rss = _get_rss()
+        current, peak = tracemalloc.get_traced_memory()
+        if self.__peaks:
+            self.__peaks[-1] = max(self.__peaks[-1], peak)
+        tracemalloc.reset_peak()
+        self.__peaks.append(0)
+        result: list[int] = []
+        try:
+            yield result
+        finally:
+            block_peak = max(self.__peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if self.__peaks:
+                self.__peaks[-1] = max(self.__peaks[-1], block_peak)
+            result.extend((block_peak - current, _get_rss() - rss))
+
+    def merge(self, spans: Iterable[Span]) -> None:
+        """Add the spans recorded in a worker process, see :func:`record`."""
+        self.spans.extend(spans)
+
+    def summary(self) -> dict[str, Any]:
+        """Aggregate the recorded spans.
+
+        :return: A dictionary with the totals and the 50th and 95th percentile
+          per file of each phase, the number of files and the throughput.
+        """
+        wall_time = time.perf_counter() - self.start
+        per_file: dict[str, dict[Optional[str], float]] = {}
+        for span in self.spans:
+            phase = per_file.setdefault(span.name, {})
+            phase[span.file] = phase.get(span.file, 0.0) + span.duration
+
+        phases: dict[str, dict[str, float]] = {}
+        for name, durations in sorted(per_file.items()):
+            values = sorted(durations.values())
+            phases[name] = {
+                "total": sum(values),
+                "count": len(values),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+            }
+
+        files = len(per_file.get("file", {}))
+        return {
+            "phases": phases,
+            "files": files,
+            "wall_time": wall_time,
+            "files_per_second": files / wall_time if wall_time > 0 else 0.0,
+        }
+
+    def print_summary(self) -> None:
+        summary = self.summary()
+        print(f"{'phase':<20} {'total':>10} {'p50':>10} {'p95':>10} {'count':>7}")
+        for name, phase in summary["phases"].items():
+            print(
+                f"{name:<20} {phase['total']:>9.3f}s {phase['p50']:>9.4f}s "
+                f"{phase['p95']:>9.4f}s {phase['count']:>7}"
+            )
+        print(
+            f"{summary['files']} files in {summary['wall_time']:.3f}s "
+            f"({summary['files_per_second']:.1f} files/s)"
+        )
+
+    def memory_summary(self) -> dict[str, dict[str, int]]:
+        """Aggregate the memory usage of the spans recorded with
+        ``--memory-profile``.
+
+        :return: The maximum and the 95th percentile per file of the memory
+          peak and the maximum RSS delta of each phase.
+        """
+        peaks: dict[str, dict[Optional[str], int]] = {}
+        rss_deltas: dict[str, list[int]] = {}
+        for span in self.spans:
+            if span.memory_peak is None or span.rss_delta is None:
+                continue
+            phase = peaks.setdefault(span.name, {})
+            phase[span.file] = max(phase.get(span.file, 0), span.memory_peak)
+            rss_deltas.setdefault(span.name, []).append(span.rss_delta)
+
+        phases: dict[str, dict[str, int]] = {}
+        for name, per_file in sorted(peaks.items()):
+            values = sorted(per_file.values())
+            phases[name] = {
+                "peak_max": values[-1],
+                "peak_p95": int(_percentile([float(v) for v in values], 95)),
+                "rss_delta_max": max(rss_deltas[name]),
+            }
+        return phases
+
+    def print_file_memory(self, file: PathOrStr) -> None:
+        """Print the memory peak and the RSS delta of a file and the memory peak
+        of its phases."""
+        file = str(file)
+        phases: dict[str, int] = {}
+        total: Optional[Span] = None
+        for span in self.spans:
+            if span.file != file or span.memory_peak is None:
+                continue
+            if span.name == "file":
+                total = span
+            else:
+                phases[span.name] = max(phases.get(span.name, 0), span.memory_peak)
+        if total is None or total.memory_peak is None or total.rss_delta is None:
+            return
+        details = ", ".join(
+            f"{name} {_format_bytes(peak)}"
+            for name, peak in sorted(phases.items(), key=lambda item: -item[1])
+        )
+        print(
+            f"Memory: {file}: peak {_format_bytes(total.memory_peak)}, "
+            f"RSS {_format_bytes(total.rss_delta, sign=True)} ({details})"
+        )
+
+    def print_memory_summary(self) -> None:
+        print(f"{'phase':<20} {'peak max':>12} {'peak p95':>12} {'RSS max':>12}")
+        for name, phase in self.memory_summary().items():
+            print(
+                f"{name:<20} {_format_bytes(phase['peak_max']):>12} "
+                f"{_format_bytes(phase['peak_p95']):>12} "
+                f"{_format_bytes(phase['rss_delta_max'], sign=True):>12}"
+            )
+
+    def write_json(self, path: PathOrStr) -> None:
+        """Write the summary and the raw spans into a JSON file."""
+        with open(path, "w") as output:
+            json.dump(
+                {
+                    "summary": self.summary(),
+                    "memory": self.memory_summary(),
+                    "spans": [asdict(span) for span in self.spans],
+                },
+                output,
+                indent=2,
+            )
+
+    def trace_events(self) -> list[dict[str, Any]]:
+        """Convert the spans into complete events (``"ph": "X"``) of the
+        Chrome Trace Event Format. The timestamps are microseconds since the
+        recording has been enabled."""
+        events: list[dict[str, Any]] = []
+        main_pid = os.getpid()
+        for pid in sorted({span.pid for span in self.spans}):
+            events.append(
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "args": {"name": "main" if pid == main_pid else f"worker {pid}"},
+                }
+            )
+        for span in sorted(self.spans, key=lambda span: span.start):
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.name.split(".")[0],
+                    "ph": "X",
+                    "ts": round((span.start - self.start) * 1_000_000, 3),
+                    "dur": round(span.duration * 1_000_000, 3),
+                    "pid": span.pid,
+                    "tid": span.tid,
+                    "args": {"file": span.file}
+                    if span.memory_peak is None
+                    else {
+                        "file": span.file,
+                        "memory_peak": span.memory_peak,
+                        "rss_delta": span.rss_delta,
+                    },
+                }
+            )
+        return events
+
+    def write_trace(self, path: PathOrStr) -> None:
+        """Write the spans into a JSON file in the Chrome Trace Event Format,
+        which can be loaded in Perfetto or ``chrome://tracing``."""
+        with open(path, "w") as output:
+            json.dump(
+                {"traceEvents": self.trace_events(), "displayTimeUnit": "ms"},
+                output,
+            )
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    """The percentile of sorted values using the nearest-rank method."""
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * percent // 100))
+    return values[rank - 1]
+
+
+def _format_bytes(size: int, sign: bool = False) -> str:
+    return f"{size / 1024 / 1024:{'+' if sign else ''}.1f} MB"
+
+
+profiler = Profiler()
+
+
+def enable(memory: bool = False) -> None:
+    profiler.enable(memory)
+
+
+def span(name: str) -> AbstractContextManager[None]:
+    """Record the duration of the code inside the ``with`` block, see
+    :meth:`Profiler.span`."""
+    return profiler.span(name)
+
+
+def file_scope(file: PathOrStr) -> AbstractContextManager[None]:
+    """See :meth:`Profiler.file_scope`."""
+    return profiler.file_scope(file)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """A decorator to record each call of a function as a span."""
+
+    def decorator(function: F) -> F:
+        @wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            with profiler.span(name):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+def record(
+    enabled: bool,
+    file: PathOrStr,
+    function: Callable[..., T],
+    *args: Any,
+    memory: bool = False,
+) -> tuple[T, list[Span]]:
+    """Call a function in a worker process within the scope of a score file.
+
+    :param enabled: Whether the recording is enabled in the main process.
+    :param file: The score file the spans are assigned to.
+    :param function: The function to call with the remaining arguments.
+    :param memory: Whether the memory usage is recorded in the main process.
+
+    :return: The return value of the function and the spans recorded in the
+      worker, which are added to the main process with :meth:`Profiler.merge`.
+    """
+    if not enabled:
+        return (function(*args), [])
+    profiler.enable(memory)
+    try:
+        with profiler.file_scope(file):
+            result = function(*args)
+        return (result, profiler.spans)
+    finally:
+        profiler.disable()
+
+
+def print_summary() -> None:
+    profiler.print_summary()
+
+
+def print_memory_summary() -> None:
+    profiler.print_memory_summary()
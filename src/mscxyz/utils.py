@@ -2,21 +2,41 @@
 
 from __future__ import annotations  # For subprocess.Popen[Any]
 
+import copy
 import fnmatch
+import hashlib
+import io
 import os
 import platform
+import re
+import shutil
 import string
 import subprocess
 import tempfile
+import typing
 import zipfile
 from os import PathLike
 from pathlib import Path
-from typing import Any, Generator, List, Literal, Optional, Union
-
-import termcolor
-
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from mscxyz import timing
+from mscxyz.atomic import Durability, atomic_write
 from mscxyz.settings import get_args
-from mscxyz.xml import XmlManipulator
+
+if typing.TYPE_CHECKING:
+    from mscxyz.xml import XmlManipulator
 
 ListExtension = Literal["mscz", "mscx", "both"]
 PathOrStr = Union[PathLike[str], str, Path]
@@ -25,16 +45,81 @@ PathOrStr = Union[PathLike[str], str, Path]
 INCH = 25.4
 
 
+Symlinks = Literal["files", "follow", "ignore"]
+
+
+def _compile_patterns(patterns: Sequence[str]) -> Callable[[str], bool]:
+    """Translate the glob patterns once into a single regular expression."""
+    if not patterns:
+        return lambda name: False
+    regex = re.compile(
+        "|".join(f"(?:{fnmatch.translate(os.path.normcase(p))})" for p in patterns)
+    )
+    return lambda name: regex.match(os.path.normcase(name)) is not None
+
+
+def _scan_dir(
+    directory: str, symlinks: Symlinks
+) -> tuple[list[os.DirEntry[str]], list[os.DirEntry[str]]]:
+    """:return: The files and the subdirectories of a directory."""
+    files: list[os.DirEntry[str]] = []
+    directories: list[os.DirEntry[str]] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_symlink():
+                        if symlinks == "ignore":
+                            continue
+                        if entry.is_dir() and symlinks == "follow":
+                            directories.append(entry)
+                        elif entry.is_file():
+                            files.append(entry)
+                    elif entry.is_dir(follow_symlinks=False):
+                        directories.append(entry)
+                    else:
+                        files.append(entry)
+                except OSError:
+                    continue
+    except OSError:
+        # Like os.walk: skip directories that vanished or cannot be read.
+        pass
+    return files, directories
+
+
 def list_path(
-    src: PathOrStr | list[PathOrStr],
+    src: PathOrStr | Iterable[PathOrStr],
     extension: ListExtension = "both",
-    glob: Optional[str] = None,
+    glob: Optional[str | Sequence[str]] = None,
+    exclude: Sequence[str] = (),
+    skip_backups: bool = False,
+    symlinks: Symlinks = "files",
+    threads: int = 1,
 ) -> Generator[Path, None, None]:
     """List all scores in path.
 
-    :param src: A directory to search for files or a file path or multiple directories or paths.
+    The directories are scanned top-down with :func:`os.scandir`. The files
+    of a directory are listed before the files of its subdirectories.
+
+    :param src: A directory to search for files or a file path or multiple
+      directories or paths. Multiple paths are consumed lazily, for example
+      from :func:`read_file_list`.
     :param extension: Possible values: “both”, “mscz” or “mscx”.
-    :param glob: A glob string, see fnmatch
+    :param glob: A glob string or multiple glob strings, see fnmatch. A file
+      is listed if its path matches one of them.
+    :param exclude: Glob strings that are matched against the names of the
+      files and directories, for example ``.git`` or ``build``. Excluded
+      directories are not scanned.
+    :param skip_backups: Skip the backup copies ``*_bak.msc[xz]`` created by
+      :meth:`mscxyz.score.Score.backup`.
+    :param symlinks: ``files``: list symbolic links to files, but do not
+      descend into symbolic links to directories (like :func:`os.walk`).
+      ``follow``: follow all symbolic links. Files and directories that are
+      reachable by several paths are listed once. ``ignore``: skip all
+      symbolic links.
+    :param threads: Scan the directories with this number of threads, which
+      speeds up the scan of network file systems. The order of the files is
+      not deterministic with more than one thread.
     """
 
     if not glob:
@@ -48,19 +133,113 @@ def list_path(
                 "are: “both”, “mscx”, “mscz”"
             )
 
-    if not isinstance(src, list):
+    matches = _compile_patterns([glob] if isinstance(glob, str) else glob)
+    excluded = _compile_patterns(exclude)
+
+    if isinstance(src, (str, PathLike)):
         src = [src]
 
+    # (device, inode) of the visited directories and the listed files if
+    # symbolic links are followed
+    seen: set[tuple[int, int]] = set()
+
+    def is_new(entry: os.DirEntry[str] | Path) -> bool:
+        if symlinks != "follow":
+            return True
+        try:
+            stat = entry.stat()
+        except OSError:
+            return False
+        key = (stat.st_dev, stat.st_ino)
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    def select_files(files: list[os.DirEntry[str]]) -> Iterator[Path]:
+        for entry in files:
+            if excluded(entry.name) or not matches(entry.path):
+                continue
+            if skip_backups and entry.name.rsplit(".", 1)[0].endswith("_bak"):
+                continue
+            if is_new(entry):
+                yield Path(entry.path)
+
+    def select_directories(directories: list[os.DirEntry[str]]) -> list[str]:
+        return [
+            entry.path
+            for entry in directories
+            if not excluded(entry.name) and is_new(entry)
+        ]
+
     for s in src:
         path = Path(s)
-        if path.is_file() and fnmatch.fnmatch(str(s), glob):
+        if path.is_file() and matches(str(s)):
             yield path
         elif path.is_dir():
-            for root, _, files in os.walk(path):
-                for file in files:
-                    relpath = Path(root) / file
-                    if fnmatch.fnmatch(str(relpath), glob):
-                        yield relpath
+            root = str(path)
+            if not is_new(path):
+                continue
+            if threads > 1:
+                yield from _scan_in_threads(
+                    root, threads, symlinks, select_files, select_directories
+                )
+                continue
+            stack = [root]
+            while stack:
+                files, directories = _scan_dir(stack.pop(), symlinks)
+                yield from select_files(files)
+                # Reversed to scan the subdirectories in the order of scandir.
+                stack.extend(reversed(select_directories(directories)))
+
+
+def read_file_list(stream: BinaryIO, null: bool = False) -> Iterator[Path]:
+    """
+    Read the paths of a list of files, for example ``git diff --name-only``.
+    The paths are yielded as soon as they are read, so the processing can
+    start before the list is complete.
+
+    :param stream: A binary stream, for example ``sys.stdin.buffer``.
+    :param null: The paths are separated by NUL characters (``find -print0``)
+      instead of newlines.
+    """
+    separator = b"\0" if null else b"\n"
+    # read1() returns as soon as some data is available in a pipe.
+    read = getattr(stream, "read1", stream.read)
+    pending = b""
+    while chunk := read(1 << 16):
+        *entries, pending = (pending + chunk).split(separator)
+        for entry in entries:
+            if not null:
+                entry = entry.rstrip(b"\r")
+            if entry:
+                yield Path(os.fsdecode(entry))
+    if pending and not null:
+        pending = pending.rstrip(b"\r")
+    if pending:
+        yield Path(os.fsdecode(pending))
+
+
+def _scan_in_threads(
+    root: str,
+    threads: int,
+    symlinks: Symlinks,
+    select_files: Callable[[list[os.DirEntry[str]]], Iterator[Path]],
+    select_directories: Callable[[list[os.DirEntry[str]]], list[str]],
+) -> Iterator[Path]:
+    """Scan the directories in worker threads. The results are filtered in
+    the calling thread, so the filters need no locks."""
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pending = {executor.submit(_scan_dir, root, symlinks)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, directories = future.result()
+                yield from select_files(files)
+                for directory in select_directories(directories):
+                    pending.add(executor.submit(_scan_dir, directory, symlinks))
 
 
 def list_zero_alphabet() -> List[str]:
@@ -163,6 +342,18 @@ class Dimension:
         return Dimension.convert(self.value, self.unit, unit)
 
 
+def mm(value: str | float) -> float:
+    if not isinstance(value, str):
+        return value
+    return Dimension(value).to("mm")
+
+
+def inch(value: str | float) -> float:
+    if not isinstance(value, str):
+        return value
+    return Dimension(value).to("in")
+
+
 # https://github.com/termcolor/termcolor/issues/62
 Color = Literal[
     "black",
@@ -213,6 +404,8 @@ def colorize(
     """
     settings = get_args()
     if settings.info_color:
+        import termcolor
+
         return termcolor.colored(text, color, on_color)
     else:
         return text
@@ -303,24 +496,15 @@ class ZipContainer:
     def __init__(self, abspath: str | Path) -> None:
         self.tmp_dir = ZipContainer._extract_zip(abspath)
 
+        from mscxyz.xml import XmlManipulator
+
         xml = XmlManipulator(file_path=self.tmp_dir / "META-INF" / "container.xml")
 
-        for root_file in xml.findall(".//rootfiles/rootfile"):
-            relpath = root_file.get("full-path")
-            if isinstance(relpath, str):
-                abs_path: Path = self.tmp_dir / relpath
-                if relpath.endswith(".mscx"):
-                    self.xml_file = abs_path
-                elif relpath.endswith(".mss"):
-                    self.score_style_file = abs_path
-                elif relpath.endswith(".png"):
-                    self.thumbnail_file = abs_path
-                elif relpath.endswith("audiosettings.json"):
-                    self.audiosettings_file = abs_path
-                elif relpath.endswith("viewsettings.json"):
-                    self.viewsettings_file = abs_path
+        for attr, relpath in _read_root_files(xml).items():
+            setattr(self, attr, self.tmp_dir / relpath)
 
     @staticmethod
+    @timing.timed("zip.extract")
     def _extract_zip(abspath: str | Path) -> Path:
         tmp_zipdir = Path(tempfile.mkdtemp())
         zip = zipfile.ZipFile(abspath, "r")
@@ -328,14 +512,123 @@ class ZipContainer:
         zip.close()
         return tmp_zipdir
 
-    def save(self, dest: str | Path) -> None:
-        zip = zipfile.ZipFile(dest, "w")
+    @timing.timed("zip.save")
+    def save(self, dest: str | Path, durability: Durability = "none") -> None:
+        """Zip the files. The destination is replaced atomically, see
+        :mod:`mscxyz.atomic`."""
+        with atomic_write(dest, "wb", durability) as f, zipfile.ZipFile(f, "w") as zip:
+            for r, _, files in os.walk(self.tmp_dir):
+                root = Path(r)
+                relpath: Path = root.relative_to(self.tmp_dir)
+                for file_name in files:
+                    zip.write(root / file_name, relpath / file_name)
+
+    def read_members(self) -> dict[str, bytes]:
+        """Read the unzipped files.
+
+        :return: The content of the files by their paths in the zip file."""
+        members: dict[str, bytes] = {}
         for r, _, files in os.walk(self.tmp_dir):
             root = Path(r)
-            relpath: Path = root.relative_to(self.tmp_dir)
             for file_name in files:
-                zip.write(root / file_name, relpath / file_name)
-        zip.close()
+                relpath = (root / file_name).relative_to(self.tmp_dir).as_posix()
+                members[relpath] = (root / file_name).read_bytes()
+        return members
+
+    @timing.timed("zip.copy")
+    def copy(self) -> ZipContainer:
+        """Copy the unzipped files into a new temporary directory, without
+        extracting the zip file again."""
+        clone = copy.copy(self)
+        clone.tmp_dir = Path(tempfile.mkdtemp())
+        shutil.copytree(self.tmp_dir, clone.tmp_dir, dirs_exist_ok=True)
+        for attr, value in vars(self).items():
+            if attr != "tmp_dir" and isinstance(value, Path):
+                setattr(clone, attr, clone.tmp_dir / value.relative_to(self.tmp_dir))
+        return clone
+
+
+class MemoryZipContainer:
+    """The files of a MuseScore file that is unzipped in memory. The paths are
+    relative to the root of the zip file."""
+
+    members: dict[str, bytes]
+    """The content of the files by their paths in the zip file"""
+
+    xml_file: str
+    """The path of the uncompressed XML score file"""
+
+    score_style_file: Optional[str] = None
+    """The path of the score style file"""
+
+    @timing.timed("zip.extract")
+    def __init__(self, data: bytes) -> None:
+        with zipfile.ZipFile(io.BytesIO(data)) as zip:
+            self.members = {
+                info.filename: zip.read(info)
+                for info in zip.infolist()
+                if not info.is_dir()
+            }
+        from mscxyz.xml import XmlManipulator
+
+        xml = XmlManipulator(xml_markup=self.members["META-INF/container.xml"])
+        root_files = _read_root_files(xml)
+        self.xml_file = root_files["xml_file"]
+        self.score_style_file = root_files.get("score_style_file")
+
+
+def _read_root_files(container: XmlManipulator) -> dict[str, str]:
+    """
+    Read the ``META-INF/container.xml`` file of a zipped MuseScore file.
+
+    :return: The relative paths of the root files by the names of the
+      attributes of :class:`ZipContainer`, for example ``xml_file``.
+    """
+    root_files: dict[str, str] = {}
+    for root_file in container.findall(".//rootfiles/rootfile"):
+        relpath = root_file.get("full-path")
+        if isinstance(relpath, str):
+            if relpath.endswith(".mscx"):
+                root_files["xml_file"] = relpath
+            elif relpath.endswith(".mss"):
+                root_files["score_style_file"] = relpath
+            elif relpath.endswith(".png"):
+                root_files["thumbnail_file"] = relpath
+            elif relpath.endswith("audiosettings.json"):
+                root_files["audiosettings_file"] = relpath
+            elif relpath.endswith("viewsettings.json"):
+                root_files["viewsettings_file"] = relpath
+    return root_files
+
+
+@timing.timed("zip.save")
+def write_zip(members: dict[str, bytes]) -> bytes:
+    """Zip files in memory.
+
+    :param members: The content of the files by their paths in the zip file.
+    """
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w") as zip:
+        for name, content in members.items():
+            zip.writestr(name, content)
+    return output.getvalue()
+
+
+def get_checksum(filename: str | Path) -> str:
+    """
+    Calculate the SHA1 checksum of a file.
+
+    :param filename: Path to the file for which to compute the checksum
+    :return: Hexadecimal representation of the SHA1 checksum
+    """
+    BLOCKSIZE = 65536
+    hasher = hashlib.sha1()
+    with open(filename, "rb") as afile:
+        buf = afile.read(BLOCKSIZE)
+        while len(buf) > 0:
+            hasher.update(buf)
+            buf = afile.read(BLOCKSIZE)
+    return hasher.hexdigest()
 
 
 def read_file(filename: str | Path) -> str:
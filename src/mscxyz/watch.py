@@ -0,0 +1,223 @@
+"""Watch the score files and process those that were added or modified.
+
+The watcher compares snapshots of the modification time and the size of the
+selected files. On Linux it sleeps until inotify reports a change in one of
+the watched directories and only then scans the files again. On other
+platforms it scans the files in an interval.
+
+The files that the processing writes itself (saves, backups, renames,
+exports) are taken into the snapshot with the modification time and the
+size recorded at the time of the write (:mod:`mscxyz.atomic`), so they do
+not trigger another round. All other changes, for example a save in
+MuseScore while the files are processed, even of a file that was just
+written, are picked up in the next round.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import os
+import select
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Mapping, Optional, Sequence
+
+from mscxyz.utils import PathOrStr, list_path
+
+Snapshot = dict[Path, tuple[int, int]]
+"""path -> (modification time in nanoseconds, size)"""
+
+
+def stat_files(files: Iterable[Path]) -> Snapshot:
+    snapshot: Snapshot = {}
+    for path in files:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def take_snapshot(paths: Sequence[PathOrStr], glob: Optional[str] = None) -> Snapshot:
+    return stat_files(list_path(list(paths), glob=glob))
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> list[Path]:
+    """:return: The files that were added or modified. Deleted files are
+    ignored."""
+    return [path for path, stat in new.items() if old.get(path) != stat]
+
+
+class _Inotify:
+    """Wake up on changes in the watched directories, see ``man 7 inotify``."""
+
+    mask = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200
+    """IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO,
+    IN_CREATE and IN_DELETE"""
+
+    def __init__(self) -> None:
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd: int = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+
+    @classmethod
+    def create(cls) -> Optional[_Inotify]:
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            return cls()
+        except (AttributeError, OSError):
+            return None
+
+    def add_watches(self, paths: Sequence[PathOrStr]) -> None:
+        """Watch the directories recursively. Watching a directory again is
+        a no-op, so this can be called after each scan to cover new
+        directories."""
+        for path in paths:
+            path = Path(path)
+            directories = (
+                [root for root, _, _ in os.walk(path)]
+                if path.is_dir()
+                else [str(path.parent)]
+            )
+            for directory in directories:
+                self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.mask)
+
+    def wait(self, timeout: float) -> bool:
+        """:return: ``True`` if an event occurred within the timeout."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class Watcher:
+    """
+    :param paths: The files and directories to watch.
+    :param glob: The glob pattern of :func:`mscxyz.utils.list_path`.
+    :param interval: The interval in seconds to poll the paths. With inotify
+      the interval is only the upper bound of a sleep.
+    :param debounce: A burst of saves is processed once the files have not
+      changed for this number of seconds.
+    :param inotify: Use inotify if it is available.
+    :param list_files: List the selected files instead of
+      :func:`mscxyz.utils.list_path` with ``paths`` and ``glob``.
+    :param sleep: The sleep function, replaceable in tests.
+    """
+
+    snapshot: Snapshot
+
+    def __init__(
+        self,
+        paths: Sequence[PathOrStr],
+        glob: Optional[str] = None,
+        interval: float = 1.0,
+        debounce: float = 0.5,
+        inotify: bool = True,
+        list_files: Optional[Callable[[], Iterable[Path]]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.paths = paths
+        self.glob = glob
+        self.interval = interval
+        self.debounce = debounce
+        self.list_files = list_files
+        self.sleep = sleep
+        self.__inotify = _Inotify.create() if inotify else None
+        if self.__inotify is not None:
+            self.__inotify.add_watches(paths)
+        self.snapshot = self.scan()
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self.__inotify is not None
+
+    def scan(self) -> Snapshot:
+        """Stat the selected files. The paths are absolute to compare them with
+        the written files."""
+        if self.list_files is not None:
+            files: Iterable[Path] = self.list_files()
+        else:
+            files = list_path(list(self.paths), glob=self.glob)
+        return stat_files(Path(os.path.abspath(file)) for file in files)
+
+    def wait(self) -> bool:
+        """Sleep until a change might have happened.
+
+        :return: ``True`` if the files have to be scanned: inotify reported an
+          event or the polling interval elapsed.
+        """
+        if self.__inotify is not None:
+            return self.__inotify.wait(self.interval)
+        self.sleep(self.interval)
+        return True
+
+    def poll(self) -> list[Path]:
+        """
+        Compare the files with the last snapshot. If something changed, wait
+        until the files have settled for the debounce period.
+
+        :return: The files that were added or modified.
+        """
+        current = self.scan()
+        if not diff_snapshots(self.snapshot, current):
+            self.snapshot = current
+            return []
+        while True:
+            self.sleep(self.debounce)
+            settled = self.scan()
+            if settled == current:
+                break
+            current = settled
+        changed = diff_snapshots(self.snapshot, current)
+        self.snapshot = current
+        if self.__inotify is not None:
+            self.__inotify.add_watches(self.paths)
+        return changed
+
+    def absorb(self, written: Mapping[str, tuple[int, int]]) -> None:
+        """Take the files that the processing wrote itself into the snapshot,
+        so that they do not trigger another round. The files are not stat'ed
+        again: a save of another program after the write differs from the
+        recorded status and stays visible to the next :meth:`poll`.
+
+        :param written: See :func:`mscxyz.atomic.take_written`.
+        """
+        for file, stat in written.items():
+            self.snapshot[Path(os.path.abspath(file))] = stat
+
+    def run(
+        self,
+        process: Callable[[list[Path]], Mapping[str, tuple[int, int]]],
+        rounds: Optional[int] = None,
+    ) -> None:
+        """
+        Process the added or modified files until interrupted.
+
+        :param process: Process the changed files and return the files it
+          wrote, see :func:`mscxyz.atomic.take_written`.
+        :param rounds: Stop after this number of waits, mainly for tests.
+        """
+        while rounds is None or rounds > 0:
+            if self.wait():
+                changed = self.poll()
+                if changed:
+                    self.absorb(process(changed))
+            if rounds is not None:
+                rounds -= 1
+
+    def close(self) -> None:
+        if self.__inotify is not None:
+            self.__inotify.close()
+            self.__inotify = None
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import typing
+from dataclasses import dataclass
 from io import TextIOWrapper
 from pathlib import Path
-from typing import Literal, Optional, Union
+from typing import Callable, Literal, Optional, Union
 
 from lxml.etree import (
     XML,
@@ -15,6 +16,9 @@ from lxml.etree import (
     tostring,
 )
 
+from mscxyz import timing
+from mscxyz.atomic import Durability, atomic_write
+
 if typing.TYPE_CHECKING:
     from lxml.etree import _DictAnyStr, _XPathObject
 
@@ -24,19 +28,49 @@ ListExtension = Literal["mscz", "mscx", "both"]
 ElementLike = Optional[Union[_Element, _ElementTree, None]]
 
 
+@dataclass
+class Rule:
+    """A rule for :meth:`XmlManipulator.apply_rules`."""
+
+    tag: str
+    """The tag name of the elements the rule applies to, for example ``Lyrics``."""
+
+    predicate: Optional[Callable[[_Element], bool]] = None
+    """The rule only applies to elements for which the predicate returns ``True``.
+    The predicate is called during the traversal and must not modify the tree."""
+
+    action: Optional[Callable[[_Element], None]] = None
+    """A function that is called with each matching element after the traversal."""
+
+    remove: bool = False
+    """Remove the matching elements after the traversal."""
+
+
+class ReadOnlyError(Exception):
+    """Raised on an attempt to modify a read-only XML tree."""
+
+
 class XmlManipulator:
-    """A wrapper around lxml.etree"""
+    """A wrapper around lxml.etree
+
+    :param readonly: Forbid the modifications of the tree, see
+      :meth:`check_writable`.
+    """
 
     root: _Element
 
     file_path: Optional[Union[str, Path]] = None
 
+    readonly: bool = False
+
     def __init__(
         self,
         element: Optional[_Element] = None,
         file_path: Optional[Union[str, Path]] = None,
-        xml_markup: Optional[str] = None,
+        xml_markup: Optional[Union[str, bytes]] = None,
+        readonly: bool = False,
     ) -> None:
+        self.readonly = readonly
         if element is not None:
             self.root = element
         elif file_path is not None:
@@ -50,6 +84,7 @@ class XmlManipulator:
     # Crud: Create #############################################################
 
     @staticmethod
+    @timing.timed("xml.parse")
     def parse_file(path: str | Path | TextIOWrapper) -> _Element:
         """
         Read an XML file and return the root element.
@@ -61,9 +96,19 @@ class XmlManipulator:
         return parse(path).getroot()
 
     @staticmethod
-    def parse_string(xml_markup: str) -> _Element:
+    @timing.timed("xml.parse")
+    def parse_string(xml_markup: str | bytes) -> _Element:
+        """
+        Parse an XML string and return the root element.
+
+        :param xml_markup: The XML markup. Markup with an encoding declaration
+          has to be passed as bytes.
+
+        :return: The root element of the XML markup.
+        """
         return XML(xml_markup)
 
+    @timing.timed("xml.serialize")
     def tostring(self, element: ElementLike = None) -> str:
         """
         Convert the XML element or tree to a string.
@@ -79,18 +124,28 @@ class XmlManipulator:
             + "\n"
         )
 
-    def write(self, path: str | Path, element: ElementLike = None) -> None:
+    def write(
+        self,
+        path: str | Path,
+        element: ElementLike = None,
+        durability: Durability = "none",
+    ) -> None:
         """
-        Write the XML element or tree to the specified file.
+        Write the XML element or tree to the specified file. The file is
+        replaced atomically, see :mod:`mscxyz.atomic`.
 
         :param path: The path to the file.
         :param element: The XML element or tree to write.
+        :param durability: ``none``, ``fsync`` or ``batch``.
 
         :return: None
         """
-        element = self.__get_element(element)
-        with open(path, "w") as document:
-            document.write(self.tostring(element))
+        markup = self.tostring(self.__get_element(element))
+        with (
+            timing.span("xml.write"),
+            atomic_write(path, "w", durability) as document,
+        ):
+            document.write(markup)
 
     @staticmethod
     def create_element(tag_name: str, attrib: Optional[_DictAnyStr] = None) -> _Element:
@@ -323,6 +378,15 @@ class XmlManipulator:
 
     # crUd: Update #############################################################
 
+    def check_writable(self) -> None:
+        """
+        Called before each modification of the tree.
+
+        :raises ReadOnlyError: If the tree is read-only.
+        """
+        if self.readonly:
+            raise ReadOnlyError("The XML tree is read-only")
+
     def set_text(
         self, element_path: str, value: str | int | float, element: ElementLike = None
     ) -> XmlManipulator:
@@ -338,6 +402,7 @@ class XmlManipulator:
 
         :return: The XmlManipulator instance for method chaining.
         """
+        self.check_writable()
         self.find_safe(element_path, element).text = str(value)
         return self
 
@@ -384,7 +449,43 @@ class XmlManipulator:
 
         :return: The XmlManipulator instance for method chaining.
         """
+        self.check_writable()
         for path in element_paths:
             for element in self.findall(path):
                 self.remove(element)
         return self
+
+    # Rules ####################################################################
+
+    def apply_rules(self, *rules: Rule, element: ElementLike = None) -> XmlManipulator:
+        """
+        Apply multiple rules in a single traversal of the XML tree.
+
+        The predicates are evaluated while walking the tree. The actions are
+        called and the removals are done after the walk in document order, so
+        that the traversal is not disturbed by modifications of the tree.
+
+        :param rules: The rules to apply.
+        :param element: The XML element to traverse. Defaults to the root element.
+
+        :return: The XmlManipulator instance for method chaining.
+        """
+        if not rules:
+            return self
+        rules_by_tag: dict[str, list[Rule]] = {}
+        for rule in rules:
+            rules_by_tag.setdefault(rule.tag, []).append(rule)
+
+        matches: list[tuple[Rule, _Element]] = []
+        for child in self.__get_element(element).iter(*rules_by_tag.keys()):
+            for rule in rules_by_tag[str(child.tag)]:
+                if rule.predicate is None or rule.predicate(child):
+                    matches.append((rule, child))
+
+        for rule, child in matches:
+            if rule.action is not None:
+                rule.action(child)
+        for rule, child in matches:
+            if rule.remove:
+                self.remove(child)
+        return self
@@ -0,0 +1,304 @@
+"""Benchmark the core score operations.
+
+Run all benchmarks and store the results as a baseline:
+
+.. code-block:: shell
+
+    python -m tests.benchmark --save benchmark.json
+
+Compare a later run with the baseline. The exit status is ``1`` if an
+operation got slower than the threshold allows:
+
+.. code-block:: shell
+
+    python -m tests.benchmark --compare benchmark.json --threshold 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+from mscxyz import Score
+from mscxyz.generator import ScoreSpec, generate_score
+from mscxyz.rename import rename
+from mscxyz.settings import reset_args
+from tests.helper import get_path
+
+Operation = Callable[[Score], Any]
+
+
+@dataclass
+class Fixture:
+    size: str
+    """``small``, ``medium`` or ``large``"""
+
+    filename: str
+    """The file name relative to ``tests/files/by_version/X``."""
+
+    version: int
+
+    spec: Optional[ScoreSpec] = None
+    """The parameters of a synthetic score, see :mod:`mscxyz.generator`."""
+
+    @property
+    def extension(self) -> str:
+        return self.filename.split(".")[-1]
+
+    @property
+    def name(self) -> str:
+        stem = self.filename.split(".")[0]
+        return f"v{self.version}-{self.extension}-{self.size}-{stem}"
+
+    def copy(self, dest: Path) -> Path:
+        """Copy the fixture into a directory. The directory of an uncompressed
+        MuseScore 4 file is copied as a whole to keep the style file."""
+        if self.spec is not None:
+            if self.name not in _generated:
+                with tempfile.TemporaryDirectory() as tmp:
+                    path = generate_score(Path(tmp) / self.filename, self.spec)
+                    _generated[self.name] = path.read_bytes()
+            (dest / self.filename).write_bytes(_generated[self.name])
+            return dest / self.filename
+        src = get_path(self.filename, self.version)
+        if self.version > 3 and self.extension == "mscx":
+            shutil.copytree(src.parent, dest, dirs_exist_ok=True)
+        else:
+            shutil.copy(src, dest)
+        return dest / self.filename
+
+
+_generated: dict[str, bytes] = {}
+"""The markup of the synthetic scores by fixture name."""
+
+
+def _collect_fixtures(*sizes: tuple[str, str]) -> list[Fixture]:
+    output: list[Fixture] = []
+    for version in (2, 3, 4):
+        for size, stem in sizes:
+            for extension in ("mscx", "mscz"):
+                fixture = Fixture(size, f"{stem}.{extension}", version)
+                if get_path(fixture.filename, version).exists():
+                    output.append(fixture)
+    return output
+
+
+fixtures = _collect_fixtures(
+    ("small", "simple"), ("medium", "Reunion"), ("large", "Ragtime_3")
+)
+
+lyrics_fixtures = _collect_fixtures(("small", "lyrics"))
+"""The fixtures above contain no lyrics."""
+
+synthetic_fixtures = [
+    Fixture(size, f"synthetic.{extension}", version, spec)
+    for version in (2, 3, 4)
+    for extension in ("mscx", "mscz")
+    for size, spec in (
+        ("small", ScoreSpec(version, measures=16, verses=1)),
+        ("medium", ScoreSpec(version, staffs=8, measures=200, verses=2)),
+        ("large", ScoreSpec(version, staffs=20, measures=1000, verses=4)),
+    )
+]
+"""Generated scores at a realistic scale, enabled with ``--synthetic``."""
+
+style_files: dict[int, Path] = {
+    2: get_path("style.mss", 2),
+    3: get_path("style.mss", 3),
+    4: get_path("Jazz.mss", 4),
+}
+
+
+def _set_meta(score: Score) -> None:
+    score.meta.title = "Title"
+    score.meta.subtitle = "Subtitle"
+    score.meta.composer = "Composer"
+    score.meta.lyricist = "Lyricist"
+
+
+def _rename(score: Score) -> None:
+    args = reset_args()
+    args.rename_target = str(Path(score.dirname) / "renamed")
+    with redirect_stdout(None):
+        rename(score, "$title")
+    reset_args()
+
+
+operations: dict[str, tuple[Operation, list[Fixture]]] = {
+    "load": (lambda score: Score(score.path), fixtures),
+    "fields.export_to_dict": (lambda score: score.fields.export_to_dict(), fixtures),
+    "meta.setters": (_set_meta, fixtures),
+    "style.set": (lambda score: score.style.set("pageWidth", 8.5), fixtures),
+    "style.load_style_file": (
+        lambda score: score.style.load_style_file(style_files[score.version_major]),
+        fixtures,
+    ),
+    "lyrics.fix": (lambda score: score.lyrics.fix_lyrics(), lyrics_fixtures),
+    "lyrics.extract": (lambda score: score.lyrics.extract_lyrics(), lyrics_fixtures),
+    "save": (lambda score: score.save(), fixtures),
+    "rename": (_rename, fixtures),
+}
+
+
+@dataclass
+class Result:
+    name: str
+
+    rounds: int
+
+    ops_per_second: float
+    """The reciprocal of the median duration of a round."""
+
+    peak_memory: int
+    """The peak of the memory in bytes allocated by the operation, measured
+    with :mod:`tracemalloc` in a separate round. The memory allocated by
+    libxml2 inside lxml is not traced."""
+
+
+def run_benchmark(
+    operation: Operation, fixture: Fixture, min_time: float = 0.2, max_rounds: int = 50
+) -> Result:
+    """
+    Call an operation on fresh copies of a fixture until ``min_time`` seconds
+    have been measured. Copying and loading the score is not measured,
+    except for the operation ``load``.
+    """
+    durations: list[float] = []
+    peak_memory = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for round in range(max_rounds + 1):
+            dest = Path(tmp) / str(round)
+            dest.mkdir()
+            score = Score(fixture.copy(dest))
+            if round == 0:
+                tracemalloc.start()
+                try:
+                    operation(score)
+                    peak_memory = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+                continue
+            start = time.perf_counter()
+            operation(score)
+            durations.append(time.perf_counter() - start)
+            shutil.rmtree(dest)
+            if sum(durations) >= min_time:
+                break
+    return Result(
+        name=fixture.name,
+        rounds=len(durations),
+        ops_per_second=1 / statistics.median(durations),
+        peak_memory=peak_memory,
+    )
+
+
+def run_all(
+    filter: Optional[str] = None, min_time: float = 0.2, synthetic: bool = False
+) -> dict[str, Result]:
+    reset_args()
+    results: dict[str, Result] = {}
+    for operation_name, (operation, operation_fixtures) in operations.items():
+        if synthetic:
+            operation_fixtures = operation_fixtures + synthetic_fixtures
+        for fixture in operation_fixtures:
+            name = f"{operation_name}[{fixture.name}]"
+            if filter is not None and filter not in name:
+                continue
+            results[name] = run_benchmark(operation, fixture, min_time)
+    return results
+
+
+def compare(
+    results: dict[str, Result], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """
+    :param threshold: The tolerated slowdown, for example ``0.1`` for 10%.
+
+    :return: The names of the benchmarks which got slower than the threshold
+      allows.
+    """
+    regressions: list[str] = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        if result.ops_per_second < baseline[name]["ops_per_second"] * (1 - threshold):
+            regressions.append(name)
+    return regressions
+
+
+def print_results(
+    results: dict[str, Result], baseline: Optional[dict[str, Any]] = None
+) -> None:
+    print(f"{'benchmark':<40} {'ops/s':>10} {'peak':>10} {'rounds':>7} {'change':>8}")
+    for name, result in results.items():
+        change = ""
+        if baseline is not None and name in baseline:
+            before = baseline[name]["ops_per_second"]
+            change = f"{(result.ops_per_second - before) / before:+.1%}"
+        print(
+            f"{name:<40} {result.ops_per_second:>10.1f} "
+            f"{result.peak_memory / 1024:>8.0f}KB {result.rounds:>7} {change:>8}"
+        )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-k", "--filter", help="Run only benchmarks with this substring."
+    )
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument(
+        "--synthetic",
+        action="store_true",
+        help="Add generated scores of realistic sizes to the fixtures.",
+    )
+    parser.add_argument("--save", metavar="<json-file>", help="Store the results.")
+    parser.add_argument(
+        "--compare", metavar="<json-file>", help="Compare with a stored baseline."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="The tolerated slowdown compared with the baseline (default: 0.1).",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_all(args.filter, args.min_time, args.synthetic)
+
+    baseline: Optional[dict[str, Any]] = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, "w") as output:
+            json.dump(
+                {name: asdict(result) for name, result in results.items()},
+                output,
+                indent=2,
+            )
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for name in regressions:
+            print(f"Regression: {name}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
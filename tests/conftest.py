@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import os
+import shutil
+import string
 from pathlib import Path
 from typing import Any, Generator
 
@@ -74,6 +76,18 @@ def nested_dir() -> Path:
     return Path(helper.get_dir("nested-folders", version=4))
 
 
+@pytest.fixture
+def score_dir(request: pytest.FixtureRequest, tmp_path: Path) -> Path:
+    """A new directory with copies of the file simple.mscz (version 4) named
+    a.mscz, b.mscz, … Two copies by default, another number with
+    ``@pytest.mark.parametrize("score_dir", [4], indirect=True)``."""
+    directory = tmp_path / "scores"
+    directory.mkdir()
+    for name in string.ascii_lowercase[: getattr(request, "param", 2)]:
+        shutil.copy(helper.get_path("simple.mscz", 4), directory / f"{name}.mscz")
+    return directory
+
+
 def _chdir(dstdir: Path) -> Generator[Path, Any, None]:
     """https://github.com/ar90n/pytest-chdir"""
     lwd = os.getcwd()
@@ -0,0 +1,121 @@
+"""Test submodule “aio.py”."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from mscxyz import aio, settings
+from mscxyz.score import Score
+from mscxyz.settings import DefaultArguments, use_args
+from tests import helper
+
+
+def fake_mscore(tmp_path: Path, script: str) -> DefaultArguments:
+    """Arguments with a shell script as the MuseScore executable."""
+    executable = tmp_path / "mscore"
+    executable.write_text("#!/bin/sh\n" + script)
+    executable.chmod(0o755)
+    args = DefaultArguments()
+    args.general_executable = str(executable)
+    return args
+
+
+class TestRunBlocking:
+    def test_context(self) -> None:
+        scoped = DefaultArguments()
+
+        async def main() -> DefaultArguments:
+            with use_args(scoped):
+                return await aio.run_blocking(settings.get_args)
+
+        assert asyncio.run(main()) is scoped
+
+    def test_bounded(self) -> None:
+        aio.shutdown_executor()
+        assert aio.get_executor()._max_workers == aio.max_workers
+        assert aio.get_executor() is aio.get_executor()
+
+
+class TestScore:
+    def test_aopen_asave(self) -> None:
+        src = helper.get_file("simple.mscz", 4)
+
+        async def main() -> None:
+            score = await Score.aopen(src)
+            score.meta.title = "Async title"
+            await score.asave()
+
+        asyncio.run(main())
+        assert Score(src).meta.title == "Async title"
+
+    def test_aopen_readonly(self) -> None:
+        async def main() -> Score:
+            return await Score.aopen(helper.get_path("simple.mscz", 4), readonly=True)
+
+        assert asyncio.run(main()).readonly
+
+    def test_asave_mscore(self, tmp_path: Path) -> None:
+        src = helper.get_file("simple.mscx", 3)
+        log = tmp_path / "log"
+        args = fake_mscore(tmp_path, f'echo "$@" > {log}\n')
+
+        async def main() -> None:
+            with use_args(args):
+                score = await Score.aopen(src)
+                score.meta.title = "Async title"
+                await score.asave(mscore=True)
+
+        asyncio.run(main())
+        assert log.read_text() == f"-o {src} {src}\n"
+
+
+class TestExport:
+    def test_ato_extension(self, tmp_path: Path) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        args = fake_mscore(tmp_path, 'touch "$2"\n')
+
+        async def main() -> Path:
+            with use_args(args):
+                return await Score(src).export.ato_extension("PDF")
+
+        dest = asyncio.run(main())
+        assert dest == Path(src).with_suffix(".pdf")
+        assert dest.exists()
+
+    def test_unsupported_extension(self) -> None:
+        score = Score(helper.get_file("simple.mscz", 4))
+        with pytest.raises(ValueError, match="Unsupported extension"):
+            asyncio.run(score.export.ato_extension("doc"))
+
+    def test_error(self, tmp_path: Path) -> None:
+        args = fake_mscore(tmp_path, "exit 1\n")
+
+        async def main() -> None:
+            with use_args(args):
+                await Score(helper.get_file("simple.mscz", 4)).export.ato_extension()
+
+        with pytest.raises(ValueError, match="returncode"):
+            asyncio.run(main())
+
+    def test_cancel_kills_mscore(self, tmp_path: Path) -> None:
+        pid_file = tmp_path / "pid"
+        args = fake_mscore(tmp_path, f"echo $$ > {pid_file}\nexec sleep 30\n")
+
+        async def main() -> None:
+            with use_args(args):
+                task = asyncio.create_task(
+                    Score(helper.get_file("simple.mscz", 4)).export.ato_extension()
+                )
+                while not pid_file.exists() or not pid_file.read_text():
+                    await asyncio.sleep(0.01)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+        asyncio.run(main())
+        with pytest.raises(ProcessLookupError):
+            os.kill(int(pid_file.read_text()), 0)
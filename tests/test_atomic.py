@@ -0,0 +1,137 @@
+"""Test submodule “atomic.py”."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from mscxyz import atomic
+from mscxyz.atomic import atomic_write
+from mscxyz.score import Score
+from tests import helper
+from tests.helper import Cli
+
+
+class TestAtomicWrite:
+    def test_replace(self, tmp_path: Path) -> None:
+        dest = tmp_path / "file.txt"
+        dest.write_text("old")
+        dest.chmod(0o640)
+        with atomic_write(dest, "w") as f:
+            f.write("new")
+            assert dest.read_text() == "old"
+        assert dest.read_text() == "new"
+        assert dest.stat().st_mode & 0o777 == 0o640
+        assert os.listdir(tmp_path) == ["file.txt"]
+
+    def test_error(self, tmp_path: Path) -> None:
+        dest = tmp_path / "file.txt"
+        dest.write_text("old")
+        with pytest.raises(RuntimeError):
+            with atomic_write(dest, "w") as f:
+                f.write("truncated")
+                raise RuntimeError
+        assert dest.read_text() == "old"
+        assert os.listdir(tmp_path) == ["file.txt"]
+
+    def test_symlink(self, tmp_path: Path) -> None:
+        target = tmp_path / "target.txt"
+        target.write_text("old")
+        link = tmp_path / "link.txt"
+        link.symlink_to(target)
+        with atomic_write(link, "w") as f:
+            f.write("new")
+        assert link.is_symlink()
+        assert target.read_text() == "new"
+
+    def test_fsync(self, tmp_path: Path) -> None:
+        with mock.patch("os.fsync") as fsync:
+            with atomic_write(tmp_path / "file.bin", durability="fsync") as f:
+                f.write(b"data")
+        # The file and the directory
+        assert fsync.call_count == 2
+
+    def test_batch(self, tmp_path: Path) -> None:
+        atomic.take_pending()
+        for name in ("a", "b"):
+            with atomic_write(tmp_path / name, durability="batch") as f:
+                f.write(b"data")
+        with mock.patch("os.fsync") as fsync:
+            assert atomic.sync_pending() == 2
+        # Two files and their directory once
+        assert fsync.call_count == 3
+        assert atomic.take_pending() == set()
+
+
+class TestSave:
+    @pytest.mark.parametrize("filename", ["simple.mscz", "simple.mscx"])
+    def test_interrupted_save(self, filename: str) -> None:
+        src = helper.get_file(filename, 4)
+        original = Path(src).read_bytes()
+        score = Score(src)
+        score.meta.title = "Interrupted"
+        with mock.patch("os.replace", side_effect=KeyboardInterrupt):
+            with pytest.raises(KeyboardInterrupt):
+                score.save()
+        assert Path(src).read_bytes() == original
+        assert not [p for p in os.listdir(Path(src).parent) if p.endswith(".tmp")]
+
+    def test_cli_batch(self) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        with mock.patch("mscxyz.atomic.sync_pending") as sync_pending:
+            Cli(
+                "--durability", "batch", "--title", "Batch", src, append_score=False
+            ).execute()
+        assert sync_pending.called
+        assert Score(src).meta.title == "Batch"
+        atomic.take_pending()
+
+    @pytest.mark.parametrize("score_dir", [1], indirect=True)
+    def test_cli_batch_error(self, score_dir: Path) -> None:
+        (score_dir / "b.mscx").write_text("<museScore")
+        calls: list[str] = []
+        with (
+            mock.patch(
+                "mscxyz.atomic.sync_pending",
+                side_effect=lambda: calls.append("sync_pending"),
+            ),
+            mock.patch(
+                "mscxyz.state.RunState.close",
+                side_effect=lambda: calls.append("close"),
+            ),
+        ):
+            with pytest.raises(Exception):
+                Cli(
+                    "--durability",
+                    "batch",
+                    "--state-file",
+                    score_dir / "state.db",
+                    "--title",
+                    "Batch",
+                    score_dir,
+                    append_score=False,
+                ).execute()
+        assert calls == ["sync_pending", "close"]
+        atomic.take_pending()
+
+
+def test_record_writes(tmp_path: Path) -> None:
+    dest = tmp_path / "file.bin"
+    with atomic_write(dest) as f:
+        f.write(b"not recorded")
+    atomic.record_writes()
+    try:
+        with atomic_write(dest) as f:
+            f.write(b"recorded")
+        stat = dest.stat()
+        os.utime(dest, ns=(1, 1))
+        # The status of the write, not of the later change
+        assert atomic.take_written() == {str(dest): (stat.st_mtime_ns, 8)}
+        assert atomic.take_written() == {}
+    finally:
+        atomic.record_writes(False)
+    atomic.note_write(dest)
+    assert atomic.take_written() == {}
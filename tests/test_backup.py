@@ -0,0 +1,124 @@
+"""Test submodule “backup.py”."""
+
+from __future__ import annotations
+
+import errno
+import filecmp
+import os
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from mscxyz import backup
+from mscxyz.backup import BackupStore, clone_file
+from mscxyz.score import Score
+from tests import helper
+from tests.helper import Cli
+
+
+class TestCloneFile:
+    def test_clone(self, tmp_path: Path) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        dest = tmp_path / "clone.mscz"
+        assert clone_file(src, dest) in ("reflink", "copy_file_range", "copy")
+        assert filecmp.cmp(src, dest, shallow=False)
+        assert os.stat(src).st_mtime_ns == os.stat(dest).st_mtime_ns
+
+    def test_fallback(self, tmp_path: Path) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        dest = tmp_path / "clone.mscz"
+        error = OSError(errno.EXDEV, "Invalid cross-device link")
+        with (
+            mock.patch("fcntl.ioctl", side_effect=error),
+            mock.patch("os.copy_file_range", side_effect=error, create=True),
+        ):
+            assert clone_file(src, dest) == "copy"
+        assert filecmp.cmp(src, dest, shallow=False)
+
+    def test_unexpected_error(self, tmp_path: Path) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        with mock.patch.object(
+            backup, "_reflink", side_effect=OSError(errno.EIO, "I/O error")
+        ):
+            with pytest.raises(OSError):
+                clone_file(src, tmp_path / "clone.mscz")
+
+
+class TestBackupStore:
+    def test_deduplication(self, tmp_path: Path) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        with BackupStore(tmp_path / "store") as store:
+            first = store.add(src)
+            second = store.add(src)
+            assert first.hash == second.hash
+            assert len(store.get_snapshots(src)) == 1
+            assert filecmp.cmp(src, store.get_object(first.hash), shallow=False)
+        objects = [
+            p for p in (tmp_path / "store" / "objects").rglob("*") if p.is_file()
+        ]
+        assert len(objects) == 1
+
+    def test_restore(self, tmp_path: Path) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        original = Path(src).read_bytes()
+        with BackupStore(tmp_path / "store") as store:
+            first = store.add(src)
+            score = Score(src)
+            score.meta.title = "Changed"
+            score.save()
+            store.add(src)
+            assert len(store.get_snapshots(src)) == 2
+            store.restore(src, hash=first.hash)
+            assert Path(src).read_bytes() == original
+            latest = store.restore(src, dest=tmp_path / "latest.mscz")
+            assert Score(latest).meta.title == "Changed"
+            with pytest.raises(FileNotFoundError):
+                store.restore(tmp_path / "unknown.mscz")
+
+    def test_interrupted_restore(self, tmp_path: Path) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        with BackupStore(tmp_path / "store") as store:
+            store.add(src)
+            Path(src).write_bytes(b"changed")
+            with mock.patch("os.replace", side_effect=KeyboardInterrupt):
+                with pytest.raises(KeyboardInterrupt):
+                    store.restore(src)
+        assert Path(src).read_bytes() == b"changed"
+        assert not [p for p in os.listdir(Path(src).parent) if p.endswith(".tmp")]
+
+
+def test_cli_backup_store(tmp_path: Path) -> None:
+    src = helper.get_file("simple.mscz", 4)
+    original = Path(src).read_bytes()
+    for _ in range(2):
+        Cli(
+            "--backup-store",
+            tmp_path / "store",
+            "--title",
+            "Stored",
+            src,
+            append_score=False,
+        ).execute()
+    assert not Score(src).backup_file.exists()
+    with BackupStore(tmp_path / "store") as store:
+        snapshots = store.get_snapshots(src)
+        assert len(snapshots) == 2
+        assert store.get_object(snapshots[0].hash).read_bytes() == original
+
+
+@pytest.mark.parametrize("score_dir", [3], indirect=True)
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_cli_backup_store_opened_once(
+    score_dir: Path, tmp_path: Path, jobs: str
+) -> None:
+    store_dir = tmp_path / "store"
+    with mock.patch("mscxyz.backup.BackupStore", wraps=BackupStore) as store:
+        Cli(
+            "--jobs", jobs, "--backup-store", store_dir, score_dir, append_score=False
+        ).execute()
+    # The workers of a parallel run open their own store.
+    assert store.call_count == (1 if jobs == "1" else 0)
+    with BackupStore(store_dir) as backups:
+        for name in ("a", "b", "c"):
+            assert len(backups.get_snapshots(score_dir / f"{name}.mscz")) == 1
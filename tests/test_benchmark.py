@@ -0,0 +1,46 @@
+"""Test the benchmark suite “benchmark.py”."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from tests import benchmark
+from tests.benchmark import Result, compare, fixtures, run_benchmark
+
+
+def test_fixtures() -> None:
+    names = [fixture.name for fixture in fixtures]
+    assert "v4-mscz-large-Ragtime_3" in names
+    assert "v2-mscx-small-simple" in names
+
+
+def test_run_benchmark() -> None:
+    result = run_benchmark(
+        benchmark.operations["save"][0], fixtures[0], min_time=0, max_rounds=2
+    )
+    assert result.rounds == 1
+    assert result.ops_per_second > 0
+    assert result.peak_memory > 0
+
+
+def test_compare() -> None:
+    results = {
+        "a": Result("a", 1, ops_per_second=85, peak_memory=0),
+        "b": Result("b", 1, ops_per_second=95, peak_memory=0),
+        "c": Result("c", 1, ops_per_second=10, peak_memory=0),
+    }
+    baseline = {"a": {"ops_per_second": 100}, "b": {"ops_per_second": 100}}
+    assert compare(results, baseline, threshold=0.1) == ["a"]
+
+
+def test_main(tmp_path: Path) -> None:
+    baseline = tmp_path / "baseline.json"
+    argv = ["-k", "rename[v2-mscx-small", "--min-time", "0"]
+    assert benchmark.main([*argv, "--save", str(baseline)]) == 0
+    data = json.loads(baseline.read_text())
+    assert list(data) == ["rename[v2-mscx-small-simple]"]
+
+    data["rename[v2-mscx-small-simple]"]["ops_per_second"] = 1e12
+    baseline.write_text(json.dumps(data))
+    assert benchmark.main([*argv, "--compare", str(baseline)]) == 1
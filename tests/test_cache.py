@@ -0,0 +1,128 @@
+"""Test submodule “cache.py”."""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from mscxyz import cache
+from mscxyz.cache import ScoreCache, estimate_size
+from mscxyz.score import Score
+from mscxyz.xml import ReadOnlyError
+from tests import helper
+
+
+class TestScoreCache:
+    def test_hit(self) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        score_cache = ScoreCache()
+        score = score_cache.get(src)
+        assert score.readonly
+        with mock.patch("mscxyz.utils.ZipContainer._extract_zip") as extract:
+            assert score_cache.get(src) is score
+        assert not extract.called
+        stats = score_cache.stats
+        assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+        assert stats.bytes == estimate_size(score)
+        assert stats.hit_rate == 0.5
+
+    def test_modified_file(self) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        score_cache = ScoreCache()
+        score = score_cache.get(src)
+        stat = os.stat(src)
+        os.utime(src, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert score_cache.get(src) is not score
+        assert score_cache.stats.entries == 1
+
+    def test_writable_copy(self) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        score_cache = ScoreCache()
+        shared = score_cache.get(src)
+        with pytest.raises(ReadOnlyError):
+            shared.meta.title = "Cached title"
+        writable = score_cache.get(src, readonly=False)
+        writable.meta.title = "Cached title"
+        writable.save()
+        assert shared.meta.title != "Cached title"
+        assert score_cache.get(src).meta.title == "Cached title"
+
+    def test_lru_eviction(self) -> None:
+        files = [helper.get_file("simple.mscx", 3) for _ in range(3)]
+        size = estimate_size(Score(files[0]))
+        score_cache = ScoreCache(max_bytes=2 * size)
+        score_cache.get(files[0])
+        score_cache.get(files[1])
+        score_cache.get(files[0])
+        score_cache.get(files[2])
+        stats = score_cache.stats
+        assert (stats.entries, stats.evictions, stats.bytes) == (2, 1, 2 * size)
+        score_cache.get(files[0])
+        assert score_cache.stats.hits == 2
+
+    def test_too_large(self) -> None:
+        score_cache = ScoreCache(max_bytes=1)
+        score_cache.get(helper.get_file("simple.mscz", 4))
+        assert score_cache.stats.entries == 0
+
+    def test_invalidate_clear(self) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        score_cache = ScoreCache()
+        score_cache.get(src)
+        score_cache.invalidate(src)
+        assert score_cache.stats.entries == 0
+        score_cache.get(src)
+        score_cache.clear()
+        assert score_cache.stats.bytes == 0
+
+    def test_threads(self) -> None:
+        files = [helper.get_file("simple.mscz", 4) for _ in range(4)]
+        score_cache = ScoreCache()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            titles = list(
+                executor.map(lambda file: score_cache.get(file).meta.title, files * 10)
+            )
+        assert len(set(titles)) == 1
+        assert score_cache.stats.hits + score_cache.stats.misses == 40
+
+    @pytest.mark.parametrize("version", [3, 4])
+    def test_shared_score_initialized(self, version: int) -> None:
+        score = ScoreCache().get(helper.get_file("simple.mscz", version))
+        lazy = {
+            "style": "Style",
+            "meta": "Meta",
+            "fields": "FieldsManager",
+            "lyrics": "Lyrics",
+            "export": "Export",
+        }
+        with ExitStack() as stack:
+            for cls in lazy.values():
+                stack.enter_context(
+                    mock.patch(f"mscxyz.score.{cls}", side_effect=AssertionError)
+                )
+            # Nothing is created when the shared score is accessed.
+            for name in lazy:
+                getattr(score, name)
+
+
+class TestOpenScore:
+    def test_disabled(self) -> None:
+        cache.disable()
+        src = helper.get_file("simple.mscz", 4)
+        assert cache.get_cache() is None
+        assert cache.open_score(src) is not cache.open_score(src)
+
+    def test_enabled(self, tmp_path: Path) -> None:
+        score_cache = cache.enable()
+        try:
+            src = helper.get_file("simple.mscz", 4)
+            assert cache.open_score(src) is cache.open_score(src)
+            assert not cache.open_score(src, readonly=False).readonly
+            assert score_cache.stats.hits == 2
+        finally:
+            cache.disable()
@@ -0,0 +1,138 @@
+"""Test submodule “checkpoint.py”."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from mscxyz import cli
+from mscxyz.checkpoint import Checkpoint, read_checkpoint
+from tests.helper import Cli
+
+
+def read_lines(path: Path) -> list[dict[str, str]]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestCheckpoint:
+    def test_record(self, tmp_path: Path) -> None:
+        path = tmp_path / "checkpoint.jsonl"
+        with Checkpoint(path) as checkpoint:
+            checkpoint.record(tmp_path / "a.mscz")
+            checkpoint.record(tmp_path / "b.mscz", "SyntaxError: message")
+            assert checkpoint.is_done(tmp_path / "a.mscz")
+        assert read_lines(path) == [
+            {"path": str(tmp_path / "a.mscz"), "status": "ok"},
+            {
+                "path": str(tmp_path / "b.mscz"),
+                "status": "error",
+                "error": "SyntaxError: message",
+            },
+        ]
+
+    def test_truncate_without_resume(self, tmp_path: Path) -> None:
+        path = tmp_path / "checkpoint.jsonl"
+        with Checkpoint(path) as checkpoint:
+            checkpoint.record(tmp_path / "a.mscz")
+        with Checkpoint(path) as checkpoint:
+            assert not checkpoint.is_done(tmp_path / "a.mscz")
+        assert path.read_text() == ""
+
+    def test_resume_after_torn_line(self, tmp_path: Path) -> None:
+        path = tmp_path / "checkpoint.jsonl"
+        a = str(tmp_path / "a.mscz")
+        path.write_text(json.dumps({"path": a, "status": "ok"}) + '\n{"path": "/b')
+        assert read_checkpoint(path) == {a: "ok"}
+        with Checkpoint(path, resume=True) as checkpoint:
+            assert checkpoint.is_done(a)
+            checkpoint.record(tmp_path / "c.mscz")
+        assert read_checkpoint(path) == {a: "ok", str(tmp_path / "c.mscz"): "ok"}
+
+    def test_read_missing(self, tmp_path: Path) -> None:
+        assert read_checkpoint(tmp_path / "missing.jsonl") == {}
+
+
+class TestOptionCheckpoint:
+    @pytest.mark.parametrize("score_dir", [4], indirect=True)
+    def test_resume(self, score_dir: Path, tmp_path: Path) -> None:
+        checkpoint = tmp_path / "checkpoint.jsonl"
+        with Checkpoint(checkpoint) as log:
+            log.record(score_dir / "a.mscz")
+            log.record(score_dir / "b.mscz")
+        with mock.patch("mscxyz.cli._process_file", wraps=cli._process_file) as process:
+            Cli(
+                "--checkpoint", checkpoint, "--resume", score_dir, append_score=False
+            ).execute()
+        assert sorted(call.args[0].name for call in process.call_args_list) == [
+            "c.mscz",
+            "d.mscz",
+        ]
+        assert len(read_lines(checkpoint)) == 4
+
+    @pytest.mark.parametrize("score_dir", [4], indirect=True)
+    def test_errors(self, score_dir: Path, tmp_path: Path) -> None:
+        (score_dir / "broken.mscx").write_text("<museScore")
+        checkpoint = tmp_path / "checkpoint.jsonl"
+        Cli(
+            "--catch-errors",
+            "--glob",
+            "*.msc[xz]",
+            "--checkpoint",
+            checkpoint,
+            score_dir,
+        ).execute()
+        status = read_checkpoint(checkpoint)
+        assert status[str(score_dir / "broken.mscx")] == "error"
+        assert list(status.values()).count("ok") == 4
+
+    @pytest.mark.parametrize("score_dir", [4], indirect=True)
+    def test_parallel(self, score_dir: Path, tmp_path: Path) -> None:
+        checkpoint = tmp_path / "checkpoint.jsonl"
+        Cli(
+            "--jobs", "2", "--checkpoint", checkpoint, score_dir, append_score=False
+        ).execute()
+        assert len(read_checkpoint(checkpoint)) == 4
+
+    def test_resume_requires_checkpoint(self) -> None:
+        with pytest.raises(SystemExit):
+            Cli("--resume", ".", append_score=False).execute()
+
+    @pytest.mark.parametrize("score_dir", [4], indirect=True)
+    def test_hard_kill(self, score_dir: Path, tmp_path: Path) -> None:
+        checkpoint = tmp_path / "checkpoint.jsonl"
+        script = textwrap.dedent(
+            f"""
+            import os, signal
+            from mscxyz import cli
+
+            process_file = cli._process_file
+            calls = []
+
+            def kill_at_third_file(file, args, **kwargs):
+                calls.append(file)
+                if len(calls) == 3:
+                    os.kill(os.getpid(), signal.SIGKILL)
+                process_file(file, args, **kwargs)
+
+            cli._process_file = kill_at_third_file
+            cli.execute(["--checkpoint", {str(checkpoint)!r}, {str(score_dir)!r}])
+            """
+        )
+        process = subprocess.run([sys.executable, "-c", script])
+        assert process.returncode == -9
+        assert len(read_lines(checkpoint)) == 2
+
+        with mock.patch(
+            "mscxyz.cli._process_file", wraps=cli._process_file
+        ) as process_file:
+            Cli(
+                "--checkpoint", checkpoint, "--resume", score_dir, append_score=False
+            ).execute()
+        assert process_file.call_count == 2
+        assert len(read_checkpoint(checkpoint)) == 4
@@ -1,11 +1,18 @@
 """Test module “cli.py”."""
 
 import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
 
 import pytest
 from pytest import CaptureFixture
 
-from mscxyz.cli import execute, get_args
+from mscxyz.cli import execute, get_args, setup_parser
+from mscxyz.meta import UnmatchedFormatStringError
+from mscxyz.score import Score
+from tests import helper
 from tests.helper import Cli
 
 
@@ -88,3 +95,127 @@ def test_option_help() -> None:
 def test_version() -> None:
     stderr = Cli("--version").sysexit()
     assert re.search("[^ ]* [^ ]*", stderr)
+
+
+class TestOptionJobs:
+    def test_parallel(self, tmp_path: Path) -> None:
+        for i in range(4):
+            shutil.copy(
+                helper.get_path("score.mscz", version=4), tmp_path / f"{i}.mscz"
+            )
+        stdout = Cli(
+            "--jobs", "2", "--list-files", tmp_path, append_score=False
+        ).stdout()
+        assert sorted(stdout.splitlines()) == [
+            str(tmp_path / f"{i}.mscz") for i in range(4)
+        ]
+
+    def test_catch_errors(self, tmp_path: Path) -> None:
+        (tmp_path / "broken.mscx").write_text("<museScore")
+        shutil.copy(helper.get_path("score.mscz", version=4), tmp_path)
+        stdout = Cli(
+            "--jobs",
+            "2",
+            "--catch-errors",
+            "--title",
+            "Jobs",
+            tmp_path,
+            append_score=False,
+        ).stdout()
+        assert "Error" in stdout
+        assert Score(tmp_path / "score.mscz").meta.title == "Jobs"
+
+    def test_output_kept_together(self, tmp_path: Path) -> None:
+        for i in range(3):
+            shutil.copy(
+                helper.get_path("simple.mscx", version=4), tmp_path / f"{i}.mscx"
+            )
+        stdout = Cli(
+            "--jobs", "2", "--print-xml", tmp_path, append_score=False
+        ).stdout()
+        documents = stdout.split('<?xml version="1.0" encoding="UTF-8"?>')[1:]
+        assert len(documents) == 3
+        for document in documents:
+            assert document.strip().endswith("</museScore>")
+
+    def test_error_propagation(self, tmp_path: Path) -> None:
+        shutil.copy(helper.get_path("score.mscz", version=4), tmp_path)
+        with pytest.raises(UnmatchedFormatStringError):
+            Cli(
+                "--jobs",
+                "2",
+                "--distribute-field",
+                "vbox_title",
+                "$metatag_work_title - $metatag_composer",
+                tmp_path,
+                append_score=False,
+            ).execute()
+
+
+class TestStartup:
+    """Guard the start time of the command line interface."""
+
+    lazy_modules = (
+        "concurrent.futures",
+        "importlib.metadata",
+        "lxml.etree",
+        "mscxyz.rename",
+        "mscxyz.score",
+        "mscxyz.style_report",
+        "shtab",
+        "termcolor",
+        "tmep",
+        "tracemalloc",
+    )
+
+    import_budget = 0.5
+    """Seconds for ``import mscxyz.cli``. The import takes about 0.1 seconds."""
+
+    def test_lazy_imports(self) -> None:
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, mscxyz.cli; "
+                "mscxyz.cli.get_args(['.']); "
+                f"print([m for m in {self.lazy_modules!r} if m in sys.modules])",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert process.stdout.strip() == "[]"
+
+    def test_import_budget(self) -> None:
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import mscxyz.cli"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # import time: self [us] | cumulative | imported package
+        cumulative = {
+            line.split("|")[2].strip(): int(line.split("|")[1])
+            for line in process.stderr.splitlines()
+            if line.startswith("import time:")
+            and line.count("|") == 2
+            and not line.split("|")[1].strip().startswith("cumulative")
+        }
+        assert cumulative["mscxyz.cli"] / 1_000_000 < self.import_budget
+
+    def test_package_import(self) -> None:
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, mscxyz; print('mscxyz.score' in sys.modules); "
+                "print(mscxyz.Score.__name__)",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert process.stdout.split() == ["False", "Score"]
+
+    def test_cached_parser(self) -> None:
+        assert setup_parser() is setup_parser()
@@ -0,0 +1,67 @@
+"""Test submodule “generator.py”."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from mscxyz import Score
+from mscxyz.generator import ScoreSpec, generate_score, generate_tree, generate_xml
+
+
+@pytest.mark.parametrize("version", (2, 3, 4))
+@pytest.mark.parametrize("extension", ("mscx", "mscz"))
+def test_generate_score(tmp_path: Path, version: int, extension: str) -> None:
+    spec = ScoreSpec(version, staffs=3, measures=5, verses=2)
+    score = Score(generate_score(tmp_path / f"score.{extension}", spec))
+    assert score.version_major == version
+    assert score.meta.metatag.work_title == "Title"
+    assert score.meta.vbox.title == "Title"
+    assert score.meta.vbox.composer == "Composer"
+    assert score.lyrics.number_of_verses == 2
+    assert score.style.get("pageWidth") == "8.27"
+    assert len(score.xml.findall(".//Staff/Measure")) == 15
+
+    score.meta.title = "New title"
+    score.save()
+    assert Score(score.path).meta.title == "New title"
+
+
+def test_separate_style_file(tmp_path: Path) -> None:
+    score = Score(generate_score(tmp_path / "score.mscz", ScoreSpec(version=4)))
+    assert score.style_file
+    assert score.xml.find("Score/Style") is None
+
+
+def test_spec() -> None:
+    root = generate_xml(
+        ScoreSpec(
+            version=4,
+            measures=2,
+            notes_per_measure=8,
+            meta_tags={"workTitle": "Work"},
+            vbox_texts={"subtitle": "Sub"},
+            style_size=3,
+        )
+    )
+    assert len(root.findall(".//Chord")) == 16
+    assert [e.get("name") for e in root.findall(".//metaTag")] == ["workTitle"]
+    assert root.findtext(".//VBox/Text/style") == "subtitle"
+    assert len(root.find(".//Style")) == 3  # type: ignore
+
+
+def test_invalid_spec() -> None:
+    with pytest.raises(ValueError, match="version"):
+        generate_xml(ScoreSpec(version=1))
+    with pytest.raises(ValueError, match="notes per measure"):
+        generate_xml(ScoreSpec(notes_per_measure=3))
+
+
+def test_generate_tree(tmp_path: Path) -> None:
+    paths = generate_tree(tmp_path, 25, extension="mscx", files_per_dir=10)
+    assert len(paths) == 25
+    assert paths[0] == tmp_path / "0" / "score-0.mscx"
+    assert paths[-1] == tmp_path / "2" / "score-24.mscx"
+    assert sorted(tmp_path.rglob("*.msc?")) == sorted(paths)
+    assert Score(paths[-1]).meta.title == "Title"
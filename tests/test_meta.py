@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import pickle
 from pathlib import Path
 
 import pytest
@@ -33,6 +34,16 @@ class TestExceptions:
             raise meta.FormatStringNoFieldError("test")
         assert e.value.args[0] == "No fields found in your format string “test”!"
 
+    def test_pickle(self) -> None:
+        # The errors are passed from the worker processes of --jobs.
+        unmatched = pickle.loads(
+            pickle.dumps(meta.UnmatchedFormatStringError("$title", "input"))
+        )
+        assert unmatched.format_string == "$title"
+        assert unmatched.input_string == "input"
+        no_field = pickle.loads(pickle.dumps(meta.FormatStringNoFieldError("test")))
+        assert no_field.msg == "No fields found in your format string “test”!"
+
 
 def get_meta_tag(filename: str, version: int) -> Metatag:
     score = helper.get_score(filename, version)
@@ -0,0 +1,117 @@
+"""Test submodule “schedule.py”."""
+
+from __future__ import annotations
+
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from mscxyz import schedule
+from mscxyz.score import Score
+from tests import helper
+from tests.helper import Cli
+
+
+@pytest.fixture
+def files(tmp_path: Path) -> list[Path]:
+    paths: list[Path] = []
+    for name, size in (("small", 10), ("huge", 1000), ("medium", 100), ("tiny", 1)):
+        path = tmp_path / f"{name}.mscx"
+        path.write_bytes(b"x" * size)
+        paths.append(path)
+    return paths
+
+
+def names(paths: list[Path]) -> list[str]:
+    return [path.stem for path in paths]
+
+
+def test_stat_sizes(files: list[Path], tmp_path: Path) -> None:
+    sizes = schedule.stat_sizes(files + [tmp_path / "missing.mscx"])
+    assert [size for size, _ in sizes] == [0, 1, 10, 100, 1000]
+
+
+def test_largest_first(files: list[Path]) -> None:
+    submitted: list[Path] = []
+    # A single worker processes the files in the order of submission.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+
+        def submit(file: Path) -> Future[Path]:
+            submitted.append(file)
+            return executor.submit(lambda: file)
+
+        completed = [file for file, _ in schedule.dispatch(files, submit)]
+    assert names(submitted) == ["huge", "medium", "small", "tiny"]
+    assert sorted(completed) == sorted(files)
+
+
+def test_memory_budget(files: list[Path]) -> None:
+    lock = threading.Lock()
+    in_flight: list[int] = []
+    peaks: list[int] = []
+    submitted: list[Path] = []
+    with ThreadPoolExecutor(max_workers=4) as executor:
+
+        def process(size: int) -> None:
+            with lock:
+                in_flight.append(size)
+                peaks.append(sum(in_flight))
+            threading.Event().wait(0.02)
+            with lock:
+                in_flight.remove(size)
+
+        def submit(file: Path) -> Future[None]:
+            submitted.append(file)
+            return executor.submit(process, file.stat().st_size * 2)
+
+        completed = list(
+            schedule.dispatch(files, submit, memory_budget=300, expansion_factor=2)
+        )
+    assert len(completed) == 4
+    # The huge file exceeds the budget, it runs alone. The medium, small and
+    # tiny files fit into the budget together.
+    assert names(submitted) == ["huge", "medium", "small", "tiny"]
+    assert max(peaks) == 2000
+    assert sorted(peaks)[-2] <= 300
+
+
+def test_budget_skips_to_smaller_file(tmp_path: Path) -> None:
+    files = []
+    for name, size in (("a", 60), ("b", 50), ("c", 30)):
+        (tmp_path / name).write_bytes(b"x" * size)
+        files.append(tmp_path / name)
+    submitted: list[Path] = []
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=3) as executor:
+
+        def submit(file: Path) -> Future[bool]:
+            submitted.append(file)
+            return executor.submit(release.wait)
+
+        dispatched = schedule.dispatch(
+            files, submit, memory_budget=100, expansion_factor=1
+        )
+        release.set()
+        list(dispatched)
+    # b (50) does not fit next to a (60), but c (30) does.
+    assert names(submitted)[:2] == ["a", "c"]
+
+
+def test_cli(tmp_path: Path) -> None:
+    for i in range(3):
+        shutil.copy(helper.get_path("score.mscz", version=4), tmp_path / f"{i}.mscz")
+    Cli(
+        "--jobs",
+        "2",
+        "--memory-budget",
+        "0.001",
+        "--title",
+        "Budget",
+        tmp_path,
+        append_score=False,
+    ).execute()
+    for i in range(3):
+        assert Score(tmp_path / f"{i}.mscz").meta.title == "Budget"
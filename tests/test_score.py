@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import io
+import zipfile
 from pathlib import Path
 from typing import Optional
+from unittest import mock
 
 import pytest
 from lxml.etree import _Element
@@ -12,6 +15,7 @@ import mscxyz
 from mscxyz.score import (
     Score,
 )
+from mscxyz.xml import ReadOnlyError
 from tests import helper
 
 
@@ -139,3 +143,269 @@ def test_methods_reload(score: Score) -> None:
     assert score.lyrics.reload().__class__.__name__ == "Lyrics"
     assert score.meta.reload().__class__.__name__ == "Meta"
     assert score.style.reload().__class__.__name__ == "Style"
+
+
+class TestLazyStyle:
+    def test_metadata_only_save_without_style(self) -> None:
+        score = helper.get_score("score.mscz", version=4)
+        with mock.patch("mscxyz.score.Style") as Style:
+            score.meta.title = "Lazy"
+            score.save()
+            Style.assert_not_called()
+        assert score.reload().meta.title == "Lazy"
+
+    def test_style_loaded_on_access(self) -> None:
+        score = helper.get_score("score.mscz", version=4)
+        assert "<Style>" in score.xml_string
+
+    def test_snapshot_before_style_access(
+        self, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        score = helper.get_score("score.mscz", version=4)
+        score.make_snapshot()
+        score.style.get("pageWidth")
+        score.print_diff()
+        assert capsys.readouterr().out == ""
+
+    def test_style_saved_after_snapshot(self) -> None:
+        score = helper.get_score("score.mscz", version=4)
+        score.make_snapshot()
+        score.style.set("pageWidth", 8)
+        score.save()
+        assert score.reload().style.get("pageWidth") == "8"
+
+    @pytest.mark.parametrize("version", [2, 3])
+    def test_missing_style_unchanged(self, version: int) -> None:
+        score = helper.get_score("simple.mscx", version=version)
+        score.xml.remove_tags("./Score/Style")
+        score.xml.write(score.path)
+        content = score.path.read_bytes()
+        score = Score(score.path)
+        score.make_snapshot()
+        assert "<Style/>" in score.xml_string
+        score.save()
+        assert score.path.read_bytes() == content
+
+
+class TestMethodRewrite:
+    def test_combined(self) -> None:
+        score = helper.get_score("formats.mscz", version=4)
+        score.rewrite(clean_style=True, reset_small_staffs=True, collect_lyrics=True)
+        assert score.xml.find(".//LayoutBreak") is None
+        assert score.style.styles == []
+        assert score.lyrics.elements == []
+
+    def test_collect_lyrics(self) -> None:
+        score = helper.get_score("lyrics.mscx")
+        score.rewrite(collect_lyrics=True)
+        assert score.lyrics.number_of_verses == 3
+        assert len(score.lyrics.elements) == len(score.xml.findall(".//Lyrics"))
+
+    def test_reset_small_staffs(self) -> None:
+        score = helper.get_score("simple.mscx", version=3)
+        staff_type = score.xml.find_safe(".//StaffType")
+        score.xml.create_sub_element(staff_type, "small", "1")
+        score.rewrite(reset_small_staffs=True)
+        assert score.xml.find(".//StaffType/small") is None
+
+
+class TestInMemory:
+    @pytest.mark.parametrize("version", mscxyz.supported_versions)
+    @pytest.mark.parametrize("extension", ["mscx", "mscz"])
+    def test_roundtrip(self, version: int, extension: str) -> None:
+        data = helper.get_path(f"simple.{extension}", version).read_bytes()
+        with mock.patch("tempfile.mkdtemp") as mkdtemp:
+            score = Score.from_bytes(data)
+            assert score.in_memory
+            assert score.extension == extension
+            score.meta.title = "In memory"
+            score.style.set("pageWidth", 9)
+            output = score.to_bytes()
+            reloaded = Score.from_bytes(output)
+        assert not mkdtemp.called
+        assert reloaded.meta.title == "In memory"
+        assert reloaded.style.get("pageWidth") == "9"
+
+    @pytest.mark.parametrize("extension", ["mscx", "mscz"])
+    def test_same_as_save(self, extension: str) -> None:
+        src = helper.get_file(f"simple.{extension}", 4)
+        in_memory = Score.from_bytes(Path(src).read_bytes())
+        on_disk = Score(src)
+        for score in (in_memory, on_disk):
+            score.meta.title = "Title"
+            score.style.set("pageWidth", 9)
+        on_disk.save()
+        if extension == "mscx":
+            assert Path(src).read_bytes() == in_memory.to_bytes()
+        else:
+            # The zip files differ in the timestamps and the order.
+            with (
+                zipfile.ZipFile(src) as saved,
+                zipfile.ZipFile(io.BytesIO(in_memory.to_bytes())) as serialized,
+            ):
+                assert sorted(saved.namelist()) == sorted(serialized.namelist())
+                for name in saved.namelist():
+                    assert saved.read(name) == serialized.read(name)
+
+    def test_separate_style_file(self) -> None:
+        data = helper.get_path("simple.mscz", 4).read_bytes()
+        score = Score.from_bytes(data)
+        assert score.style_file == Path("score_style.mss")
+        score.style.set("pageWidth", 9)
+        before = score.xml_string
+        with zipfile.ZipFile(io.BytesIO(score.to_bytes())) as zip:
+            assert b"<pageWidth>9</pageWidth>" in zip.read("score_style.mss")
+            assert b"<Style>" not in zip.read("simple.mscx")
+        # The style stays in place after the serialization.
+        assert score.xml_string == before
+
+    def test_from_stream(self) -> None:
+        with open(helper.get_path("simple.mscz", 3), "rb") as stream:
+            score = Score.from_stream(stream, filename="upload.mscz")
+        assert score.filename == "upload.mscz"
+        assert score.version == 3.01
+
+    def test_invalid_extension(self) -> None:
+        with pytest.raises(ValueError):
+            Score.from_bytes(b"", extension="txt")
+        with pytest.raises(ValueError):
+            Score.from_bytes(b"", extension="mscz", filename="score.mscx")
+
+    def test_save(self, tmp_path: Path) -> None:
+        score = Score.from_bytes(helper.get_path("simple.mscz", 4).read_bytes())
+        score.meta.title = "Title"
+        with pytest.raises(ValueError):
+            score.save()
+        score.save(str(tmp_path / "saved.mscz"))
+        assert Score(tmp_path / "saved.mscz").meta.title == "Title"
+
+    def test_read_as_text(self) -> None:
+        data = helper.get_path("simple.mscx", 3).read_bytes()
+        assert Score.from_bytes(data).read_as_text() == data.decode("utf-8")
+
+
+class TestReadOnly:
+    @pytest.mark.parametrize("version", mscxyz.supported_versions)
+    @pytest.mark.parametrize(
+        "filename", ["meta-all-values.mscx", "no-vbox.mscx", "without-style.mscx"]
+    )
+    def test_reads_do_not_modify_the_tree(self, filename: str, version: int) -> None:
+        path = helper.get_path(filename, version)
+        score = Score(path, readonly=True)
+        before = score.xml.tostring()
+        fields = score.fields.export_to_dict()
+        score.style.get("pageWidth", raise_exception=False)
+        score.style.get("missing/nested", raise_exception=False)
+        score.style.measure_number_offset
+        assert score.xml.tostring() == before
+        assert fields == Score(path).fields.export_to_dict()
+
+    def test_style_file_not_embedded(self) -> None:
+        score = Score(helper.get_path("simple.mscz", 4), readonly=True)
+        assert score.style.page_width == 8.27
+        assert score.xml.find("Score/Style") is None
+
+    def test_legacy_lyricist(self) -> None:
+        score = Score(helper.get_path("meta-all-values.mscx", 3), readonly=True)
+        assert score.meta.vbox.lyricist == "vbox_lyricist"
+        assert not score.meta.vbox.lyricist_element.exists()
+
+    def test_setters_raise(self) -> None:
+        score = Score(helper.get_path("meta-all-values.mscz", 4), readonly=True)
+        before = score.xml.tostring()
+        for set_value in (
+            lambda: setattr(score.meta, "title", "Read-only"),
+            lambda: setattr(score.meta.metatag, "arranger", "Read-only"),
+            lambda: setattr(score.meta.vbox.composer_element, "text", "Read-only"),
+            lambda: score.meta.vbox.clean(),
+            lambda: score.fields.set("title", "Read-only"),
+            lambda: score.style.set("pageWidth", 9),
+            lambda: setattr(score.style, "page_height", 9),
+            lambda: score.style.load_styles_as_string("<pageWidth>9</pageWidth>"),
+            lambda: score.lyrics.fix_lyrics_verse(1),
+            lambda: score.rewrite(clean_style=True),
+        ):
+            with pytest.raises(ReadOnlyError):
+                set_value()
+        assert score.xml.tostring() == before
+
+    def test_save_skipped(self) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        score = Score(src, readonly=True)
+        with mock.patch("mscxyz.xml.XmlManipulator.tostring") as tostring:
+            score.save()
+            score.save(new_dest=str(Path(src).with_name("copy.mscz")))
+        assert not tostring.called
+        assert not Path(src).with_name("copy.mscz").exists()
+
+    def test_from_bytes(self) -> None:
+        data = helper.get_path("simple.mscz", 4).read_bytes()
+        score = Score.from_bytes(data, readonly=True)
+        assert score.readonly
+        with zipfile.ZipFile(io.BytesIO(score.to_bytes())) as zip:
+            assert b"<Style>" not in zip.read("simple.mscx")
+
+    def test_reload(self) -> None:
+        score = Score(helper.get_path("simple.mscz", 4), readonly=True)
+        assert score.reload().readonly
+
+    def test_shared_between_threads(self) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        score = Score(helper.get_path("meta-all-values.mscz", 4), readonly=True)
+        expected = score.fields.export_to_dict()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(lambda _: score.fields.export_to_dict(), range(20))
+            )
+        assert results == [expected] * 20
+
+
+class TestCopy:
+    @pytest.mark.parametrize("version", mscxyz.supported_versions)
+    def test_independent(self, version: int) -> None:
+        score = helper.get_score("simple.mscz", version)
+        score.meta.title = "Original"
+        with mock.patch("mscxyz.utils.ZipContainer._extract_zip") as extract:
+            clone = score.copy()
+        assert not extract.called
+        assert clone.meta.title == "Original"
+        clone.meta.title = "Copy"
+        assert score.meta.title == "Original"
+        assert clone.xml_root is not score.xml_root
+
+    def test_style(self, tmp_path: Path) -> None:
+        score = helper.get_score("simple.mscz", 4)
+        score.style.set("pageWidth", 9)
+        clone = score.copy()
+        assert clone.zip_container is not None
+        assert score.zip_container is not None
+        assert clone.zip_container.tmp_dir != score.zip_container.tmp_dir
+        assert clone.style.get("pageWidth") == "9"
+        clone.style.set("pageWidth", 10)
+        assert score.style.get("pageWidth") == "9"
+        dest = tmp_path / "copy.mscz"
+        clone.save(str(dest))
+        assert Score(dest).style.get("pageWidth") == "10"
+
+    def test_writable_copy_of_readonly(self) -> None:
+        score = Score(helper.get_path("simple.mscz", 4), readonly=True)
+        score.style.page_width
+        clone = score.copy(readonly=False)
+        clone.meta.title = "Copy"
+        clone.style.set("pageWidth", 10)
+        assert clone.xml.find("Score/Style") is not None
+        with pytest.raises(ReadOnlyError):
+            score.copy().meta.title = "Copy"
+
+    def test_reload_in_memory(self) -> None:
+        score = helper.get_score("simple.mscz", 4)
+        score.meta.title = "In memory"
+        score.style.set("pageWidth", 9)
+        with mock.patch("mscxyz.utils.ZipContainer._extract_zip") as extract:
+            reloaded = score.reload(in_memory=True)
+        assert not extract.called
+        assert reloaded.in_memory
+        assert reloaded.meta.title == "In memory"
+        assert reloaded.style.get("pageWidth") == "9"
+        assert reloaded.path == score.path
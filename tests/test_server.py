@@ -0,0 +1,205 @@
+"""Test submodule “server.py”."""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import tempfile
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from mscxyz import cli, server
+from mscxyz.score import Score
+from tests import helper
+
+
+@pytest.fixture
+def socket_path() -> Iterator[str]:
+    # The path of a Unix socket is limited to about 100 characters.
+    with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+        path = os.path.join(tmp, "mscxyz.sock")
+        instance = server.Server(path)
+        thread = threading.Thread(target=instance.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield path
+        finally:
+            instance.shutdown()
+            instance.server_close()
+            thread.join()
+        assert not os.path.exists(path)
+
+
+def test_default_socket(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert server.get_default_socket() == "/run/user/1000/mscxyz.sock"
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    assert server.get_default_socket() == f"/tmp/mscxyz-{os.getuid()}.sock"
+
+
+class TestHandleRequest:
+    def test_args(self) -> None:
+        response = server.handle_request({"args": ["--list-fields"]})
+        assert response["ok"]
+        assert "title" in response["stdout"]
+
+    def test_cwd(self) -> None:
+        src = Path(helper.get_file("simple.mscz", 4))
+        response = server.handle_request(
+            {"args": ["--title", "New title", src.name], "cwd": str(src.parent)}
+        )
+        assert response["ok"]
+        assert os.getcwd() != str(src.parent)
+        assert Score(src).meta.title == "New title"
+
+    def test_help(self) -> None:
+        response = server.handle_request({"args": ["--help"]})
+        assert response["ok"]
+        assert "usage:" in response["stdout"]
+
+    def test_invalid_args(self) -> None:
+        response = server.handle_request({"args": ["--jobs", "many"]})
+        assert not response["ok"]
+        assert response["exit_code"] == 2
+        assert "usage: musescore-manager " in response["stderr"]
+        assert "--jobs: invalid int value: 'many'" in response["stderr"]
+
+    def test_style_file_closed(self, tmp_path: Path) -> None:
+        style = tmp_path / "style.mss"
+        style.write_text("<museScore/>")
+        with mock.patch("mscxyz.cli.close_files", wraps=cli.close_files) as close:
+            server.handle_request(
+                {"args": ["--style-file", str(style), "--list-fields"]}
+            )
+        assert close.call_args.args[0].style_file.closed
+
+    def test_exception(self) -> None:
+        response = server.handle_request({"op": "get_fields", "path": "missing.mscz"})
+        assert not response["ok"]
+        assert response["error"]["type"] == "FileNotFoundError"
+
+    def test_unknown(self) -> None:
+        response = server.handle_request({"op": "unknown"})
+        assert response["error"]["type"] == "ValueError"
+
+    @pytest.mark.parametrize("args", [["--watch", "."], ["--serve"], ["--serv"]])
+    def test_blocking_args(self, args: list[str]) -> None:
+        response = server.handle_request({"args": args})
+        assert not response["ok"]
+        assert response["error"]["type"] == "ValueError"
+
+
+class TestServer:
+    def test_ping(self, socket_path: str) -> None:
+        assert server.send({"op": "ping"}, socket_path)["result"] == "pong"
+
+    def test_permissions(self, socket_path: str) -> None:
+        assert os.stat(socket_path).st_mode & 0o777 == 0o600
+
+    def test_fields(self, socket_path: str) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        response = server.send(
+            {"op": "set_fields", "path": src, "fields": {"title": "New title"}},
+            socket_path,
+        )
+        assert response["result"]["title"] == "New title"
+        response = server.send({"op": "get_fields", "path": src}, socket_path)
+        assert response["result"]["title"] == "New title"
+        assert response["result"]["version"] == 4.2
+
+    def test_apply_style(self, socket_path: str) -> None:
+        src = helper.get_file("simple.mscz", 4)
+        response = server.send(
+            {"op": "apply_style", "path": src, "values": {"pageWidth": 8.5}},
+            socket_path,
+        )
+        assert response["ok"]
+        assert Score(src).style.get("pageWidth") == "8.5"
+
+    def test_invalid_json(self, socket_path: str) -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+            client.sendall(b"no json\n")
+            assert b"JSONDecodeError" in client.recv(4096)
+
+    def test_client(
+        self,
+        socket_path: str,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        src = Path(helper.get_file("simple.mscz", 4))
+        monkeypatch.setenv("MSCXYZ_SOCKET", socket_path)
+        monkeypatch.chdir(src.parent)
+        assert server.client(["--composer", "Composer", src.name]) == 0
+        assert Score(src).meta.composer == "Composer"
+        assert server.client(["--jobs", "many"]) == 2
+
+    def test_client_invalid_args(
+        self,
+        socket_path: str,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        monkeypatch.setenv("MSCXYZ_SOCKET", socket_path)
+        assert server.client(["--unknown-option"]) == 2
+        assert "unrecognized arguments: --unknown-option" in capsys.readouterr().err
+
+    def test_idle_client(
+        self, socket_path: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(server._RequestHandler, "timeout", 0.5)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle:
+            idle.connect(socket_path)
+            assert server.send({"op": "ping"}, socket_path)["result"] == "pong"
+            # The server has closed the idle connection.
+            assert idle.recv(4096) == b""
+
+    def test_one_request_per_connection(self, socket_path: str) -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+            client.sendall(b'{"op": "ping"}\n{"op": "ping"}\n')
+            with client.makefile("rb") as stream:
+                assert json.loads(stream.readline())["result"] == "pong"
+                assert stream.readline() == b""
+
+    def test_client_error(
+        self,
+        socket_path: str,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+        tmp_path: Path,
+    ) -> None:
+        broken = tmp_path / "broken.mscx"
+        broken.write_text("<museScore")
+        monkeypatch.setenv("MSCXYZ_SOCKET", socket_path)
+        assert server.client(["--title", "Title", str(broken)]) == 1
+        assert "Error" in capsys.readouterr().err
+
+
+class TestSocketPath:
+    def test_regular_file(self, tmp_path: Path) -> None:
+        score = tmp_path / "score.mscz"
+        score.write_bytes(b"score")
+        with pytest.raises(FileExistsError):
+            server.Server(str(score))
+        assert score.read_bytes() == b"score"
+
+    def test_running_server(self, socket_path: str) -> None:
+        with pytest.raises(FileExistsError):
+            server.Server(socket_path)
+        assert server.send({"op": "ping"}, socket_path)["ok"]
+
+    def test_stale_socket(self) -> None:
+        with tempfile.TemporaryDirectory(dir="/tmp") as tmp:
+            path = os.path.join(tmp, "mscxyz.sock")
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as killed:
+                killed.bind(path)
+            with server.Server(path):
+                assert os.path.exists(path)
+            assert not os.path.exists(path)
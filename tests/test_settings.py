@@ -0,0 +1,137 @@
+"""Test submodule “settings.py”."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from mscxyz import settings
+from mscxyz.backup import BackupStore
+from mscxyz.score import Score
+from mscxyz.settings import DefaultArguments, get_args, use_args
+from mscxyz.utils import colorize
+from tests import helper
+
+
+def dry_run_args(dry_run: bool) -> DefaultArguments:
+    args = DefaultArguments()
+    args.general_dry_run = dry_run
+    return args
+
+
+class TestUseArgs:
+    def test_scope(self) -> None:
+        global_args = settings.reset_args()
+        scoped = DefaultArguments()
+        with use_args(scoped) as args:
+            assert args is scoped
+            assert get_args() is scoped
+            inner = DefaultArguments()
+            with use_args(inner):
+                assert get_args() is inner
+            assert get_args() is scoped
+        assert get_args() is global_args
+
+    def test_set_args_inside_scope(self) -> None:
+        settings.reset_args()
+        scoped = DefaultArguments()
+        with use_args(scoped):
+            settings.set_args(DefaultArguments())
+            assert get_args() is scoped
+
+    def test_colorize(self) -> None:
+        args = DefaultArguments()
+        args.info_color = False
+        with use_args(args):
+            assert colorize("text", "red") == "text"
+
+    def test_threads(self) -> None:
+        files = [helper.get_file("simple.mscz", 4) for _ in range(2)]
+        barrier = threading.Barrier(2)
+
+        def set_title(file: str, dry_run: bool) -> None:
+            with use_args(dry_run_args(dry_run)):
+                score = Score(file)
+                score.meta.title = "Scoped title"
+                # Both threads are inside their scopes before they save.
+                barrier.wait()
+                score.save()
+
+        threads = [
+            threading.Thread(target=set_title, args=(file, dry_run))
+            for file, dry_run in zip(files, (True, False))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert Score(files[0]).meta.title != "Scoped title"
+        assert Score(files[1]).meta.title == "Scoped title"
+
+    def test_asyncio_tasks(self) -> None:
+        async def dry_run(value: bool) -> bool:
+            with use_args(dry_run_args(value)):
+                await asyncio.sleep(0.01)
+                return get_args().general_dry_run
+
+        async def main() -> list[bool]:
+            return list(
+                await asyncio.gather(dry_run(True), dry_run(False), dry_run(True))
+            )
+
+        assert asyncio.run(main()) == [True, False, True]
+
+    def test_execute_uses_scope(self, tmp_path: Path) -> None:
+        from mscxyz import cli
+
+        src = helper.get_file("simple.mscz", 4)
+        seen: list[bool] = []
+        original = cli._process_file
+
+        def process_file(
+            file: Path, args: DefaultArguments, store: Optional[BackupStore] = None
+        ) -> None:
+            # Another thread replaces the global options meanwhile.
+            settings.set_args(dry_run_args(False))
+            seen.append(get_args().general_dry_run)
+            original(file, args, store)
+
+        cli._process_file = process_file
+        try:
+            cli.execute(["--dry-run", "--title", "Scoped title", src])
+        finally:
+            cli._process_file = original
+            settings.reset_args()
+        assert seen == [True]
+        assert Score(src).meta.title != "Scoped title"
+
+    def test_execute_keeps_global_args(self) -> None:
+        from mscxyz import cli
+
+        global_args = settings.reset_args()
+        cli.get_args(["--dry-run", "."])
+        assert get_args() is global_args
+        cli.execute(["--dry-run", "--list-files", helper.get_dir("nested-folders", 4)])
+        assert get_args() is global_args
+
+    def test_main_sets_global_args(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        from mscxyz import cli
+
+        monkeypatch.setattr(
+            "sys.argv",
+            [
+                "musescore-manager",
+                "--dry-run",
+                "--list-files",
+                helper.get_dir("nested-folders", 4),
+            ],
+        )
+        try:
+            cli.main()
+            assert get_args().general_dry_run
+        finally:
+            settings.reset_args()
@@ -0,0 +1,128 @@
+"""Test submodule “shard.py”."""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+from pathlib import Path
+
+import pytest
+
+from mscxyz.shard import Shard, list_shard, stable_hash
+from tests.helper import Cli
+
+
+@pytest.fixture
+def library(tmp_path: Path) -> Path:
+    root = tmp_path / "library"
+    for i in range(40):
+        path = root / str(i % 4) / f"score-{i}.mscx"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x" * (i + 1) * 100)
+    return root
+
+
+def names(files: object) -> set[str]:
+    return {file.name for file in files}  # type: ignore[attr-defined]
+
+
+class TestShard:
+    def test_parse(self) -> None:
+        assert Shard.parse("2/4") == Shard(2, 4)
+        assert str(Shard(2, 4)) == "2/4"
+
+    @pytest.mark.parametrize("value", ["1", "0/4", "5/4", "1/0", "a/b", "1/2/3"])
+    def test_parse_invalid(self, value: str) -> None:
+        with pytest.raises(argparse.ArgumentTypeError):
+            Shard.parse(value)
+
+
+def test_stable_hash() -> None:
+    assert stable_hash("a/b.mscz") == 7238285638732945023
+    assert stable_hash("a/b.mscz") != stable_hash("a/c.mscz")
+
+
+@pytest.mark.parametrize("by_size", [False, True])
+class TestListShard:
+    def test_disjoint_and_complete(self, library: Path, by_size: bool) -> None:
+        shards = [
+            names(list_shard(library, Shard(i, 3), by_size=by_size))
+            for i in range(1, 4)
+        ]
+        assert sum(len(shard) for shard in shards) == 40
+        assert set.union(*shards) == {f"score-{i}.mscx" for i in range(40)}
+        assert all(shard for shard in shards)
+
+    def test_independent_of_root_location(
+        self, library: Path, tmp_path: Path, by_size: bool
+    ) -> None:
+        moved = shutil.copytree(library, tmp_path / "elsewhere" / "mount")
+        for i in range(1, 4):
+            assert names(list_shard(library, Shard(i, 3), by_size=by_size)) == names(
+                list_shard([moved], Shard(i, 3), by_size=by_size)
+            )
+
+
+def test_balanced_by_size(library: Path) -> None:
+    totals = [
+        sum(
+            file.stat().st_size
+            for file in list_shard(library, Shard(i, 3), by_size=True)
+        )
+        for i in range(1, 4)
+    ]
+    # The largest file has 4000 bytes.
+    assert max(totals) - min(totals) <= 4000
+
+
+def test_single_file(library: Path) -> None:
+    file = library / "0" / "score-0.mscx"
+    shards = [names(list_shard(file, Shard(i, 2))) for i in (1, 2)]
+    assert sorted(map(len, shards)) == [0, 1]
+
+
+class TestOptionShard:
+    @pytest.mark.parametrize("score_dir", [6], indirect=True)
+    def test_list_files(self, score_dir: Path) -> None:
+        listed: list[str] = []
+        for i in (1, 2):
+            stdout = Cli(
+                "--list-files", "--shard", f"{i}/2", score_dir, append_score=False
+            ).stdout()
+            listed += stdout.splitlines()
+        assert sorted(listed) == sorted(str(p) for p in score_dir.glob("*.mscz"))
+
+    def test_invalid(self) -> None:
+        with pytest.raises(SystemExit):
+            Cli("--shard", "3/2", ".", append_score=False).execute()
+
+    def test_files_from(self, tmp_path: Path) -> None:
+        files = [tmp_path / f"{name}.mscz" for name in "abcdef"]
+        for file in files:
+            file.write_text("")
+        files_from = tmp_path / "files"
+        files_from.write_text("".join(f"{file}\n" for file in files))
+        listed: list[str] = []
+        for i in (1, 2):
+            listed += (
+                Cli(
+                    "--list-files",
+                    "--files-from",
+                    files_from,
+                    "--shard",
+                    f"{i}/2",
+                    append_score=False,
+                )
+                .stdout()
+                .splitlines()
+            )
+        assert sorted(listed) == [str(file) for file in files]
+        with pytest.raises(SystemExit):
+            Cli(
+                "--files-from",
+                files_from,
+                "--shard",
+                "1/2",
+                "--shard-by-size",
+                append_score=False,
+            ).execute()
@@ -0,0 +1,144 @@
+"""Test submodule “state.py”."""
+
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+from unittest import mock
+
+from mscxyz import cli
+from mscxyz.score import Score
+from mscxyz.settings import DefaultArguments, reset_args
+from mscxyz.shard import Shard
+from mscxyz.state import RunState, hash_args, hash_file
+from tests import helper
+from tests.helper import Cli
+
+
+def test_hash_file(tmp_path: Path) -> None:
+    (tmp_path / "a").write_bytes(b"a")
+    (tmp_path / "b").write_bytes(b"a")
+    assert hash_file(tmp_path / "a") == hash_file(tmp_path / "b")
+
+
+def test_hash_args() -> None:
+    args = reset_args()
+    before = hash_args(args)
+    args.path = ["other"]
+    args.general_jobs = 4
+    args.info_profile = True
+    args.info_verbose = 2
+    assert hash_args(args) == before
+    args.selection_scan_threads = 4
+    args.selection_shard = Shard.parse("1/2")
+    args.selection_exclude = ["*.mscx"]
+    assert hash_args(args) == before
+    args.meta_title = "Title"
+    assert hash_args(args) != before
+    args.meta_title = None
+    args.rename_no_whitespace = True
+    assert hash_args(args) != before
+
+
+def test_hash_args_style_file(tmp_path: Path) -> None:
+    style = tmp_path / "style.mss"
+    style.write_text("a")
+    args = DefaultArguments()
+    with open(style) as f:
+        args.style_file = f
+        before = hash_args(args)
+    style.write_text("b")
+    with open(style) as f:
+        args.style_file = f
+        assert hash_args(args) != before
+
+
+class TestRunState:
+    def test_record(self, score_dir: Path) -> None:
+        score = score_dir / "a.mscz"
+        args = DefaultArguments()
+        with RunState(score_dir / "state.db", args) as state:
+            assert not state.is_unchanged(score)
+            state.record(score)
+            assert state.is_unchanged(score)
+            assert not state.is_unchanged(score_dir / "b.mscz")
+            state.record(score_dir / "missing.mscz")
+
+        with RunState(score_dir / "state.db", args) as state:
+            assert state.is_unchanged(score)
+            os.utime(score, ns=(1, 1))
+            assert state.is_unchanged(score)
+            score_object = Score(score)
+            score_object.meta.title = "Title"
+            score_object.save()
+            assert not state.is_unchanged(score)
+            assert state.skipped == 2
+
+        args.meta_title = "Title"
+        with RunState(score_dir / "state.db", args) as state:
+            assert not state.is_unchanged(score_dir / "b.mscz")
+
+
+class TestOptionStateFile:
+    def test_skip_unchanged(self, score_dir: Path) -> None:
+        db = score_dir.parent / f"{score_dir.name}.db"
+        args = ("--state-file", db, "--title", "Title", score_dir)
+        with mock.patch("mscxyz.cli._process_file", wraps=cli._process_file) as process:
+            Cli(*args, append_score=False).execute()
+            assert process.call_count == 2
+            process.reset_mock()
+
+            Cli(*args, append_score=False).execute()
+            assert process.call_count == 0
+
+            shutil.copy(helper.get_path("simple.mscz", 4), score_dir / "b.mscz")
+            stdout = Cli("--verbose", *args, append_score=False).stdout()
+            assert [call.args[0].name for call in process.call_args_list] == ["b.mscz"]
+            assert "Skipped 1 unchanged files" in stdout
+            process.reset_mock()
+
+            Cli(
+                "--state-file", db, "--title", "Other", score_dir, append_score=False
+            ).execute()
+            assert process.call_count == 2
+
+    def test_change_selection(self, score_dir: Path) -> None:
+        db = score_dir.parent / f"{score_dir.name}.db"
+        args = ("--state-file", db, "--title", "Title")
+        with mock.patch("mscxyz.cli._process_file", wraps=cli._process_file) as process:
+            Cli(*args, "--exclude", "b.mscz", score_dir, append_score=False).execute()
+            assert process.call_count == 1
+            process.reset_mock()
+
+            Cli(*args, "--scan-threads", "2", score_dir, append_score=False).execute()
+            assert [call.args[0].name for call in process.call_args_list] == ["b.mscz"]
+            process.reset_mock()
+
+            Cli(*args, "--shard", "1/2", score_dir, append_score=False).execute()
+            assert process.call_count == 0
+
+    def test_failed_files_are_not_recorded(self, tmp_path: Path) -> None:
+        broken = tmp_path / "broken.mscx"
+        broken.write_text("<museScore")
+        db = tmp_path / "state.db"
+        Cli("--catch-errors", "--state-file", db, broken, append_score=False).execute()
+        with RunState(db, DefaultArguments()) as state:
+            assert not state.is_unchanged(broken)
+
+    def test_parallel(self, score_dir: Path) -> None:
+        db = score_dir.parent / f"{score_dir.name}.db"
+        Cli(
+            "--jobs",
+            "2",
+            "--state-file",
+            db,
+            "--title",
+            "T",
+            score_dir,
+            append_score=False,
+        ).execute()
+        args = cli.get_args(["--title", "T", str(score_dir)])
+        with RunState(db, args) as state:
+            assert state.is_unchanged(score_dir / "a.mscz")
+            assert state.is_unchanged(score_dir / "b.mscz")
@@ -565,3 +565,13 @@ class TestProperties:
         assert score.style.measure_number_offset == {"x": "0", "y": "-2"}
         score.style.measure_number_offset = {"x": 1.2, "y": 3.0}
         assert score.style.measure_number_offset == {"x": "1.2", "y": "3.0"}
+
+
+def test_method_reset_small_staffs() -> None:
+    score = helper.get_score("Reunion.mscx", version=3)
+    staff_type = score.xml.find_safe(".//StaffType")
+    score.xml.create_sub_element(staff_type, "small", "1")
+    score.style.reset_small_staffs()
+    score = score.reload(save=True)
+    assert score.xml.find(".//StaffType/small") is None
+    assert "<small>1</small>" in score.read_as_text()
@@ -0,0 +1,98 @@
+"""Test submodule “style_report.py”."""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from unittest import mock
+
+from mscxyz import style_report
+from mscxyz.score import Score
+from mscxyz.style import Style
+from mscxyz.style_report import StyleGroup, create_report, read_style_file
+from tests import helper
+from tests.helper import Cli
+
+
+def test_normalize() -> None:
+    parent = Style(helper.get_score("simple.mscx")).parent_element
+    styles = Style.normalize(parent)
+    assert styles["page-layout/page-height"] == "1683.36"
+    assert styles["page-layout/page-margins[1]@type"] == "even"
+
+
+def test_normalize_floats() -> None:
+    score = helper.get_score("score.mscz", version=4)
+    score.style.set("pageWidth", "8.50000")
+    styles = Style.normalize(score.style.parent_element)
+    assert styles["pageWidth"] == "8.5"
+
+
+def test_fingerprint() -> None:
+    a = helper.get_score("score.mscz", version=4)
+    b = helper.get_score("score.mscz", version=4)
+    assert a.style.fingerprint == b.style.fingerprint
+    b.style.set("pageWidth", 9)
+    assert a.style.fingerprint != b.style.fingerprint
+
+
+def test_group_diff() -> None:
+    group = StyleGroup("abc", {"a": "1.0", "b": "2.0"})
+    assert group.diff({"a": "1.0", "b": "3.0", "c": "x"}) == [
+        ("b", "3.0", "2.0"),
+        ("c", "x", None),
+    ]
+
+
+class TestCreateReport:
+    def setup_method(self) -> None:
+        self.score = helper.get_score("score.mscz", version=4)
+        self.other = Score(shutil.copy(self.score.path, self.score.dirname + "/b.mscz"))
+        self.other.style.set("pageWidth", 9)
+        self.other.save()
+
+    def test_groups(self) -> None:
+        report = create_report([self.score.path, self.other.path])
+        assert len(report.groups) == 2
+        assert report.errors == []
+
+    def test_parallel(self) -> None:
+        report = create_report(
+            [self.score.path, self.other.path, self.score.path], jobs=2
+        )
+        assert [len(group.paths) for group in report.groups] == [2, 1]
+
+    def test_cache(self, tmp_path: Path) -> None:
+        cache_file = tmp_path / "cache.json"
+        create_report([self.score.path], cache_file=cache_file)
+        assert cache_file.exists()
+        with mock.patch("mscxyz.style_report._fingerprint_score") as fingerprint:
+            report = create_report([self.score.path], cache_file=cache_file)
+            fingerprint.assert_not_called()
+        assert len(report.groups) == 1
+
+    def test_errors(self) -> None:
+        report = create_report([helper.get_file("broken.mscx")])
+        assert len(report.errors) == 1
+
+    def test_unreadable(self, tmp_path: Path) -> None:
+        report = create_report([tmp_path / "missing.mscz", self.score.path])
+        assert [path.name for path, _ in report.errors] == ["missing.mscz"]
+        assert isinstance(report.errors[0][1], FileNotFoundError)
+        assert len(report.groups) == 1
+
+    def test_read_style_file(self) -> None:
+        assert self.score.style_file
+        styles = read_style_file(self.score.style_file)
+        assert (
+            style_report.create_report([self.score.path]).groups[0].diff(styles) == []
+        )
+
+
+def test_option_style_report() -> None:
+    score = helper.get_score("score.mscz", version=4)
+    assert score.style_file
+    stdout = Cli(
+        "--style-report", score.style_file, score.path, append_score=False
+    ).stdout()
+    assert "(1 scores): matches the reference" in stdout
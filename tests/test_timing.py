@@ -0,0 +1,220 @@
+"""Test submodule “timing.py”."""
+
+from __future__ import annotations
+
+import json
+import shutil
+import tracemalloc
+from pathlib import Path
+
+from mscxyz import timing
+from mscxyz.timing import Profiler, _percentile
+from tests import helper
+from tests.helper import Cli
+
+
+def test_percentile() -> None:
+    values = [float(i) for i in range(1, 101)]
+    assert _percentile(values, 50) == 50.0
+    assert _percentile(values, 95) == 95.0
+    assert _percentile([3.0], 95) == 3.0
+    assert _percentile([], 50) == 0.0
+
+
+class TestProfiler:
+    def test_disabled(self) -> None:
+        profiler = Profiler()
+        with profiler.span("a"):
+            pass
+        assert profiler.spans == []
+
+    def test_span(self) -> None:
+        profiler = Profiler()
+        profiler.enable()
+        with profiler.file_scope("a.mscz"):
+            with profiler.span("a"):
+                pass
+        assert [span.name for span in profiler.spans] == ["a", "file"]
+        assert profiler.spans[0].file == "a.mscz"
+        assert profiler.file is None
+
+    def test_summary(self) -> None:
+        profiler = Profiler()
+        profiler.enable()
+        for file in ("a.mscz", "b.mscz"):
+            with profiler.file_scope(file):
+                for _ in range(3):
+                    with profiler.span("a"):
+                        pass
+        summary = profiler.summary()
+        assert summary["files"] == 2
+        assert summary["phases"]["a"]["count"] == 2
+        assert summary["files_per_second"] > 0
+
+
+def test_decorator_timed() -> None:
+    @timing.timed("test")
+    def function() -> int:
+        return 1
+
+    timing.enable()
+    try:
+        assert function() == 1
+    finally:
+        timing.profiler.disable()
+    assert timing.profiler.spans[-1].name == "test"
+
+
+def test_score_phases() -> None:
+    timing.enable()
+    try:
+        with timing.file_scope("score"):
+            score = helper.get_score("score.mscz", version=4)
+            score.style.set("pageWidth", 9)
+            score.save()
+    finally:
+        timing.profiler.disable()
+    names = {span.name for span in timing.profiler.spans}
+    assert {
+        "file",
+        "score.load",
+        "score.save",
+        "score.style",
+        "xml.parse",
+        "xml.serialize",
+        "zip.extract",
+        "zip.save",
+    } <= names
+
+
+class TestOptionProfile:
+    def test_profile(self) -> None:
+        stdout = Cli("--profile", "--title", "Profile").stdout()
+        assert "score.load" in stdout
+        assert "files/s" in stdout
+        assert not timing.profiler.enabled
+
+    def test_profile_json(self, tmp_path: Path) -> None:
+        json_file = tmp_path / "profile.json"
+        Cli("--profile-json", json_file).execute()
+        data = json.loads(json_file.read_text())
+        assert data["summary"]["files"] == 1
+        assert "score.load" in data["summary"]["phases"]
+
+
+def test_trace_events() -> None:
+    profiler = Profiler()
+    profiler.enable()
+    with profiler.file_scope("a.mscz"):
+        with profiler.span("xml.parse"):
+            pass
+    events = profiler.trace_events()
+    assert events[0]["ph"] == "M"
+    assert events[0]["args"] == {"name": "main"}
+    complete = [event for event in events if event["ph"] == "X"]
+    assert [event["name"] for event in complete] == ["file", "xml.parse"]
+    assert complete[1]["cat"] == "xml"
+    assert complete[1]["args"] == {"file": "a.mscz"}
+    assert complete[0]["ts"] <= complete[1]["ts"]
+
+
+def test_record() -> None:
+    result, spans = timing.record(True, "a.mscz", lambda x: x + 1, 1)
+    assert result == 2
+    assert [span.name for span in spans] == ["file"]
+    assert not timing.profiler.enabled
+    assert timing.record(False, "a.mscz", lambda: 1) == (1, [])
+
+
+class TestOptionTrace:
+    def test_sequential(self, tmp_path: Path) -> None:
+        trace_file = tmp_path / "trace.json"
+        Cli("--trace", trace_file, "--title", "Trace").execute()
+        events = json.loads(trace_file.read_text())["traceEvents"]
+        names = {event["name"] for event in events if event["ph"] == "X"}
+        assert {"file", "score.load", "score.save"} <= names
+
+    def test_parallel(self, tmp_path: Path) -> None:
+        for i in range(4):
+            shutil.copy(
+                helper.get_path("score.mscz", version=4), tmp_path / f"{i}.mscz"
+            )
+        trace_file = tmp_path / "trace.json"
+        Cli(
+            "--jobs",
+            "2",
+            "--trace",
+            trace_file,
+            "--title",
+            "Trace",
+            tmp_path,
+            append_score=False,
+        ).execute()
+        events = json.loads(trace_file.read_text())["traceEvents"]
+        files = [event for event in events if event["name"] == "file"]
+        assert len(files) == 4
+        workers = [event for event in events if event["ph"] == "M"]
+        assert all(event["args"]["name"].startswith("worker") for event in workers)
+
+
+class TestMemoryProfile:
+    def test_nested_peaks(self) -> None:
+        profiler = Profiler()
+        profiler.enable(memory=True)
+        try:
+            with profiler.span("outer"):
+                with profiler.span("inner"):
+                    data = bytearray(2_000_000)
+                    del data
+                with profiler.span("after"):
+                    pass
+        finally:
+            profiler.disable()
+        spans = {span.name: span for span in profiler.spans}
+        assert spans["inner"].memory_peak
+        assert spans["inner"].memory_peak >= 1_900_000
+        assert spans["outer"].memory_peak
+        assert spans["outer"].memory_peak >= spans["inner"].memory_peak
+        assert spans["after"].memory_peak is not None
+        assert spans["after"].memory_peak < 2_000_000
+        assert spans["outer"].rss_delta is not None
+        assert not tracemalloc.is_tracing()
+
+    def test_memory_summary(self) -> None:
+        profiler = Profiler()
+        profiler.enable(memory=True)
+        try:
+            with profiler.file_scope("a.mscz"):
+                with profiler.span("a"):
+                    data = bytearray(1_000_000)
+                    del data
+        finally:
+            profiler.disable()
+        summary = profiler.memory_summary()
+        assert summary["a"]["peak_max"] >= 900_000
+        assert summary["file"]["peak_max"] >= summary["a"]["peak_max"]
+
+    def test_without_memory(self) -> None:
+        profiler = Profiler()
+        profiler.enable()
+        with profiler.span("a"):
+            pass
+        assert profiler.spans[0].memory_peak is None
+        assert profiler.memory_summary() == {}
+
+    def test_option(self) -> None:
+        stdout = Cli("--memory-profile", "--title", "Memory").stdout()
+        assert "Memory: " in stdout
+        assert "score.snapshot" in stdout
+        assert "peak max" in stdout
+        assert not tracemalloc.is_tracing()
+
+    def test_option_parallel(self, tmp_path: Path) -> None:
+        for i in range(2):
+            shutil.copy(
+                helper.get_path("score.mscz", version=4), tmp_path / f"{i}.mscz"
+            )
+        stdout = Cli(
+            "--jobs", "2", "--memory-profile", tmp_path, append_score=False
+        ).stdout()
+        assert stdout.count("Memory: ") == 2
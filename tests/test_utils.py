@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import fnmatch
+import io
 import os
 import tempfile
-from typing import Optional
+from pathlib import Path
+from typing import Any, Optional
 from unittest import mock
 
 import pytest
@@ -24,45 +27,45 @@ class TestFunctions:
     def _list_scores(
         path: str, extension: ListExtension = "both", glob: Optional[str] = None
     ) -> list[str]:
-        with (
-            mock.patch("os.walk") as mockwalk,
-            mock.patch("pathlib.Path.is_dir") as is_dir,
-        ):
-            is_dir.return_value = True
-            mockwalk.return_value = [
-                ("/a", ("bar",), ("lorem.mscx",)),
-                ("/a/b", (), ("impsum.mscz", "dolor.mscx", "sit.txt")),
-            ]
+        with tempfile.TemporaryDirectory() as tmp:
+            for file in (
+                "a/lorem.mscx",
+                "a/b/impsum.mscz",
+                "a/b/dolor.mscx",
+                "a/b/sit.txt",
+            ):
+                os.makedirs(os.path.dirname(os.path.join(tmp, file)), exist_ok=True)
+                open(os.path.join(tmp, file), "w").close()
             scores: list[str] = []
-            for score in utils.list_path(path, extension, glob):
-                scores.append(str(score))
+            for score in utils.list_path(tmp + path, extension, glob):
+                scores.append(str(score)[len(tmp) :])
             scores.sort()
             return scores
 
-    @mock.patch("mscxyz.cli.Score")
+    @mock.patch("mscxyz.score.Score")
     def test_batch(self, Score: mock.Mock) -> None:
         Cli("--dry-run", helper.get_dir("batch"), append_score=False).execute()
         assert Score.call_count == 3
 
     def test_without_extension(self) -> None:
-        result: list[str] = self._list_scores("/test")
+        result: list[str] = self._list_scores("/a")
         assert result == ["/a/b/dolor.mscx", "/a/b/impsum.mscz", "/a/lorem.mscx"]
 
     def test_extension_both(self) -> None:
-        result: list[str] = self._list_scores("/test", extension="both")
+        result: list[str] = self._list_scores("/a", extension="both")
         assert result == ["/a/b/dolor.mscx", "/a/b/impsum.mscz", "/a/lorem.mscx"]
 
     def test_extension_mscx(self) -> None:
-        result: list[str] = self._list_scores("/test", extension="mscx")
+        result: list[str] = self._list_scores("/a", extension="mscx")
         assert result == ["/a/b/dolor.mscx", "/a/lorem.mscx"]
 
     def test_extension_mscz(self) -> None:
-        result: list[str] = self._list_scores("/test", extension="mscz")
+        result: list[str] = self._list_scores("/a", extension="mscz")
         assert result == ["/a/b/impsum.mscz"]
 
     def test_raises_exception(self) -> None:
         with pytest.raises(ValueError):
-            self._list_scores("/test", extension="lol")  # type: ignore
+            self._list_scores("/a", extension="lol")  # type: ignore
 
     def test_isfile(self) -> None:
         with mock.patch("pathlib.Path.is_file") as mock_isfile:
@@ -77,11 +80,11 @@ class TestFunctions:
             assert result == []
 
     def test_arg_glob_txt(self) -> None:
-        result: list[str] = self._list_scores("/test", glob="*.txt")
+        result: list[str] = self._list_scores("/a", glob="*.txt")
         assert str(result[0]) == "/a/b/sit.txt"
 
     def test_arg_glob_lol(self) -> None:
-        result: list[str] = self._list_scores("/test", glob="*.lol")
+        result: list[str] = self._list_scores("/a", glob="*.lol")
         assert result == []
 
     def test_function_list_zero_alphabet(self) -> None:
@@ -209,3 +212,187 @@ class TestClassZipContainer:
         self.container.save(dest)
         container = ZipContainer(dest)
         assert container.xml_file.exists()
+
+
+class TestListPath:
+    @pytest.fixture
+    def tree(self, tmp_path: Path) -> Path:
+        for file in (
+            "a.mscz",
+            "a_bak.mscz",
+            "b.mscx",
+            "notes.txt",
+            "sub/c.mscz",
+            "sub/deeper/d.mscz",
+            ".git/e.mscz",
+            "build/f.mscz",
+        ):
+            (tmp_path / file).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / file).write_text("")
+        return tmp_path
+
+    @staticmethod
+    def names(tree: Path, **kwargs: Any) -> list[str]:
+        return sorted(
+            path.relative_to(tree).as_posix()
+            for path in utils.list_path(tree, **kwargs)
+        )
+
+    def test_order_top_down(self, tree: Path) -> None:
+        paths = [
+            path.relative_to(tree).as_posix()
+            for path in utils.list_path(tree, exclude=[".git", "build"])
+        ]
+        assert paths.index("sub/c.mscz") < paths.index("sub/deeper/d.mscz")
+        assert paths.index("a.mscz") < paths.index("sub/c.mscz")
+
+    def test_exclude_prunes_directories(self, tree: Path) -> None:
+        with mock.patch("os.scandir", wraps=os.scandir) as scandir:
+            names = self.names(tree, exclude=[".git", "build", "*.mscx"])
+        assert names == [
+            "a.mscz",
+            "a_bak.mscz",
+            "sub/c.mscz",
+            "sub/deeper/d.mscz",
+        ]
+        scanned = {Path(call.args[0]).name for call in scandir.call_args_list}
+        assert ".git" not in scanned
+        assert "build" not in scanned
+
+    def test_multiple_globs(self, tree: Path) -> None:
+        assert self.names(tree, glob=["*.mscx", "*.txt"]) == ["b.mscx", "notes.txt"]
+
+    def test_glob_is_compiled_once(self, tree: Path) -> None:
+        with mock.patch("fnmatch.translate", wraps=fnmatch.translate) as translate:
+            assert len(self.names(tree)) == 7
+        assert translate.call_count == 1
+
+    def test_skip_backups(self, tree: Path) -> None:
+        assert "a_bak.mscz" not in self.names(tree, skip_backups=True)
+        assert "a.mscz" in self.names(tree, skip_backups=True)
+
+    def test_symlinks(self, tree: Path) -> None:
+        (tree / "link").symlink_to(tree / "sub", target_is_directory=True)
+        (tree / "loop").symlink_to(tree, target_is_directory=True)
+        (tree / "g.mscz").symlink_to(tree / "a.mscz")
+        exclude = [".git", "build"]
+
+        names = self.names(tree, exclude=exclude)
+        assert "g.mscz" in names
+        assert not any(name.startswith(("link/", "loop/")) for name in names)
+
+        names = self.names(tree, exclude=exclude, symlinks="ignore")
+        assert "g.mscz" not in names
+
+        names = self.names(tree, exclude=exclude, symlinks="follow")
+        # Each file once, either under its real or its linked path.
+        assert len(names) == 5
+        assert ("a.mscz" in names) != ("g.mscz" in names)
+        assert ("sub/c.mscz" in names) != ("link/c.mscz" in names)
+
+    def test_threads(self, tree: Path) -> None:
+        assert self.names(tree, threads=4) == self.names(tree)
+
+    def test_cli_options(self, tree: Path) -> None:
+        stdout = Cli(
+            "--list-files",
+            "--exclude",
+            ".git",
+            "--exclude",
+            "build",
+            "--skip-backups",
+            "--scan-threads",
+            "2",
+            tree,
+            append_score=False,
+        ).stdout()
+        assert sorted(
+            Path(line).relative_to(tree).as_posix() for line in stdout.splitlines()
+        ) == [
+            "a.mscz",
+            "b.mscx",
+            "sub/c.mscz",
+            "sub/deeper/d.mscz",
+        ]
+
+
+class TestReadFileList:
+    def test_newline(self) -> None:
+        stream = io.BytesIO(b"a.mscz\r\nsub/b.mscx\n\nc d.mscz")
+        assert list(utils.read_file_list(stream)) == [
+            Path("a.mscz"),
+            Path("sub/b.mscx"),
+            Path("c d.mscz"),
+        ]
+
+    def test_null(self) -> None:
+        stream = io.BytesIO(b"a\nb.mscz\0c.mscz\0")
+        assert list(utils.read_file_list(stream, null=True)) == [
+            Path("a\nb.mscz"),
+            Path("c.mscz"),
+        ]
+
+    def test_lazy(self) -> None:
+        read, write = os.pipe()
+        with os.fdopen(read, "rb") as stream:
+            os.write(write, b"a.mscz\nb.m")
+            files = utils.read_file_list(stream)
+            # The first path is yielded before the list is complete.
+            assert next(files) == Path("a.mscz")
+            os.write(write, b"scz\n")
+            os.close(write)
+            assert list(files) == [Path("b.mscz")]
+
+    def test_list_path(self, tmp_path: Path) -> None:
+        (tmp_path / "a.mscz").write_text("")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "b.mscx").write_text("")
+        stream = io.BytesIO(
+            f"{tmp_path / 'a.mscz'}\n{tmp_path / 'missing.mscz'}\n"
+            f"{tmp_path / 'notes.txt'}\n{tmp_path / 'sub'}\n".encode()
+        )
+        assert list(utils.list_path(utils.read_file_list(stream))) == [
+            tmp_path / "a.mscz",
+            tmp_path / "sub" / "b.mscx",
+        ]
+
+    def test_cli(self, tmp_path: Path) -> None:
+        for name in ("a.mscz", "b.mscz", "c.mscz"):
+            (tmp_path / name).write_text("")
+        files_from = tmp_path / "files"
+        files_from.write_bytes(
+            f"{tmp_path / 'c.mscz'}\0{tmp_path / 'a.mscz'}\0".encode()
+        )
+        stdout = Cli(
+            "--list-files", "--files-from", files_from, "--null", append_score=False
+        ).stdout()
+        assert stdout.splitlines() == [
+            str(tmp_path / "c.mscz"),
+            str(tmp_path / "a.mscz"),
+        ]
+
+    def test_cli_missing(self, tmp_path: Path) -> None:
+        (tmp_path / "a.mscz").write_text("")
+        (tmp_path / "dangling.mscz").symlink_to(tmp_path / "deleted.mscz")
+        files_from = tmp_path / "files"
+        files_from.write_text(
+            "".join(
+                f"{tmp_path / name}\n"
+                for name in ("a.mscz", "typo.mscz", "dangling.mscz")
+            )
+        )
+        cli = Cli("--list-files", "--files-from", files_from, append_score=False)
+        assert cli.stdout().splitlines() == [str(tmp_path / "a.mscz")]
+        assert cli.stderr().splitlines() == [
+            f"Warning: {tmp_path / 'typo.mscz'} does not exist",
+            f"Warning: {tmp_path / 'dangling.mscz'} does not exist",
+        ]
+
+    def test_cli_stdin(self, tmp_path: Path) -> None:
+        (tmp_path / "a.mscz").write_text("")
+        stdin = io.TextIOWrapper(io.BytesIO(f"{tmp_path / 'a.mscz'}\n".encode()))
+        with mock.patch("sys.stdin", stdin):
+            stdout = Cli(
+                "--list-files", "--files-from", "-", append_score=False
+            ).stdout()
+        assert stdout.splitlines() == [str(tmp_path / "a.mscz")]
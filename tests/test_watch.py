@@ -0,0 +1,193 @@
+"""Test submodule “watch.py”."""
+
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+from mscxyz import atomic
+from mscxyz.score import Score
+from mscxyz.watch import Watcher, diff_snapshots, take_snapshot
+from tests import helper
+from tests.helper import Cli
+
+
+def touch(path: Path, mtime_ns: int) -> None:
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_take_snapshot(score_dir: Path) -> None:
+    (score_dir / "notes.txt").write_text("")
+    snapshot = take_snapshot([score_dir], "*.mscz")
+    assert sorted(path.name for path in snapshot) == ["a.mscz", "b.mscz"]
+    stat = (score_dir / "a.mscz").stat()
+    assert snapshot[score_dir / "a.mscz"] == (stat.st_mtime_ns, stat.st_size)
+
+
+def test_diff_snapshots() -> None:
+    a = Path("a.mscz")
+    b = Path("b.mscz")
+    c = Path("c.mscz")
+    old = {a: (1, 1), b: (1, 1)}
+    assert diff_snapshots(old, {a: (1, 1), b: (2, 1), c: (1, 1)}) == [b, c]
+    assert diff_snapshots(old, {a: (1, 1)}) == []
+
+
+@pytest.mark.parametrize("inotify", [True, False])
+class TestWatcher:
+    def test_poll(self, score_dir: Path, inotify: bool) -> None:
+        watcher = Watcher([score_dir], debounce=0.01, inotify=inotify)
+        assert watcher.poll() == []
+        touch(score_dir / "a.mscz", 1_000_000_000)
+        shutil.copy(score_dir / "b.mscz", score_dir / "c.mscz")
+        assert sorted(path.name for path in watcher.poll()) == ["a.mscz", "c.mscz"]
+        assert watcher.poll() == []
+        watcher.close()
+
+    def test_debounce(self, score_dir: Path, inotify: bool) -> None:
+        sleeps: list[float] = []
+
+        def save_during_sleep(seconds: float) -> None:
+            # MuseScore saves twice, the third check finds the file settled.
+            sleeps.append(seconds)
+            if len(sleeps) < 3:
+                touch(score_dir / "a.mscz", 1_000_000_000 + len(sleeps))
+
+        watcher = Watcher(
+            [score_dir], debounce=0.1, inotify=inotify, sleep=save_during_sleep
+        )
+        touch(score_dir / "a.mscz", 1_000_000_000)
+        assert [path.name for path in watcher.poll()] == ["a.mscz"]
+        assert sleeps == [0.1, 0.1, 0.1]
+        assert watcher.poll() == []
+        watcher.close()
+
+    def test_scan_only_after_event(self, score_dir: Path, inotify: bool) -> None:
+        scans: list[int] = []
+
+        def list_files() -> list[Path]:
+            scans.append(1)
+            return [score_dir / "a.mscz", score_dir / "b.mscz"]
+
+        watcher = Watcher(
+            [score_dir], interval=0.01, inotify=inotify, list_files=list_files
+        )
+        watcher.run(lambda files: {}, rounds=3)
+        # With inotify only the initial scan, without one scan per round.
+        assert len(scans) == (1 if inotify else 4)
+        watcher.close()
+
+    def test_list_files(self, score_dir: Path, inotify: bool) -> None:
+        watcher = Watcher(
+            [score_dir],
+            debounce=0.01,
+            inotify=inotify,
+            list_files=lambda: [score_dir / "a.mscz"],
+        )
+        touch(score_dir / "a.mscz", 1_000_000_000)
+        touch(score_dir / "b.mscz", 1_000_000_000)
+        assert [path.name for path in watcher.poll()] == ["a.mscz"]
+        watcher.close()
+
+    def test_run_ignores_own_writes(self, score_dir: Path, inotify: bool) -> None:
+        watcher = Watcher([score_dir], interval=0.05, debounce=0.01, inotify=inotify)
+        assert watcher.uses_inotify == inotify
+        processed: list[list[str]] = []
+
+        def process(files: list[Path]) -> atomic.Written:
+            processed.append([file.name for file in files])
+            for file in files:
+                score = Score(file)
+                score.meta.title = "Title"
+                score.save()
+            return atomic.take_written()
+
+        atomic.record_writes()
+        try:
+            touch(score_dir / "a.mscz", 1_000_000_000)
+            watcher.run(process, rounds=1)
+            touch(score_dir / "b.mscz", 1_000_000_000)
+            watcher.run(process, rounds=3)
+        finally:
+            atomic.record_writes(False)
+        assert processed == [["a.mscz"], ["b.mscz"]]
+        watcher.close()
+
+    def test_run_keeps_other_writes(self, score_dir: Path, inotify: bool) -> None:
+        watcher = Watcher([score_dir], interval=0.05, debounce=0.01, inotify=inotify)
+        processed: list[list[str]] = []
+
+        def process(files: list[Path]) -> atomic.Written:
+            processed.append([file.name for file in files])
+            if len(processed) == 1:
+                # Saved in MuseScore while a.mscz is processed
+                touch(score_dir / "b.mscz", 2_000_000_000)
+            return {}
+
+        touch(score_dir / "a.mscz", 1_000_000_000)
+        watcher.run(process, rounds=3)
+        assert processed == [["a.mscz"], ["b.mscz"]]
+        watcher.close()
+
+    def test_run_keeps_other_save_of_written_file(
+        self, score_dir: Path, inotify: bool
+    ) -> None:
+        watcher = Watcher([score_dir], interval=0.05, debounce=0.01, inotify=inotify)
+        processed: list[list[str]] = []
+
+        def process(files: list[Path]) -> atomic.Written:
+            processed.append([file.name for file in files])
+            if len(processed) == 1:
+                score = Score(score_dir / "a.mscz")
+                score.meta.title = "Title"
+                score.save()
+                # Saved in MuseScore after mscxyz, before the round ends
+                touch(score_dir / "a.mscz", 2_000_000_000)
+            return atomic.take_written()
+
+        atomic.record_writes()
+        try:
+            touch(score_dir / "a.mscz", 1_000_000_000)
+            watcher.run(process, rounds=3)
+        finally:
+            atomic.record_writes(False)
+        assert processed == [["a.mscz"], ["a.mscz"]]
+        watcher.close()
+
+
+def test_cli_watch(score_dir: Path) -> None:
+    original = Watcher.run
+
+    def run(self: Watcher, process: Any, rounds: Optional[int] = None) -> None:
+        # Edited in MuseScore after the first pass
+        for name in ("a", "b"):
+            shutil.copy(helper.get_path("simple.mscz", 4), score_dir / f"{name}.mscz")
+            touch(score_dir / f"{name}.mscz", 3_000_000_000)
+        self.debounce = 0.01
+        original(self, process, rounds=2)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(Watcher, "run", run)
+        stdout = Cli(
+            "--watch",
+            "--watch-interval",
+            "0.05",
+            "--exclude",
+            "b.mscz",
+            "--title",
+            "Watched",
+            score_dir,
+            append_score=False,
+        ).stdout()
+    assert f"Watching {score_dir}" in stdout
+    assert Score(score_dir / "a.mscz").meta.title == "Watched"
+    assert Score(score_dir / "b.mscz").meta.title == "Title"
+
+
+def test_cli_watch_files_from(score_dir: Path) -> None:
+    with pytest.raises(SystemExit):
+        Cli("--watch", "--files-from", "-", append_score=False).execute()
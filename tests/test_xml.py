@@ -7,7 +7,7 @@ from pathlib import Path
 import pytest
 
 from mscxyz import utils
-from mscxyz.xml import XmlManipulator
+from mscxyz.xml import Rule, XmlManipulator
 from tests import helper
 
 xml_file = helper.get_file("simple.mscx", 4)
@@ -151,3 +151,38 @@ class TestMethodRemoveTags:
 
     def test_navigate_in_tree(self, custom_xml: XmlManipulator) -> None:
         assert "<root><a><c/></a>" in custom_xml.remove_tags("./a/b").tostring()
+
+
+class TestMethodApplyRules:
+    def test_remove(self, custom_xml: XmlManipulator) -> None:
+        assert (
+            "<root><a/><d>some text<e/></d></root>"
+            in custom_xml.apply_rules(
+                Rule("b", remove=True), Rule("c", remove=True)
+            ).tostring()
+        )
+
+    def test_remove_parent_and_child(self, custom_xml: XmlManipulator) -> None:
+        assert (
+            "<root><d>some text<e/></d></root>"
+            in custom_xml.apply_rules(
+                Rule("a", remove=True), Rule("b", remove=True)
+            ).tostring()
+        )
+
+    def test_predicate(self, custom_xml: XmlManipulator) -> None:
+        assert (
+            "<root><a><b/><c/></a></root>"
+            in custom_xml.apply_rules(
+                Rule("d", predicate=lambda e: e.text == "some text", remove=True),
+                Rule("a", predicate=lambda e: e.text == "some text", remove=True),
+            ).tostring()
+        )
+
+    def test_action(self, custom_xml: XmlManipulator) -> None:
+        tags: list[str] = []
+        custom_xml.apply_rules(
+            Rule("b", action=lambda e: tags.append(str(e.tag))),
+            Rule("e", action=lambda e: tags.append(str(e.tag))),
+        )
+        assert tags == ["b", "e"]